@@ -1,11 +1,13 @@
 import os
 import datetime
-import time
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 
 from tools.utils_basic import symbol_to_code
 from tools.utils_cache import AKCache, get_prev_trading_date
-from tools.utils_remote import DataSource, ExitRight, get_daily_history, get_ts_daily_histories
+from tools.utils_governor import RequestSource, RequestGovernor
+from tools.utils_remote import DataSource, ExitRight, get_daily_history, get_ts_daily_histories, \
+    get_daily_history_workers, DAILY_HISTORY_REQUEST_SOURCES
 
 
 DEFAULT_INIT_DAY_COUNT: int = 550   # 默认足够覆盖两年
@@ -111,30 +113,35 @@ class DailyHistory:
         downloaded_count = 0
         download_failure = []
 
-        group_size = 10
-        for i in range(0, len(code_list), group_size):
-            group_codes = [sub_code for sub_code in code_list[i:i + group_size]]
+        def _download_one(code: str):
+            return code, get_daily_history(
+                code=code,
+                start_date=start_date,
+                end_date=end_date,
+                columns=self.default_columns,
+                adjust=ExitRight.QFQ,
+                data_source=self.data_source,
+            )
 
-            for code in group_codes:
-                df = get_daily_history(
-                    code=code,
-                    start_date=start_date,
-                    end_date=end_date,
-                    columns=self.default_columns,
-                    adjust=ExitRight.QFQ,
-                    data_source=self.data_source,
-                )
-                time.sleep(5)
-                if df is None or len(df) == 0:
-                    download_failure.append(code)
-                    continue
-                else:
-                    df.to_csv(f'{self.root_path}/{self.default_kline_folder}/{code}.csv', index=False)
-                    downloaded_count += 1
+        # 限速交给 RequestGovernor，这里只按数据源允许的并发数并行
+        group_size = 10
+        with ThreadPoolExecutor(max_workers=get_daily_history_workers(self.data_source)) as executor:
+            for i in range(0, len(code_list), group_size):
+                group_codes = [sub_code for sub_code in code_list[i:i + group_size]]
+
+                for code, df in executor.map(_download_one, group_codes):
+                    if df is None or len(df) == 0:
+                        download_failure.append(code)
+                        continue
+                    else:
+                        df.to_csv(f'{self.root_path}/{self.default_kline_folder}/{code}.csv', index=False)
+                        downloaded_count += 1
 
-            print(f'[HISTORY] [{downloaded_count}/{min(i + group_size, len(code_list))}]', group_codes)
+                print(f'[HISTORY] [{downloaded_count}/{min(i + group_size, len(code_list))}]', group_codes)
         # 有可能是当天新股没有数据，下载失败也正常
         print(f'[HISTORY] Download finished with {len(download_failure)} fails: {download_failure}')
+        if self.data_source in DAILY_HISTORY_REQUEST_SOURCES:
+            print(f'[HISTORY] {RequestGovernor().summary(DAILY_HISTORY_REQUEST_SOURCES[self.data_source])}')
 
     # 自动补全本地缺失股票代码
     def _download_local_missed(self):
@@ -209,14 +216,8 @@ class DailyHistory:
             if not (self[code]['datetime'] == target_date_int).any():
                 loss_list.append(code)
 
-        updated_codes = set()
-        updated_count = 0
-        group_size = 400
-        for i in range(0, len(loss_list), group_size):
-            time.sleep(0.5)
-            group_codes = [sub_code for sub_code in loss_list[i:i + group_size]]
-
-            dfs = get_ts_daily_histories(
+        def _download_group(group_codes: list[str]) -> dict[str, pd.DataFrame]:
+            return get_ts_daily_histories(
                 codes=group_codes,
                 start_date=target_date,
                 end_date=target_date,
@@ -224,6 +225,15 @@ class DailyHistory:
                 # adjust=ExitRight.QFQ,
             )
 
+        updated_codes = set()
+        updated_count = 0
+        group_size = 400
+        groups = [loss_list[i:i + group_size] for i in range(0, len(loss_list), group_size)]
+        # 多个 token 的额度叠加后可以同时拉取多组
+        with ThreadPoolExecutor(max_workers=get_daily_history_workers(DataSource.TUSHARE)) as executor:
+            group_dfs = list(executor.map(_download_group, groups))
+
+        for dfs in group_dfs:
             # 填补缺失的日期
             for code in dfs:
                 df = dfs[code]
@@ -376,7 +386,7 @@ class DailyHistory:
         now = datetime.datetime.now()
         for i in range(days-1, -1, -1):
             date_str = get_prev_trading_date(now, i)
-            df = ak.news_trade_notify_dividend_baidu(date=date_str)
+            df = RequestGovernor().call(RequestSource.BAIDU, ak.news_trade_notify_dividend_baidu, date=date_str)
             if df is not None and len(df) > 0 and '股票代码' in df.columns:
                 codes = [symbol_to_code(symbol) for symbol in df['股票代码'].values if len(symbol) == 6]
                 ans += codes
@@ -2,9 +2,12 @@ import os
 from typing import Optional
 
 import pandas as pd
-from xtquant import xtdata
+try:
+    from xtquant import xtdata
+except ImportError:
+    xtdata = None
 
-from delegate.xt_delegate import BaseDelegate
+from delegate.base_delegate import BaseDelegate
 
 from tools.constants import MSG_INNER_SEPARATOR, MSG_OUTER_SEPARATOR
 from tools.utils_basic import code_to_symbol
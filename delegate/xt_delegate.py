@@ -15,6 +15,7 @@ from tools.constants import MSG_OUTER_SEPARATOR
 from tools.utils_basic import get_code_exchange, is_stock
 from tools.utils_cache import StockNames, check_open_day
 from tools.utils_ding import BaseMessager
+from tools.utils_trace import get_latency_tracer
 
 from delegate.base_delegate import BaseDelegate
 from delegate.xt_callback import XtDefaultCallback
@@ -126,16 +127,19 @@ class XtDelegate(BaseDelegate):
         order_remark: str,
     ) -> bool:
         if self.xt_trader is not None:
-            self.xt_trader.order_stock(
-                account=self.account,
-                stock_code=stock_code,
-                order_type=order_type,
-                order_volume=order_volume,
-                price_type=price_type,
-                price=price,
-                strategy_name=strategy_name,
-                order_remark=order_remark,
-            )
+            tracer = get_latency_tracer()
+            with tracer.span('order_submit_call'):
+                self.xt_trader.order_stock(
+                    account=self.account,
+                    stock_code=stock_code,
+                    order_type=order_type,
+                    order_volume=order_volume,
+                    price_type=price_type,
+                    price=price,
+                    strategy_name=strategy_name,
+                    order_remark=order_remark,
+                )
+            tracer.mark('order_submit')
             return True
         else:
             return False
@@ -151,16 +155,19 @@ class XtDelegate(BaseDelegate):
         order_remark: str,
     ) -> bool:
         if self.xt_trader is not None:
-            self.xt_trader.order_stock_async(
-                account=self.account,
-                stock_code=stock_code,
-                order_type=order_type,
-                order_volume=order_volume,
-                price_type=price_type,
-                price=price,
-                strategy_name=strategy_name,
-                order_remark=order_remark,
-            )
+            tracer = get_latency_tracer()
+            with tracer.span('order_submit_call'):
+                self.xt_trader.order_stock_async(
+                    account=self.account,
+                    stock_code=stock_code,
+                    order_type=order_type,
+                    order_volume=order_volume,
+                    price_type=price_type,
+                    price=price,
+                    strategy_name=strategy_name,
+                    order_remark=order_remark,
+                )
+            tracer.mark('order_submit')
             return True
         else:
             return False
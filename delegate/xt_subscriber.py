@@ -1,36 +1,108 @@
 import time
 import datetime
+import inspect
+import os
 import json
 import pickle
 import random
 import threading
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Callable, Optional
 
 import pandas as pd
-from xtquant import xtdata
+try:
+    from xtquant import xtdata
+except ImportError:
+    xtdata = None   # 非 Windows 环境没有 xtquant，行情可以换成 quote_feed 做回放和压测
 
-from delegate.xt_delegate import XtDelegate
+from delegate.base_delegate import BaseDelegate
 from delegate.daily_history import DailyHistoryCache
 from delegate.daily_reporter import DailyReporter
 
+from tools.utils_clock import get_now
 from tools.utils_cache import StockNames, InfoItem, check_is_open_day, get_trading_date_list
 from tools.utils_cache import load_pickle, save_pickle, load_json, save_json
 from tools.utils_ding import BaseMessager
-from tools.utils_mootdx import get_tdxzip_history
-from tools.utils_remote import DataSource, ExitRight, get_daily_history, qmt_quote_to_tick
+from tools.utils_mootdx import get_tdxzip_history, MootdxQuotePoller
+from tools.utils_ticks import TickRingBuffer, DEFAULT_TICK_CAPACITY
+from tools.utils_journal import TickJournalWriter
+from tools.utils_archive import DEFAULT_ARCHIVE_ROOT, archive_tick_journal, archive_tick_lists
+from tools.utils_bars import MinuteBarAggregator
+from tools.utils_executor import LatestSnapshotExecutor
+from tools.utils_quotes import QuoteMatrix, get_changed_codes
+from tools.utils_shards import ShardedEvaluator
+from tools.utils_trace import get_latency_tracer
+from tools.utils_indicators import get_indicator_cache
+from tools.utils_livebar import get_live_bar_cache
+from tools.utils_timer import TimerWheel
+from tools.utils_warmstart import write_snapshot, read_snapshot, pack_histories, unpack_histories, \
+    pack_ring_buffer, unpack_ring_buffer, pack_tick_lists, unpack_tick_lists, pack_minute_bars, unpack_minute_bars
+from tools.utils_remote import DataSource, ExitRight, get_daily_history, get_daily_history_workers, \
+    qmt_quote_to_tick
 
 
 class BaseSubscriber:
     pass
 
 
+# execute_strategy 可以选择接收的额外参数，旧策略的四个参数签名不受影响
+STRATEGY_EXTRA_KWARGS = ['quote_matrix', 'changed_codes', 'shard_intents']
+
+# 数据源中断检查时间点，热启动快照也在这些时间点之后 30 秒保存
+MONITOR_TIME_LIST = [
+    '09:35', '09:45', '09:55', '10:05', '10:15', '10:25',
+    '10:35', '10:45', '10:55', '11:05', '11:15', '11:25',
+    '13:05', '13:15', '13:25', '13:35', '13:45', '13:55',
+    '14:05', '14:15', '14:25', '14:35', '14:45', '14:55',
+]
+
+
+def _get_accepted_kwargs(func: Callable, names: list[str]) -> set[str]:
+    try:
+        params = inspect.signature(func).parameters
+    except (TypeError, ValueError):
+        return set()
+    if any(p.kind == inspect.Parameter.VAR_KEYWORD for p in params.values()):
+        return set(names)
+    return {name for name in names if name in params}
+
+
+# 发布给策略线程的一份行情快照
+class StrategySnapshot:
+    def __init__(
+        self,
+        curr_date: str,
+        curr_time: str,
+        curr_seconds: str,
+        quotes: Dict,
+        quote_matrix: Optional[QuoteMatrix],
+        changed_codes: set[str],
+        trace_origin: float,
+    ):
+        self.curr_date = curr_date
+        self.curr_time = curr_time
+        self.curr_seconds = curr_seconds
+        self.quotes = quotes
+        self.quote_matrix = quote_matrix
+        self.changed_codes = changed_codes
+        self.trace_origin = trace_origin
+
+
+def _merge_snapshots(old_args: tuple, new_args: tuple) -> tuple:
+    # 被覆盖的快照里变动过的代码要留给下一次执行，否则会漏掉；延迟从更早到达的行情开始算
+    old, new = old_args[0], new_args[0]
+    new.changed_codes = old.changed_codes | new.changed_codes
+    new.trace_origin = old.trace_origin
+    return new_args
+
+
 class XtSubscriber(BaseSubscriber):
     def __init__(
         self,
         account_id: str,
         strategy_name: str,
-        delegate: Optional[XtDelegate],
+        delegate: Optional[BaseDelegate],
         path_deal: str,
         path_assets: str,
         execute_strategy: Callable,         # 策略回调函数
@@ -43,6 +115,19 @@ class XtSubscriber(BaseSubscriber):
         ding_messager: BaseMessager = None,
         open_tick_memory_cache: bool = False,
         tick_memory_data_frame: bool = False,
+        tick_memory_ring_buffer: bool = False,  # 预分配环形缓冲记录tick，只保留最近 tick_memory_capacity 条
+        tick_memory_capacity: int = DEFAULT_TICK_CAPACITY,  # 每只票每条约 208 字节，默认约 374KB
+        open_tick_journal: bool = False,        # 盘中 tick 实时追加写入二进制日志，收盘后不再整体转存
+        open_minute_bars: bool = False,         # 盘中实时聚合 1/5/15 分钟线
+        use_strategy_thread: bool = False,      # 策略在独立线程执行最新快照，不阻塞行情回调
+        open_quote_matrix: bool = False,        # 维护全市场行情矩阵，策略签名带 quote_matrix 参数时传入
+        open_latency_trace: bool = False,       # 追踪行情到达至委托提交的各阶段延迟，定期写入 _cache/debug
+        quote_feed: any = None,                 # 替代 xtdata 的行情订阅接口，默认使用 xtdata
+        shard_evaluator: ShardedEvaluator = None,   # 多进程分片执行逐票逻辑，结果以 shard_intents 参数传给策略
+        outside_quote_poller: MootdxQuotePoller = None,   # use_outside_data 时后台轮询 code_list 行情传给策略
+        open_warm_start: bool = False,          # 盘前准备完成和盘中定期保存快照，盘中重启时从快照恢复
+        save_warm_state: Callable = None,       # 返回需要一起保存的额外状态 dict（如股票池），需可转 json
+        load_warm_state: Callable = None,       # 从快照恢复时传入保存的额外状态
         open_today_deal_report: bool = False,   # 每日交易记录报告
         open_today_hold_report: bool = False,   # 每日持仓记录报告
         today_report_show_bank: bool = False,   # 是否显示银行流水（国金QMT会卡死所以默认关闭）
@@ -57,25 +142,53 @@ class XtSubscriber(BaseSubscriber):
         self.path_assets = path_assets
 
         self.execute_strategy = execute_strategy
+        self.strategy_kwargs = _get_accepted_kwargs(execute_strategy, STRATEGY_EXTRA_KWARGS)
         self.execute_interval = execute_interval
         self.before_trade_day = before_trade_day    # 提前准备某些耗时长的任务
         self.near_trade_begin = near_trade_begin    # 有些数据临近开盘才更新，这里保证内存里的数据正确
         self.finish_trade_day = finish_trade_day    # 盘后及时做一些总结汇报入库类的整理工作
         self.messager = ding_messager
+        self.xtdata = xtdata if quote_feed is None else quote_feed
+        self.shard_evaluator = shard_evaluator
+        self.quote_poller = outside_quote_poller
+        self.open_warm_start = open_warm_start
+        self.save_warm_state = save_warm_state
+        self.load_warm_state = load_warm_state
+        if shard_evaluator is not None and 'shard_intents' not in self.strategy_kwargs:
+            print('[警告] execute_strategy 没有 shard_intents 参数，分片执行的结果会被丢弃')
 
         self.lock_quotes_update = threading.Lock()  # 聚合实时打点缓存的锁
+        self.strategy_executor: Optional[LatestSnapshotExecutor] = \
+            LatestSnapshotExecutor(self.run_snapshot, name=strategy_name, merge=_merge_snapshots) \
+            if use_strategy_thread else None
 
         self.cache_quotes: Dict[str, Dict] = {}     # 记录实时的价格信息
+        self.changed_codes: set[str] = set()        # 上次执行策略之后行情有变动的代码
+        self.track_changed = 'changed_codes' in self.strategy_kwargs   # 策略不需要时不比较行情，省掉热路径上的开销
         self.cache_limits: Dict[str, str] = {       # 限制执行次数的缓存集合
             'prev_seconds': '',                     # 限制每秒一次跑策略扫描的缓存
             'prev_minutes': '',                     # 限制每分钟屏幕心跳换行的缓存
         }
+        self.prev_epoch_second = 0                  # 行情推送按整数秒判断是否进入新的一秒
         self.cache_history: Dict[str, pd.DataFrame] = {}    # 记录历史日线行情的信息 { code: DataFrame }
+        self.quote_matrix: Optional[QuoteMatrix] = QuoteMatrix() if open_quote_matrix else None
+        self.tracer = get_latency_tracer()
+        if open_latency_trace:
+            self.tracer.enable(path=f'./_cache/debug/latency_{strategy_name}.jsonl')
 
-        self.open_tick = open_tick_memory_cache
+        self.open_tick = open_tick_memory_cache or open_tick_journal   # 是否需要逐秒记录tick
+        self.open_tick_memory = open_tick_memory_cache
         self.is_ticks_df = tick_memory_data_frame
+        self.is_ticks_ring = tick_memory_ring_buffer
         self.quick_ticks: bool = False                          # 是否开启quick tick模式
-        self.today_ticks: Dict[str, list | pd.DataFrame] = {}   # 记录tick的历史信息
+        self.today_ticks: Dict[str, list | pd.DataFrame] | TickRingBuffer = \
+            TickRingBuffer(tick_memory_capacity) if self.is_ticks_ring else {}  # 记录tick的历史信息
+        self.open_tick_journal = open_tick_journal
+        if self.is_ticks_ring and not open_tick_journal:
+            print(f'[提示] tick 环形缓冲只保留每只票最近 {tick_memory_capacity} 条，收盘存储的也只有这部分，'
+                  f'需要全天 tick 请同时打开 open_tick_journal')
+        self.tick_journal: Optional[TickJournalWriter] = None
+        self.minute_bars: Optional[MinuteBarAggregator] = MinuteBarAggregator() if open_minute_bars else None
 
         self.open_today_deal_report = open_today_deal_report
         self.open_today_hold_report = open_today_hold_report
@@ -83,7 +196,7 @@ class XtSubscriber(BaseSubscriber):
 
         self.code_list = ['000001.SH']  # 默认只有上证指数
         self.stock_names = StockNames()
-        self.last_callback_time = datetime.datetime.now()       # 上次返回quotes 时间
+        self.last_callback_time = get_now()     # 上次返回quotes 时间
 
         # 这个成员变量区别于cache_history，保存全部股票的日线数据550天，cache_history只包含code_list中指定天数数据
         self.history_day_klines : Dict[str, pd.DataFrame] = {}
@@ -110,6 +223,7 @@ class XtSubscriber(BaseSubscriber):
         if self.use_ap_scheduler:
             from apscheduler.schedulers.blocking import BlockingScheduler
             self.scheduler = BlockingScheduler()
+        self.timer_wheel: Optional[TimerWheel] = None   # 盘中每秒执行的任务不走 apscheduler
 
         if self.is_ticks_df:
             self.tick_df_cols = ['time', 'price', 'high', 'low', 'volume', 'amount'] \
@@ -124,50 +238,116 @@ class XtSubscriber(BaseSubscriber):
     # 策略触发主函数
     # -----------------------
     def callback_sub_whole(self, quotes: Dict) -> None:
-        now = datetime.datetime.now()
+        trace_origin = self.tracer.begin()
+        now = get_now()
         self.last_callback_time = now
 
-        curr_date = now.strftime('%Y-%m-%d')
-        curr_time = now.strftime('%H:%M')
+        # 同一秒内的推送只合并行情，时间字符串每秒只格式化一次
+        epoch_second = int(now.timestamp())
+        is_new_second = epoch_second != self.prev_epoch_second
+        if is_new_second:
+            self.prev_epoch_second = epoch_second
+            curr_date = now.strftime('%Y-%m-%d')
+            curr_time = now.strftime('%H:%M')
+            curr_seconds = now.strftime('%S')
 
-        # 每分钟输出一行开头
-        if self.cache_limits['prev_minutes'] != curr_time:
-            self.cache_limits['prev_minutes'] = curr_time
-            print(f'\n[{curr_time}]', end='')
+            # 每分钟输出一行开头
+            if self.cache_limits['prev_minutes'] != curr_time:
+                self.cache_limits['prev_minutes'] = curr_time
+                print(f'\n[{curr_time}]', end='')
 
-        curr_seconds = now.strftime('%S')
         with self.lock_quotes_update:
+            if self.track_changed:
+                self.changed_codes.update(get_changed_codes(self.cache_quotes, quotes))
             self.cache_quotes.update(quotes)  # 合并最新数据
+            if self.quote_matrix is not None:
+                self.quote_matrix.update(quotes)
+        self.tracer.mark('quote_merged')
 
-        # 执行策略
-        if self.cache_limits['prev_seconds'] != curr_seconds:
-            self.cache_limits['prev_seconds'] = curr_seconds
+        if self.minute_bars is not None:
+            self.minute_bars.update_quotes(quotes)  # 每个推送都要计入，不受每秒执行一次的限制
 
+        # 执行策略
+        if is_new_second:
             print_mark = '.' if len(self.cache_quotes) > 0 else 'x'
 
-            if int(curr_seconds) % self.execute_interval == 0:
-                # 更全（默认：先记录再执行）
-                if self.open_tick and (not self.quick_ticks):
-                    self.record_tick_to_memory(self.cache_quotes)
-
-                # str(%Y-%m-%d) str(%H:%M) str(%S) dict(code: quotes)
-                is_clear = self.execute_strategy(curr_date, curr_time, curr_seconds, self.cache_quotes)
-
-                # 更快（先执行再记录）
-                if self.open_tick and self.quick_ticks:
-                    self.record_tick_to_memory(self.cache_quotes)
-
-                if is_clear:
+            if now.second % self.execute_interval == 0:
+                if self.strategy_executor is not None:
+                    # 只发布快照，策略线程来不及处理的旧快照会被覆盖
+                    with self.lock_quotes_update:
+                        snapshot = dict(self.cache_quotes)
+                        matrix = self.quote_matrix.snapshot() if self.quote_matrix is not None else None
+                        changed, self.changed_codes = self.changed_codes, set()
+                    if self.open_tick:
+                        # 在推送线程记录每一个快照，策略线程只执行最新的快照，被覆盖的那些不能漏记
+                        self.record_tick_to_memory(snapshot)
+                    self.strategy_executor.publish(StrategySnapshot(
+                        curr_date, curr_time, curr_seconds, snapshot, matrix, changed, trace_origin))
+                else:
                     with self.lock_quotes_update:
-                        self.cache_quotes.clear()  # execute_strategy() return True means need clear
+                        changed, self.changed_codes = self.changed_codes, set()
+                    self.run_strategy(
+                        curr_date, curr_time, curr_seconds, self.cache_quotes, self.quote_matrix, changed,
+                        trace_origin)
 
                 print(print_mark, end='')  # 每秒钟开始的时候输出一个点
 
+    def run_snapshot(self, snapshot: StrategySnapshot) -> None:
+        self.run_strategy(
+            snapshot.curr_date, snapshot.curr_time, snapshot.curr_seconds, snapshot.quotes, snapshot.quote_matrix,
+            snapshot.changed_codes, snapshot.trace_origin)
+
+    def run_strategy(
+        self,
+        curr_date: str,
+        curr_time: str,
+        curr_seconds: str,
+        quotes: Dict,
+        quote_matrix: Optional[QuoteMatrix] = None,
+        changed_codes: Optional[set[str]] = None,
+        trace_origin: float = 0.0,
+    ) -> None:
+        self.tracer.resume(trace_origin)
+        self.tracer.mark('strategy_start')
+        record_tick = self.open_tick and self.strategy_executor is None   # 策略线程模式已在推送线程记录
+
+        # 更全（默认：先记录再执行）
+        if record_tick and (not self.quick_ticks):
+            self.record_tick_to_memory(quotes)
+
+        kwargs = {}
+        if 'quote_matrix' in self.strategy_kwargs:
+            kwargs['quote_matrix'] = quote_matrix
+        if 'changed_codes' in self.strategy_kwargs:
+            kwargs['changed_codes'] = set() if changed_codes is None else changed_codes
+        if self.shard_evaluator is not None:
+            intents = self.shard_evaluator.evaluate(curr_date, curr_time, curr_seconds, quotes)
+            if 'shard_intents' in self.strategy_kwargs:
+                kwargs['shard_intents'] = intents
+
+        # str(%Y-%m-%d) str(%H:%M) str(%S) dict(code: quotes)
+        is_clear = self.execute_strategy(curr_date, curr_time, curr_seconds, quotes, **kwargs)
+        self.tracer.mark('strategy_end')
+
+        # 更快（先执行再记录）
+        if record_tick and self.quick_ticks:
+            self.record_tick_to_memory(quotes)
+
+        if is_clear:
+            with self.lock_quotes_update:  # execute_strategy() return True means need clear
+                if quotes is self.cache_quotes:
+                    self.cache_quotes.clear()
+                else:
+                    # 快照模式只清掉交给策略的那部分，执行期间新到的行情保留
+                    for code in quotes:
+                        if self.cache_quotes.get(code) is quotes[code]:
+                            del self.cache_quotes[code]
+
     def callback_run_no_quotes(self) -> None:
-        if not check_is_open_day(datetime.datetime.now().strftime('%Y-%m-%d')):
+        if not check_is_open_day(get_now().strftime('%Y-%m-%d')):
             return None
 
-        now = datetime.datetime.now()
+        now = get_now()
         self.last_callback_time = now
 
         curr_date = now.strftime('%Y-%m-%d')
@@ -183,24 +363,33 @@ class XtSubscriber(BaseSubscriber):
             self.cache_limits['prev_seconds'] = curr_seconds
 
             if int(curr_seconds) % self.execute_interval == 0:
-                print('.' if len(self.cache_quotes) > 0 else 'x', end='')  # 每秒钟开始的时候输出一个点
+                quotes = self.quote_poller.snapshot() if self.quote_poller is not None else {}
+                print('.' if len(self.cache_quotes) > 0 or len(quotes) > 0 else 'x', end='')  # 每秒钟开始的时候输出一个点
 
                 # str(%Y-%m-%d), str(%H:%M), str(%S)
-                self.execute_strategy(curr_date, curr_time, curr_seconds, {})
+                self.execute_strategy(curr_date, curr_time, curr_seconds, quotes)
 
     def callback_open_no_quotes(self) -> None:
-        if not check_is_open_day(datetime.datetime.now().strftime('%Y-%m-%d')):
+        if not check_is_open_day(get_now().strftime('%Y-%m-%d')):
             return None
 
         if self.messager is not None:
             self.messager.send_text_as_md(f'[{self.account_id}]{self.strategy_name}:开启')
+        if self.quote_poller is not None:
+            self.quote_poller.set_codes(self.code_list)
+            self.quote_poller.start()
         print('[启动策略]', end='')
 
     def callback_close_no_quotes(self) -> None:
-        if not check_is_open_day(datetime.datetime.now().strftime('%Y-%m-%d')):
+        if not check_is_open_day(get_now().strftime('%Y-%m-%d')):
             return None
 
         print('\n[关闭策略]')
+        if self.quote_poller is not None:
+            self.quote_poller.stop(timeout=1)
+            print(self.quote_poller.summary())
+        if self.timer_wheel is not None:
+            print(self.timer_wheel.summary())
         if self.messager is not None:
             self.messager.send_text_as_md(f'[{self.account_id}]{self.strategy_name}:结束')
 
@@ -208,10 +397,10 @@ class XtSubscriber(BaseSubscriber):
     # 监测主策略执行
     # -----------------------
     def callback_monitor(self):
-        if not check_is_open_day(datetime.datetime.now().strftime('%Y-%m-%d')):
+        if not check_is_open_day(get_now().strftime('%Y-%m-%d')):
             return None
 
-        now = datetime.datetime.now()
+        now = get_now()
 
         if now - self.last_callback_time > datetime.timedelta(minutes=1):
             if self.messager is not None:
@@ -219,7 +408,7 @@ class XtSubscriber(BaseSubscriber):
                     f'[{self.account_id}]{self.strategy_name}:中断\n请检查QMT数据源 ',
                     alert=True,
                 )
-            if len(self.code_list) > 1 and xtdata.get_client():
+            if len(self.code_list) > 1 and self.xtdata.get_client():
                 print('尝试重新订阅行情数据')
                 time.sleep(1)
                 self.resubscribe_tick(notice=True)
@@ -228,35 +417,43 @@ class XtSubscriber(BaseSubscriber):
     # 订阅tick相关
     # -----------------------
     def subscribe_tick(self, resume: bool = False):
-        if not check_is_open_day(datetime.datetime.now().strftime('%Y-%m-%d')):
+        if not check_is_open_day(get_now().strftime('%Y-%m-%d')):
             return None
 
         if self.messager is not None:
             self.messager.send_text_as_md(f'[{self.account_id}]{self.strategy_name}:'
                                           f'{"恢复" if resume else "开启"} {len(self.code_list)}支')
         print('[开启行情订阅]', end='')
-        xtdata.enable_hello = False
-        self.cache_limits['sub_seq'] = xtdata.subscribe_whole_quote(self.code_list, callback=self.callback_sub_whole)
+        self.xtdata.enable_hello = False
+        self.cache_limits['sub_seq'] = self.xtdata.subscribe_whole_quote(
+            self.code_list, callback=self.callback_sub_whole)
 
     def unsubscribe_tick(self, pause: bool = False):
-        if not check_is_open_day(datetime.datetime.now().strftime('%Y-%m-%d')):
+        if not check_is_open_day(get_now().strftime('%Y-%m-%d')):
             return None
 
         if 'sub_seq' in self.cache_limits:
-            xtdata.unsubscribe_quote(self.cache_limits['sub_seq'])
+            self.xtdata.unsubscribe_quote(self.cache_limits['sub_seq'])
             print('\n[结束行情订阅]')
+            if self.strategy_executor is not None:
+                print(self.strategy_executor.summary())
+            if self.shard_evaluator is not None:
+                print(self.shard_evaluator.summary())
+            if self.tracer.enabled:
+                self.tracer.dump()
             if self.messager is not None:
                 self.messager.send_text_as_md(f'[{self.account_id}]{self.strategy_name}:'
                                               f'{"暂停" if pause else "关闭"}')
 
     def resubscribe_tick(self, notice: bool = False):
-        if not check_is_open_day(datetime.datetime.now().strftime('%Y-%m-%d')):
+        if not check_is_open_day(get_now().strftime('%Y-%m-%d')):
             return None
 
         if 'sub_seq' in self.cache_limits:
-            xtdata.unsubscribe_quote(self.cache_limits['sub_seq'])
-        self.cache_limits['sub_seq'] = xtdata.subscribe_whole_quote(self.code_list, callback=self.callback_sub_whole)
-        xtdata.enable_hello = False
+            self.xtdata.unsubscribe_quote(self.cache_limits['sub_seq'])
+        self.cache_limits['sub_seq'] = self.xtdata.subscribe_whole_quote(
+            self.code_list, callback=self.callback_sub_whole)
+        self.xtdata.enable_hello = False
 
         if self.messager is not None and notice:
             self.messager.send_text_as_md(f'[{self.account_id}]{self.strategy_name}:'
@@ -269,13 +466,37 @@ class XtSubscriber(BaseSubscriber):
         extend = 10 - len(self.code_list)
         if extend > 0:
             self.code_list.extend(self.__extend_codes[:extend])  # 防止数据太少长时间不返回数据导致断流
+        if self.quote_poller is not None:
+            self.quote_poller.set_codes(self.code_list)
 
     # -----------------------
     # 盘中实时的tick历史
     # -----------------------
+    def get_tick_journal_path(self, trade_date: str) -> str:
+        return f'./_cache/debug/tick_journal_{self.strategy_name}_{trade_date}.bin'
+
+    def record_tick_to_journal(self, quotes):
+        if self.tick_journal is None:
+            trade_date = get_now().strftime('%Y%m%d')
+            self.tick_journal = TickJournalWriter(self.get_tick_journal_path(trade_date), trade_date)
+        self.tick_journal.append_quotes(quotes)
+
+    def close_tick_journal(self):
+        if self.tick_journal is not None:
+            self.tick_journal.close()
+            print(f"当日tick日志已存储为 {self.tick_journal.path} 文件")
+            self.tick_journal = None
+
     def record_tick_to_memory(self, quotes):
+        if self.open_tick_journal:
+            self.record_tick_to_journal(quotes)
+        if not self.open_tick_memory:
+            return
+
         # 记录 tick 历史
-        if self.is_ticks_df:
+        if self.is_ticks_ring:
+            self.today_ticks.append_quotes(quotes)
+        elif self.is_ticks_df:
             for code in quotes:
                 quote = quotes[code]
                 tick = qmt_quote_to_tick(quote)
@@ -305,18 +526,31 @@ class XtSubscriber(BaseSubscriber):
                 ])
 
     def clean_ticks_history(self):
-        if not check_is_open_day(datetime.datetime.now().strftime('%Y-%m-%d')):
+        if not check_is_open_day(get_now().strftime('%Y-%m-%d')):
             return None
 
+        self.close_tick_journal()  # 前一天没有正常收尾的日志
         self.today_ticks.clear()
-        self.today_ticks = {}
+        if not self.is_ticks_ring:
+            self.today_ticks = {}
         print(f"已清除tick缓存")
 
     def save_tick_history(self):
-        if not check_is_open_day(datetime.datetime.now().strftime('%Y-%m-%d')):
+        if not check_is_open_day(get_now().strftime('%Y-%m-%d')):
             return None
 
-        if self.is_ticks_df:
+        if self.open_tick_journal:
+            self.close_tick_journal()  # 盘中已经实时落盘，只需要写入索引
+            self.archive_tick_history()
+            return
+
+        if self.is_ticks_ring:
+            json_file = f'./_cache/debug/tick_history_{self.strategy_name}.json'
+            with open(json_file, 'w') as file:
+                json.dump(self.today_ticks.to_lists(), file, indent=4)
+            print(f"当日tick数据已存储为 {json_file} 文件")
+            self.archive_tick_history()
+        elif self.is_ticks_df:
             pickle_file = f'./_cache/debug/tick_history_{self.strategy_name}.pkl'
             with open(pickle_file, 'wb') as f:
                 pickle.dump(self.today_ticks, f)
@@ -326,6 +560,25 @@ class XtSubscriber(BaseSubscriber):
             with open(json_file, 'w') as file:
                 json.dump(self.today_ticks, file, indent=4)
             print(f"当日tick数据已存储为 {json_file} 文件")
+            self.archive_tick_history()
+
+    def archive_tick_history(self):
+        # 按天追加到归档目录，方便按代码和日期范围查询，DataFrame 模式不归档
+        trade_date = get_now().strftime('%Y%m%d')
+        root = f'{DEFAULT_ARCHIVE_ROOT}/{self.strategy_name}'
+        try:
+            if self.open_tick_journal:
+                path = self.get_tick_journal_path(trade_date)
+                if not os.path.exists(path):
+                    return
+                path = archive_tick_journal(path, root)
+            elif self.is_ticks_ring:
+                path = archive_tick_lists(self.today_ticks.to_lists(), trade_date, root)
+            else:
+                path = archive_tick_lists(self.today_ticks, trade_date, root)
+            print(f"当日tick数据已归档为 {path} 文件")
+        except Exception as e:
+            print('tick归档失败：', e)
 
     # -----------------------
     # 盘前下载数据缓存
@@ -343,26 +596,27 @@ class XtSubscriber(BaseSubscriber):
         t0 = datetime.datetime.now()
         print(f'Downloading {len(target_codes)} stocks:')
 
+        def _download_one(code: str):
+            return code, get_daily_history(code, start, end, columns=columns, adjust=adjust, data_source=data_source)
+
         group_size = 200
         down_count = 0
-        for i in range(0, len(target_codes), group_size):
-            sub_codes = [sub_code for sub_code in target_codes[i:i + group_size]]
-            print(i, sub_codes)  # 已更新数量
-
-            # TUSHARE 批量下载限制总共8000天条数据，所以暂时弃用
-            # if data_source == DataSource.TUSHARE:
-            #     # 使用 TUSHARE 数据源批量下载
-            #     dfs = get_ts_daily_histories(sub_codes, start, end, columns)
-            #     self.cache_history.update(dfs)
-            #     time.sleep(0.1)
-
-            # 默认使用 AKSHARE 数据源
-            for code in sub_codes:
-                df = get_daily_history(code, start, end, columns=columns, adjust=adjust, data_source=data_source)
-                time.sleep(0.5)
-                if df is not None:
-                    self.cache_history[code] = df
-                    down_count += 1
+        with ThreadPoolExecutor(max_workers=get_daily_history_workers(data_source)) as executor:
+            for i in range(0, len(target_codes), group_size):
+                sub_codes = [sub_code for sub_code in target_codes[i:i + group_size]]
+                print(i, sub_codes)  # 已更新数量
+
+                # TUSHARE 批量下载限制总共8000天条数据，所以暂时弃用
+                # if data_source == DataSource.TUSHARE:
+                #     # 使用 TUSHARE 数据源批量下载
+                #     dfs = get_ts_daily_histories(sub_codes, start, end, columns)
+                #     self.cache_history.update(dfs)
+
+                # 默认使用 AKSHARE 数据源，限速由 RequestGovernor 统一控制
+                for code, df in executor.map(_download_one, sub_codes):
+                    if df is not None:
+                        self.cache_history[code] = df
+                        down_count += 1
 
         print(f'Download completed with {down_count} stock histories succeed!')
         t1 = datetime.datetime.now()
@@ -451,7 +705,7 @@ class XtSubscriber(BaseSubscriber):
         end: str,
         data_source: DataSource,
     ):
-        if not check_is_open_day(datetime.datetime.now().strftime('%Y-%m-%d')):
+        if not check_is_open_day(get_now().strftime('%Y-%m-%d')):
             return None
 
         hc = DailyHistoryCache()
@@ -467,10 +721,10 @@ class XtSubscriber(BaseSubscriber):
     # 盘后报告总结
     # -----------------------
     def daily_summary(self):
-        if not check_is_open_day(datetime.datetime.now().strftime('%Y-%m-%d')):
+        if not check_is_open_day(get_now().strftime('%Y-%m-%d')):
             return None
 
-        curr_date = datetime.datetime.now().strftime('%Y-%m-%d')
+        curr_date = get_now().strftime('%Y-%m-%d')
 
         try:
             if self.open_today_deal_report:
@@ -489,15 +743,107 @@ class XtSubscriber(BaseSubscriber):
             print('Report failed: ', e)
             traceback.print_exc()
 
+    # -----------------------
+    # 热启动快照
+    # -----------------------
+    def get_warm_start_path(self) -> str:
+        return f'./_cache/debug/warm_start_{self.strategy_name}.bin'
+
+    def save_warm_start(self) -> None:
+        if not self.open_warm_start:
+            return
+        t0 = time.perf_counter()
+        try:
+            meta = {
+                'strategy_name': self.strategy_name,
+                'trade_date': self.curr_trade_date,
+                'saved_at': get_now().strftime('%Y-%m-%d %H:%M:%S'),
+                'code_list': self.code_list,
+                'extra': self.save_warm_state() if self.save_warm_state is not None else None,
+                'ticks': None,
+                'bars': None,
+            }
+            meta['histories'], arrays = pack_histories(self.cache_history)
+
+            # tick 日志模式当天 tick 已经在磁盘上，DataFrame 模式不保存
+            with self.lock_quotes_update:
+                if self.open_tick_memory and not self.open_tick_journal:
+                    if self.is_ticks_ring:
+                        meta['ticks'], ring_arrays = pack_ring_buffer(self.today_ticks)
+                        arrays.update({name: arr.copy() for name, arr in ring_arrays.items()})
+                    elif not self.is_ticks_df:
+                        meta['ticks'] = 'list'
+                        arrays['tick_records'] = pack_tick_lists(self.today_ticks, self.curr_trade_date)
+                if self.minute_bars is not None:
+                    meta['bars'], bar_arrays = pack_minute_bars(self.minute_bars)
+                    arrays.update({name: arr.copy() for name, arr in bar_arrays.items()})
+
+            size = write_snapshot(self.get_warm_start_path(), meta, arrays)
+            print(f'\n[热启动快照] {len(self.code_list)}支 历史{len(self.cache_history)}支 '
+                  f'{size / 1024 / 1024:.1f}MB {(time.perf_counter() - t0) * 1000:.0f}ms', end='')
+        except Exception as e:
+            print('[热启动快照] 保存失败：', e)
+            traceback.print_exc()
+
+    def load_warm_start(self) -> bool:
+        # 只恢复同一策略当天的快照，成功返回 True
+        if not self.open_warm_start:
+            return False
+        t0 = time.perf_counter()
+        try:
+            snapshot = read_snapshot(self.get_warm_start_path())
+            if snapshot is None:
+                return False
+            meta, arrays = snapshot
+            today = get_now().strftime('%Y-%m-%d')
+            if meta['strategy_name'] != self.strategy_name or meta['trade_date'] != today:
+                return False
+
+            self.cache_history = unpack_histories(meta['histories'], arrays)
+            if meta['ticks'] == 'list':
+                self.today_ticks = unpack_tick_lists(arrays['tick_records'])
+            elif meta['ticks'] is not None and self.is_ticks_ring:
+                self.today_ticks = unpack_ring_buffer(meta['ticks'], arrays)
+            if meta['bars'] is not None and self.minute_bars is not None:
+                unpack_minute_bars(self.minute_bars, meta['bars'], arrays)
+            if self.load_warm_state is not None and meta['extra'] is not None:
+                self.load_warm_state(meta['extra'])
+
+            self.code_list = meta['code_list']
+            if self.quote_poller is not None:
+                self.quote_poller.set_codes(self.code_list)
+            self.curr_trade_date = today
+            get_indicator_cache().build(self.cache_history)
+        except Exception as e:
+            print('[热启动快照] 恢复失败，重新执行盘前准备：', e)
+            traceback.print_exc()
+            return False
+
+        print(f'[热启动快照] 已恢复 {meta["saved_at"]} 的状态：{len(self.code_list)}支 '
+              f'历史{len(self.cache_history)}支 {(time.perf_counter() - t0) * 1000:.0f}ms')
+        if self.messager is not None:
+            self.messager.send_text_as_md(f'[{self.account_id}]{self.strategy_name}:'
+                                          f'热启动恢复{len(self.code_list)}支')
+        return True
+
     # -----------------------
     # 定时器
     # -----------------------
     def before_trade_day_wrapper(self):
-        if not check_is_open_day(datetime.datetime.now().strftime('%Y-%m-%d')):
+        if not check_is_open_day(get_now().strftime('%Y-%m-%d')):
             return None
 
         self.cache_quotes.clear()
+        if self.quote_matrix is not None:
+            self.quote_matrix.clear()
+        self.changed_codes.clear()
+        if self.quote_poller is not None:
+            self.quote_poller.clear()
+        if self.shard_evaluator is not None:
+            self.shard_evaluator.reset()
         self.cache_history.clear()
+        get_indicator_cache().clear()
+        get_live_bar_cache().clear()
         self.today_ticks.clear()
         self.history_day_klines.clear()
         self.code_list = ['000001.SH']  # 默认只有上证指数
@@ -505,20 +851,22 @@ class XtSubscriber(BaseSubscriber):
 
         if self.before_trade_day is not None:
             self.before_trade_day()
-            self.curr_trade_date = datetime.datetime.now().strftime('%Y-%m-%d')
+            self.curr_trade_date = get_now().strftime('%Y-%m-%d')
 
     def near_trade_begin_wrapper(self):
-        if not check_is_open_day(datetime.datetime.now().strftime('%Y-%m-%d')):
+        if not check_is_open_day(get_now().strftime('%Y-%m-%d')):
             return None
 
         if self.near_trade_begin is not None:
             self.near_trade_begin()
             if self.before_trade_day is None: #没有设置before_trade_day 情况
-                self.curr_trade_date = datetime.datetime.now().strftime('%Y-%m-%d')
+                self.curr_trade_date = get_now().strftime('%Y-%m-%d')
             print(f'今日盘前准备工作已完成。')
+        get_indicator_cache().build(self.cache_history)    # 卖出指标按昨天为止的历史预先递推
+        self.save_warm_start()
 
     def finish_trade_day_wrapper(self):
-        if not check_is_open_day(datetime.datetime.now().strftime('%Y-%m-%d')):
+        if not check_is_open_day(get_now().strftime('%Y-%m-%d')):
             return None
 
         if self.finish_trade_day is not None:
@@ -527,47 +875,30 @@ class XtSubscriber(BaseSubscriber):
     # 检查是否完成盘前准备
     # @check_open_day
     def check_before_finished(self):
-        if not check_is_open_day(datetime.datetime.now().strftime('%Y-%m-%d')):
+        if not check_is_open_day(get_now().strftime('%Y-%m-%d')):
             return None
         if (
             self.before_trade_day is not None or self.near_trade_begin is not None
         ) and (
-            self.curr_trade_date != datetime.datetime.now().strftime("%Y-%m-%d")
+            self.curr_trade_date != get_now().strftime("%Y-%m-%d")
             or len(self.cache_history) < 1
         ):
-            print('[ERROR]盘前准备未完成，尝试重新执行盘前函数')
-            self.before_trade_day_wrapper()
-            self.near_trade_begin_wrapper()
+            if not self.load_warm_start():
+                print('[ERROR]盘前准备未完成，尝试重新执行盘前函数')
+                self.before_trade_day_wrapper()
+                self.near_trade_begin_wrapper()
         print(f'当前交易日：[{self.curr_trade_date}]。')
 
     def start_scheduler_without_qmt_data(self):
         run_time_ranges = [
-            # 上午时间段: 09:15:00 到 11:29:59
-            {
-                'hour': '9',
-                'minute': '15-59',
-                'second': '0-59'  # 9:15到9:59的每秒
-            },
-            {
-                'hour': '10',
-                'minute': '0-59',
-                'second': '0-59'  # 10:00到10:59的每秒
-            },
-            {
-                'hour': '11',
-                'minute': '0-29',
-                'second': '0-59'  # 11:00到11:29的每秒（包含59秒）
-            },
-            # 下午时间段: 13:00:00 到 14:59:59
-            {
-                'hour': '13-14',
-                'minute': '0-59',
-                'second': '0-59'  # 13:00到14:59的每秒
-            }
+            ('09:15:00', '11:30:00'),   # 上午时间段: 09:15:00 到 11:29:59
+            ('13:00:00', '15:00:00'),   # 下午时间段: 13:00:00 到 14:59:59
         ]
 
-        for idx, cron_params in enumerate(run_time_ranges):
-            self.scheduler.add_job(self.callback_run_no_quotes, 'cron', **cron_params, id=f"run_{idx}")
+        # 每秒准点执行，apscheduler 只负责下面每天固定时刻的任务
+        self.timer_wheel = TimerWheel(name=self.strategy_name)
+        self.timer_wheel.add_job(self.callback_run_no_quotes, interval=1.0, windows=run_time_ranges)
+        self.timer_wheel.start()
 
         if self.before_trade_day is not None:   # 03:00 ~ 06:59
             random_hour = random.randint(0, 3) + 3
@@ -586,6 +917,21 @@ class XtSubscriber(BaseSubscriber):
         self.scheduler.add_job(self.callback_close_no_quotes, 'cron', hour=15, minute=0, second=0)
         self.scheduler.add_job(self.daily_summary, 'cron', hour=15, minute=1, second=0)
 
+        if self.open_warm_start:
+            for save_time in MONITOR_TIME_LIST:
+                [hr, mn] = save_time.split(':')
+                self.scheduler.add_job(self.save_warm_start, 'cron', hour=hr, minute=mn, second=30)
+
+        # 盘中重启时有当天的快照直接恢复，否则补做盘前准备
+        now = get_now()
+        if '08:55' < now.strftime('%H:%M') < '15:30':
+            self.check_before_finished()
+
+        # 盘中启动时当天开盘的定时任务已经错过，直接开启行情轮询
+        now_time = now.strftime('%H:%M:%S')
+        if any(start <= now_time < end for start, end in run_time_ranges):
+            self.callback_open_no_quotes()
+
         try:
             print('[定时器已启动]')
             self.scheduler.start()
@@ -594,6 +940,9 @@ class XtSubscriber(BaseSubscriber):
         except Exception as e:
             print('策略定时器出错：', e)
         finally:
+            self.timer_wheel.stop(timeout=1)
+            if self.quote_poller is not None:
+                self.quote_poller.stop(timeout=1)
             self.delegate.shutdown()
 
     def start_scheduler(self):
@@ -630,15 +979,9 @@ class XtSubscriber(BaseSubscriber):
                 None,
             ])
 
-        # 数据源中断检查时间点
-        monitor_time_list = [
-            '09:35', '09:45', '09:55', '10:05', '10:15', '10:25',
-            '10:35', '10:45', '10:55', '11:05', '11:15', '11:25',
-            '13:05', '13:15', '13:25', '13:35', '13:45', '13:55',
-            '14:05', '14:15', '14:25', '14:35', '14:45', '14:55',
-        ]
+        monitor_time_list = MONITOR_TIME_LIST
 
-        temp_now = datetime.datetime.now()
+        temp_now = get_now()
         temp_date = temp_now.strftime('%Y-%m-%d')
         temp_time = temp_now.strftime('%H:%M')
 
@@ -658,10 +1001,16 @@ class XtSubscriber(BaseSubscriber):
                 [hr, mn] = monitor_time.split(':')
                 self.scheduler.add_job(self.callback_monitor, 'cron', hour=hr, minute=mn)
 
-            # 盘中执行需要补齐
+            if self.open_warm_start:
+                for monitor_time in monitor_time_list:
+                    [hr, mn] = monitor_time.split(':')
+                    self.scheduler.add_job(self.save_warm_start, 'cron', hour=hr, minute=mn, second=30)
+
+            # 盘中执行需要补齐，有当天的快照时直接恢复
             if '08:05' < temp_time < '15:30' and check_is_open_day(temp_date):
-                self.before_trade_day_wrapper()
-                self.near_trade_begin_wrapper()
+                if not self.load_warm_start():
+                    self.before_trade_day_wrapper()
+                    self.near_trade_begin_wrapper()
                 if '09:15' < temp_time < '11:30' or '13:00' <= temp_time < '14:57':
                     self.subscribe_tick()  # 重启时如果在交易时间则订阅Tick
 
@@ -714,7 +1063,7 @@ class XtSubscriber(BaseSubscriber):
     # 检查是否交易日
     # -----------------------
     def prev_check_open_day(self):
-        now = datetime.datetime.now()
+        now = get_now()
         curr_date = now.strftime('%Y-%m-%d')
         curr_time = now.strftime('%H:%M')
         print(f'[{curr_time}]', end='')
@@ -725,7 +1074,7 @@ class XtSubscriber(BaseSubscriber):
 # -----------------------
 # 持仓自动发现
 # -----------------------
-def update_position_held(lock: threading.Lock, delegate: XtDelegate, path: str):
+def update_position_held(lock: threading.Lock, delegate: BaseDelegate, path: str):
     with lock:
         positions = delegate.check_positions()
         held_info = load_json(path)
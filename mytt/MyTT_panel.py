@@ -0,0 +1,121 @@
+# MyTT 面板版本：S 为 代码 × K线 的二维数组，每行一只票，按行计算，结果与 MyTT 单票逐行计算一致
+# 历史长短不一时靠右对齐、左侧补 NAN，补位部分的行为与单票序列开头的 NAN 相同
+# EMA/SMA 按 pandas ewm(adjust=False) 的递推逐列计算，MA/SUM 直接用 pandas 的滚动算法逐行计算，HHV/LLV 按列平移后逐个累积
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from mytt.MyTT import ABS, MAX, MIN, IF    # 逐元素的函数二维直接可用
+
+
+# ------------------------工具函数---------------------------------------------
+
+def _rolling(S, N, func):  # 对每行长度为N的滑动窗口依次用 func 累积，按列平移，前N-1列为NAN，只用于结果与顺序无关的 max/min
+    S = np.asarray(S, dtype=np.float64)
+    res = np.full(S.shape, np.nan)
+    width = S.shape[1] - N + 1
+    if width > 0:
+        acc = S[:, :width].copy()
+        for k in range(1, N):
+            func(acc, S[:, k:k + width], out=acc)
+        res[:, N - 1:] = acc
+    return res
+
+
+def REF(S, N=1):  # 对序列整体下移动N,返回序列(shift后会产生NAN)
+    S = np.asarray(S, dtype=np.float64)
+    res = np.full(S.shape, np.nan)
+    if N < S.shape[1]:
+        res[:, N:] = S[:, :S.shape[1] - N]
+    return res
+
+
+def HHV(S, N):  # 最近N天最高值
+    return _rolling(S, N, np.maximum)
+
+
+def LLV(S, N):  # 最近N天最低值
+    return _rolling(S, N, np.minimum)
+
+
+def _pandas_rolling(S, N):  # 每行作为 DataFrame 的一列，用 pandas 同一套带补偿的滚动求和，结果与单票逐位相同
+    S = np.asarray(S, dtype=np.float64)
+    return pd.DataFrame(S.T).rolling(N)
+
+
+def SUM(S, N):  # 对序列求N天累计和
+    return _pandas_rolling(S, N).sum().to_numpy().T
+
+
+def COUNT(S, N):  # 最近N天满足S_BOO的天数
+    return SUM(S, N)
+
+
+def MA(S, N):  # 求序列的N日简单移动平均值
+    return _pandas_rolling(S, N).mean().to_numpy().T
+
+
+def _ewm(S, com):  # pandas ewm(adjust=False, ignore_na=False) 的递推，每次处理一列
+    S = np.asarray(S, dtype=np.float64)
+    res = np.full(S.shape, np.nan)
+    rows = ~np.isnan(S).all(axis=1)     # 整行都是 NAN 的不参与递推
+    if S.shape[1] == 0 or not rows.any():
+        return res
+    X = S[rows]
+    # 开头的 NAN 用第一个有效值填充，递推到第一个有效值时的状态不变，最后再把开头还原成 NAN
+    first = np.argmax(~np.isnan(X), axis=1)
+    leading = np.arange(X.shape[1])[None, :] < first[:, None]
+    X = np.where(leading, X[np.arange(X.shape[0]), first][:, None], X)
+
+    alpha = 1. / (1. + com)     # 与 pandas 一样由 com 求 alpha，保持相同的舍入
+    old_wt_factor = 1. - alpha
+    out = np.empty(X.shape)
+    weighted = X[:, 0].copy()
+    old_wt = np.ones(X.shape[0])
+    out[:, 0] = weighted
+    is_obs = ~np.isnan(X)
+    clean = is_obs.all(axis=0)      # 全部行都有值的列走快速分支
+    for i in range(1, X.shape[1]):
+        cur = X[:, i]
+        if clean[i] and clean[i - 1]:
+            # 上一列全部有值时各行都已开始递推且 old_wt 为 1
+            mixed = (old_wt_factor * weighted + alpha * cur) / (old_wt_factor + alpha)
+            weighted = np.where(weighted != cur, mixed, weighted)
+        else:
+            started = ~np.isnan(weighted)
+            old_wt = np.where(started, old_wt * old_wt_factor, old_wt)
+            with np.errstate(invalid='ignore'):
+                mixed = (old_wt * weighted + alpha * cur) / (old_wt + alpha)
+            weighted = np.where(started & is_obs[:, i] & (weighted != cur), mixed, weighted)
+            old_wt = np.where(started & is_obs[:, i], 1., old_wt)
+            weighted = np.where(~started & is_obs[:, i], cur, weighted)
+        out[:, i] = weighted
+    out[leading] = np.nan
+    res[rows] = out
+    return res
+
+
+def EMA(S, N):  # 指数移动平均 alpha=2/(span+1)，pandas 换算成 com=(span-1)/2
+    return _ewm(S, (N - 1) / 2)
+
+
+def SMA(S, N, M=1):  # 中国式的SMA alpha=M/N，pandas 换算成 com=(1-alpha)/alpha
+    alpha = M / N
+    return _ewm(S, (1 - alpha) / alpha)
+
+
+def SLOPE(S, N):  # 返S序列N周期回线性回归斜率
+    # 所有完整窗口一次 polyfit，与单票逐窗口 polyfit 的结果逐位相同
+    S = np.asarray(S, dtype=np.float64)
+    res = np.full(S.shape, np.nan)
+    if S.shape[1] >= N:
+        W = sliding_window_view(S, N, axis=1)
+        valid = ~np.isnan(SUM(S, N)[:, N - 1:])
+        if valid.any():
+            res[:, N - 1:][valid] = np.polyfit(np.arange(N), W[valid].T, deg=1)[0]
+    return res
+
+
+def ATAN(S):  # 求S的反正切值
+    return np.arctan(S)
@@ -1,4 +1,10 @@
 import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from tools.utils_governor import RequestGovernor, RequestSource, SourcePolicy
 
 
 ts_token_index = 0
@@ -23,8 +29,176 @@ def get_tushare_pro(debugging=False):
     return None
 
 
+# 单个 token 单个接口每分钟的调用上限，2000积分档为 500次/分钟，按自己账号的积分调整
+TS_MINUTE_QUOTA = 500
+TS_QUOTA_WINDOW = 60.0
+TS_TOKEN_CONCURRENCY = 2    # 单个 token 同时在途的请求数
+
+
+class _TokenClient:
+    def __init__(self, token: str, label: str, api):
+        self.token = token
+        self.label = label
+        self.api = api
+        self.history: dict[str, deque] = {}    # endpoint -> 最近一个窗口内的调用时间
+        self.in_flight = 0
+        self.calls = 0
+        self.failures = 0
+
+    def prune(self, endpoint: str, now: float, window: float) -> deque:
+        q = self.history.setdefault(endpoint, deque())
+        while len(q) > 0 and now - q[0] >= window:
+            q.popleft()
+        return q
+
+
+# 每个 token 常驻一个初始化好的 pro client，按 token x 接口统计每分钟调用次数，
+# 请求调度到余量最多的 token 上，批量下载时可以叠加所有 token 的额度并发执行
+class TushareClientPool:
+    def __init__(
+        self,
+        tokens: list = None,                    # [[token, label], ...] 默认读取 credentials.TUSHARE_TOKEN
+        minute_quota: int = TS_MINUTE_QUOTA,
+        endpoint_quotas: dict[str, int] = None, # 个别接口有单独的额度，例如 {'stk_factor': 200}
+        token_concurrency: int = TS_TOKEN_CONCURRENCY,
+        client_factory: Callable = None,        # token -> pro client，测试时注入
+        window: float = TS_QUOTA_WINDOW,
+    ):
+        if tokens is None:
+            from credentials import TUSHARE_TOKEN
+            tokens = TUSHARE_TOKEN
+        assert len(tokens) > 0, '至少需要配置一个 tushare token'
+
+        if client_factory is None:
+            import tushare as ts
+            client_factory = lambda token: ts.pro_api(token)
+
+        self.minute_quota = minute_quota
+        self.endpoint_quotas = endpoint_quotas if endpoint_quotas is not None else {}
+        self.token_concurrency = max(1, token_concurrency)
+        self.window = window
+
+        self.clients = [_TokenClient(t[0], t[1] if len(t) > 1 else str(i), client_factory(t[0]))
+                        for i, t in enumerate(tokens)]
+        self.condition = threading.Condition()
+
+    @property
+    def max_workers(self) -> int:
+        return len(self.clients) * self.token_concurrency
+
+    def governor_policy(self) -> SourcePolicy:
+        # 总额度按 token 数叠加，每分钟额度由连接池控制，Governor 只负责并发、熔断和统计
+        # 由 get_tushare_pool() 创建全局连接池时配置一次，构造连接池本身不改全局的 Governor
+        return SourcePolicy(rate=1e6, burst=self.max_workers, max_concurrency=self.max_workers)
+
+    def quota(self, endpoint: str) -> int:
+        return self.endpoint_quotas.get(endpoint, self.minute_quota)
+
+    def _headroom(self, client: _TokenClient, endpoints: list[str], now: float) -> int:
+        return min(self.quota(ep) - len(client.prune(ep, now, self.window)) for ep in endpoints)
+
+    def _acquire(self, endpoints: list[str]) -> _TokenClient:
+        with self.condition:
+            while True:
+                now = time.monotonic()
+                best = None
+                best_headroom = 0
+                for client in self.clients:
+                    if client.in_flight >= self.token_concurrency:
+                        continue
+                    headroom = self._headroom(client, endpoints, now)    # 在途请求已计入 history
+                    if headroom > best_headroom:
+                        best = client
+                        best_headroom = headroom
+
+                if best is not None:
+                    for ep in endpoints:
+                        best.history[ep].append(now)
+                    best.in_flight += 1
+                    best.calls += 1
+                    return best
+
+                # 额度全部用尽时等到最早的一次调用滑出窗口，或者有请求完成
+                wait = self.window
+                for client in self.clients:
+                    for ep in endpoints:
+                        q = client.history.get(ep)
+                        if q is not None and len(q) >= self.quota(ep):
+                            wait = min(wait, q[0] + self.window - now)
+                self.condition.wait(timeout=max(wait, 0.01))
+
+    def _release(self, client: _TokenClient, success: bool) -> None:
+        with self.condition:
+            client.in_flight -= 1
+            if not success:
+                client.failures += 1
+            self.condition.notify()
+
+    def run(self, endpoints: list[str], func: Callable):
+        # func 接收分配到的 pro client，endpoints 为这次调用实际消耗额度的接口
+        client = self._acquire(endpoints)
+        success = False
+        try:
+            ans = RequestGovernor().call(RequestSource.TUSHARE, func, client.api)
+            success = True
+            return ans
+        finally:
+            self._release(client, success)
+
+    def call(self, endpoint: str, **kwargs):
+        return self.run([endpoint], lambda api: getattr(api, endpoint)(**kwargs))
+
+    def pro_bar(self, **kwargs):
+        import tushare as ts
+        # 通用行情接口的日线复权会额外请求一次复权因子
+        endpoints = ['daily', 'adj_factor'] if kwargs.get('adj') else ['daily']
+        return self.run(endpoints, lambda api: ts.pro_bar(api=api, **kwargs))
+
+    def map(self, func: Callable, args_list: list) -> list:
+        # 并发执行 func(arg)，func 内部通过 call / pro_bar 使用连接池，失败的结果为 None
+        def _safe(arg):
+            try:
+                return func(arg)
+            except Exception as e:
+                print(f'[TUSHARE] {arg} failed: {e}')
+                return None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(_safe, args_list))
+
+    def remaining(self) -> dict[str, dict[str, int]]:
+        # 各 token 在当前窗口内每个接口的剩余调用次数
+        ans = {}
+        with self.condition:
+            now = time.monotonic()
+            for client in self.clients:
+                ans[client.label] = {
+                    ep: self.quota(ep) - len(client.prune(ep, now, self.window))
+                    for ep in list(client.history.keys())
+                }
+        return ans
+
+    def summary(self) -> str:
+        with self.condition:
+            return ' '.join(f'[{c.label}] calls:{c.calls} fail:{c.failures}' for c in self.clients)
+
+
+ts_client_pool: Optional[TushareClientPool] = None
+ts_client_pool_lock = threading.Lock()
+
+
+def get_tushare_pool() -> TushareClientPool:
+    global ts_client_pool
+    with ts_client_pool_lock:
+        if ts_client_pool is None:
+            ts_client_pool = TushareClientPool()
+            RequestGovernor().configure(RequestSource.TUSHARE, ts_client_pool.governor_policy())
+        return ts_client_pool
+
+
 if __name__ == '__main__':
+    pool = get_tushare_pool()
     for i in range(10):
-        pro = get_tushare_pro(debugging=True)
-        df = pro.daily(ts_code="000001.SZ", start_date='20230606', end_date='20230610')
+        df = pool.call('daily', ts_code="000001.SZ", start_date='20230606', end_date='20230610')
         print(df)
+    print(pool.remaining())
@@ -4,8 +4,10 @@ from credentials import *
 
 from tools.utils_basic import logging_init, is_symbol, debug
 from tools.utils_cache import *
+from tools.utils_clock import get_now
 from tools.utils_ding import DingMessager
-from tools.utils_remote import DataSource, ExitRight, concat_ak_quote_dict
+from tools.utils_remote import DataSource, ExitRight
+from tools.utils_livebar import get_live_bar_cache
 
 from delegate.xt_subscriber import XtSubscriber, update_position_held
 
@@ -107,7 +109,7 @@ def before_trade_day() -> None:
     my_suber.update_code_list(my_pool.get_code_list() + hold_list)
 
     # prepare_history() -> None:
-    now = datetime.datetime.now()
+    now = get_now()
     for i in range(15, 30):
         delete_file(PATH_INFO.format((now - datetime.timedelta(days=i)).strftime('%Y_%m_%d')))
     cache_path = PATH_INFO.format(now.strftime('%Y_%m_%d'))
@@ -132,7 +134,7 @@ def before_trade_day() -> None:
 
 
 def near_trade_begin():
-    now = datetime.datetime.now()
+    now = get_now()
     start = get_prev_trading_date(now, PoolConf.day_count)
     end = get_prev_trading_date(now, 1)
 
@@ -141,13 +143,14 @@ def near_trade_begin():
     history_list += [position.stock_code for position in positions if is_symbol(position.stock_code)]
     # 使用 AKSHARE 数据源这些代码其实没作用
     my_suber.refresh_memory_history(code_list=history_list, start=start, end=end, data_source=data_source)
+    get_live_bar_cache().build(my_suber.cache_history)   # 买点公式用的历史预留今天一行，盘中重启时按需补建
 
 
 # ======== 买点 ========
 
 
 def check_stock(code: str, quote: Dict, curr_date: str) -> bool:
-    df = concat_ak_quote_dict(my_suber.cache_history[code], quote, curr_date)
+    df = get_live_bar_cache().update(code, my_suber.cache_history[code], quote, curr_date)   # 今天一行原地覆盖
 
     result_df = select(df, code, quote)
     buy = result_df['PASS'].values[-1]
@@ -310,6 +313,9 @@ if __name__ == '__main__':
         before_trade_day=before_trade_day,
         near_trade_begin=near_trade_begin,
         use_ap_scheduler=True,
+        open_warm_start=True,
+        save_warm_state=my_pool.dump_state,
+        load_warm_state=my_pool.load_state,
         ding_messager=DING_MESSAGER,
         open_tick_memory_cache=True,
         open_today_deal_report=True,
@@ -28,6 +28,7 @@ PATH_MINP = PATH_BASE + '/min_price.json'       # 记录建仓后历史最低
 PATH_LOGS = PATH_BASE + '/logs.txt'             # 记录策略的历史日志
 disk_lock = threading.Lock()                    # 操作磁盘文件缓存的锁
 cache_selected: Dict[str, Set] = {}             # 记录选股历史，去重
+cache_changed: Set[str] = set()                 # 上次扫描卖出之后行情有变动的代码
 
 
 class PoolConf:
@@ -84,13 +85,19 @@ def before_trade_day() -> None:
 
 def scan_sell(quotes: Dict, curr_date: str, curr_time: str, positions: List) -> None:
     max_prices, held_info = update_max_prices(disk_lock, quotes, positions, PATH_MAXP, PATH_MINP, PATH_HELD)
-    my_seller.execute_sell(quotes, curr_date, curr_time, positions, held_info, max_prices, my_suber.cache_history)
+    # 止盈止损和回落卖出都由价格触发，行情没有变动的持仓不用重复检查
+    my_seller.execute_sell(quotes, curr_date, curr_time, positions, held_info, max_prices, my_suber.cache_history,
+                           changed_codes=set(cache_changed))
+    cache_changed.clear()
 
 
 # ======== 框架 ========
 
 
-def execute_strategy(curr_date: str, curr_time: str, curr_seconds: str, curr_quotes: Dict) -> bool:
+def execute_strategy(curr_date: str, curr_time: str, curr_seconds: str, curr_quotes: Dict,
+                     changed_codes: Set[str] = None) -> bool:
+    # 不在扫描时段的变动也要累积下来，留到下一次扫描卖出时检查
+    cache_changed.update(curr_quotes.keys() if changed_codes is None else changed_codes)
     positions = my_delegate.check_positions()
 
     for time_range in SellConf.time_ranges:
@@ -2,9 +2,10 @@ import logging
 
 from credentials import *
 
-from tools.utils_basic import logging_init, is_symbol, time_diff_seconds
+from tools.utils_basic import logging_init, is_symbol
 from tools.utils_cache import *
 from tools.utils_ding import DingMessager
+from tools.utils_ticks import TickView, get_tick_prices_since
 
 from delegate.xt_subscriber import XtSubscriber, update_position_held
 
@@ -112,27 +113,16 @@ def check_block_ticks(
     quote: dict,
     curr_time: str,
     curr_seconds: str,
-    ticks: list,
+    ticks: TickView | list,
 ) -> bool:
     curr_price = quote['lastPrice']
 
-    # 获取一段之前的最大价格
-    max_price = curr_price
-    i = len(ticks) - 1
-    now_seconds = datetime.datetime.strptime(f'{curr_time}:{curr_seconds}', '%H:%M:%S')
-    while i >= 0:
-        i_seconds = datetime.datetime.strptime(ticks[i][0], '%H:%M:%S')
-        if time_diff_seconds(now_seconds, i_seconds) > BuyConf.block_seconds:
-            break
-        i_price = ticks[i][1]
-        if i_price < max_price:  # 保证时间段内的价格都是最大
-            return False
-
-        max_price = max(max_price, i_price)
-        i -= 1
-
-    # 最后还要保证没有已经炸板的情况
-    return curr_price >= max_price
+    # 获取一段之前的价格，时间段内的价格都要等于当前价，保证一直封住且没有炸板
+    start_ms = quote['time'] - BuyConf.block_seconds * 1000     # 毫秒整数运算，不再解析时间字符串
+    prices = get_tick_prices_since(ticks, start_ms)
+    if len(prices) == 0:
+        return True
+    return prices.min() >= curr_price >= prices.max()
 
 
 def select_stocks(
@@ -10,6 +10,7 @@ from credentials import *
 from tools.utils_basic import logging_init, is_symbol, debug
 from tools.utils_cache import *
 from tools.utils_ding import DingMessager
+from tools.utils_mootdx import MootdxQuotePoller
 from tools.utils_remote import get_wencai_codes, get_mootdx_quotes
 
 from delegate.xt_subscriber import XtSubscriber, update_position_held
@@ -150,7 +151,7 @@ def check_stock_codes(selected_codes: list[str], quotes: Dict) -> dict[str, dict
 
 def scan_buy(quotes: Dict, curr_date: str, positions: List) -> None:
     selected_codes = pull_stock_codes()
-    print(selected_codes, quotes)
+    print(f'选股 {0 if selected_codes is None else len(selected_codes)} 只，行情 {len(quotes)} 条')
 
     selections = {}
     if selected_codes is not None and len(selected_codes) > 0:
@@ -166,7 +167,13 @@ def scan_buy(quotes: Dict, curr_date: str, positions: List) -> None:
 
 def scan_sell(quotes: Dict, curr_date: str, curr_time: str, positions: List) -> None:
     hold_list = [position.stock_code for position in positions if is_symbol(position.stock_code)]
-    tdx_quotes = get_mootdx_quotes(hold_list)
+    if len(set(hold_list) - set(my_suber.code_list)) > 0:
+        my_suber.update_code_list(hold_list)    # 新的持仓加入后台轮询
+
+    # 后台轮询没覆盖到的持仓临时补拉一次
+    tdx_quotes = {code: quotes[code] for code in hold_list if code in quotes}
+    if len(tdx_quotes) < len(hold_list):
+        tdx_quotes.update(get_mootdx_quotes([code for code in hold_list if code not in tdx_quotes]))
     print(f'[{hold_list}|{len(tdx_quotes.keys())}|{len(quotes)}]', end='')
 
     max_prices, held_info = update_max_prices(disk_lock, tdx_quotes, positions, PATH_MAXP, PATH_MINP, PATH_HELD)
@@ -262,6 +269,7 @@ if __name__ == '__main__':
         execute_strategy=execute_strategy,
         before_trade_day=before_trade_day,
         use_outside_data=True,
+        outside_quote_poller=MootdxQuotePoller(),
         use_ap_scheduler=True,
         ding_messager=DING_MESSAGER,
         open_today_deal_report=True,
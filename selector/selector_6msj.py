@@ -95,6 +95,8 @@ import warnings
 warnings.filterwarnings("ignore")
 
 from mytt.MyTT_advance import *
+import mytt.MyTT_panel as pn
+from tools.utils_panel import HistoryPanel
 
 
 def select(df: pd.DataFrame, code: str, quote: dict):
@@ -154,3 +156,50 @@ def select(df: pd.DataFrame, code: str, quote: dict):
     df['PASS'] = LMZJ & df['DD'] & df['EE'] & df['FF']
 
     return df
+
+
+def select_batch(panel: HistoryPanel) -> np.ndarray:
+    # 与 select 相同的公式，按 代码 × K线 的面板一次算完全部票，返回 PASS 的二维数组
+    O = panel['open']
+    H = panel['high']
+    L = panel['low']
+    C = panel['close']
+
+    DIFF = pn.EMA(C, 8) - pn.EMA(C, 13)
+    DEA = pn.EMA(DIFF, 5)
+    SL1 = DIFF > DEA
+
+    RSV = (C - pn.LLV(L, 8)) / (pn.HHV(H, 8) - pn.LLV(L, 8)) * 100
+    K = pn.SMA(RSV, 3, 1)
+    D = pn.SMA(K, 3, 1)
+    SL2 = K > D
+
+    QF = pn.REF(C, 1)
+    RSI1 = (pn.SMA(pn.MAX(C - QF, 0), 5, 1)) / (pn.SMA(pn.ABS(C - QF), 5, 1)) * 100
+    RSI2 = (pn.SMA(pn.MAX(C - QF, 0), 13, 1)) / (pn.SMA(pn.ABS(C - QF), 13, 1)) * 100
+    SL3 = RSI1 > RSI2
+
+    ZN = -(pn.HHV(H, 13) - C) / (pn.HHV(H, 13) - pn.LLV(L, 13)) * 100
+    JC1 = pn.SMA(ZN, 3, 1)
+    JC2 = pn.SMA(JC1, 3, 1)
+    SL4 = JC1 > JC2
+
+    BBI = (pn.MA(C, 3) + pn.MA(C, 6) + pn.MA(C, 12) + pn.MA(C, 24)) / 4
+    SL5 = C > BBI
+
+    MTM = C - pn.REF(C, 1)
+    MMS = 100 * pn.EMA(pn.EMA(MTM, 5), 3) / pn.EMA(pn.EMA(pn.ABS(MTM), 5), 3)
+    MMM = 100 * pn.EMA(pn.EMA(MTM, 13), 8) / pn.EMA(pn.EMA(pn.ABS(MTM), 13), 8)
+    SL6 = MMS > MMM
+
+    GZ = SL1 & SL2 & SL3 & SL4 & SL5 & SL6
+
+    LM = 5
+    PC = pn.REF(pn.COUNT(~GZ, LM), 1)
+    LMZJ = GZ & (pn.REF(~GZ, 1) == 1) & (PC == LM)
+
+    DD = C > O
+    EE = C > pn.REF(C, 1) * 1.02
+    FF = (H - pn.MAX(C, O)) / (H - L) < 0.2
+
+    return LMZJ & DD & EE & FF
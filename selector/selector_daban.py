@@ -22,7 +22,9 @@ BUY: AA AND BB AND CC AND DD AND EE AND FF AND GG AND HH AND II AND JJ;
 
 from mytt.MyTT import *
 from mytt.MyTT_advance import *
+import mytt.MyTT_panel as pn
 from tools.utils_basic import get_limiting_up_rate
+from tools.utils_panel import HistoryPanel
 
 
 def select(df: pd.DataFrame, code: str, quote: dict):
@@ -57,3 +59,31 @@ def select(df: pd.DataFrame, code: str, quote: dict):
         df['PASS'] = df['PASS'] & df[f'{chr(i)}{chr(i)}']
 
     return df
+
+
+def select_batch(panel: HistoryPanel) -> np.ndarray:
+    # 与 select 相同的公式，按 代码 × K线 的面板一次算完全部票，返回 PASS 的二维数组
+    LIMITINGUPRATE = np.array([get_limiting_up_rate(code) for code in panel.codes])[:, None]   # 每行各自的涨停幅度
+
+    H = panel['high']
+    C = panel['close']
+    VOL = panel['volume']
+
+    AA = C >= pn.REF(C, 1) * LIMITINGUPRATE
+    BB = C > pn.REF(pn.HHV(C, 30), 1)
+    CC = C < pn.LLV(C, 60) * 2.0
+    DD = VOL < pn.REF(VOL, 1) * 3.00
+
+    MA10 = pn.MA(C, 10)
+    MA20 = pn.MA(C, 20)
+    MA30 = pn.MA(C, 30)
+    MA60 = pn.MA(C, 60)
+    EE = H < MA60 * 1.3
+    FF = (pn.SLOPE(MA10, 3) > 0) & (pn.SLOPE(MA20, 3) > 0) & \
+         (pn.SLOPE(MA30, 3) > 0) & (pn.SLOPE(MA60, 3) > 0)
+    GG = (C > MA10) & (MA10 > MA20) & \
+         (MA20 > MA30) & (MA30 > MA60)
+    HH = pn.COUNT(C >= pn.REF(C, 1) * LIMITINGUPRATE, 60) < 3
+    II = pn.COUNT(C >= pn.REF(C, 1) * LIMITINGUPRATE, 3) < 1
+
+    return AA & BB & CC & DD & EE & FF & GG & HH & II
@@ -90,6 +90,8 @@
 # from mytt.MyTT import *
 from mytt.MyTT_advance import *
 from mytt.MyTT_custom import *
+import mytt.MyTT_panel as pn
+from tools.utils_panel import HistoryPanel
 
 
 def select(df: pd.DataFrame, code: str, quote: dict):
@@ -143,3 +145,35 @@ def select(df: pd.DataFrame, code: str, quote: dict):
     df['PASS'] = 选股信号
 
     return df
+
+
+def select_batch(panel: HistoryPanel) -> np.ndarray:
+    # 与 select 相同的公式，按 代码 × K线 的面板一次算完全部票，返回 PASS 的二维数组
+    C = panel['close']
+    H = panel['high']
+    L = panel['low']
+    V = panel['volume']
+
+    趋势周期 = 30
+    动量周期 = 5
+    放量倍数 = 1.6
+    波动过滤 = 3
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        MA_趋势线 = pn.EMA(C, 趋势周期)
+        趋势角度 = pn.ATAN((MA_趋势线 / pn.REF(MA_趋势线, 1) - 1) * 100) * 180 / 3.1416
+        COND_趋势 = 趋势角度 > 15
+
+        VOL_基准 = pn.MA(V, 动量周期)
+        COND_放量 = (V > VOL_基准 * 放量倍数) & (C > pn.REF(pn.HHV(H, 动量周期), 1))
+
+        RSI_动量 = pn.SMA(pn.MAX(C - pn.REF(C, 1), 0), 动量周期) / pn.SMA(pn.ABS(C - pn.REF(C, 1)), 动量周期) * 100
+        COND_动量 = (RSI_动量 > 60) & (RSI_动量 > pn.REF(RSI_动量, 3))
+
+        ATR值 = pn.MA(pn.MAX(pn.MAX(H - L, pn.ABS(pn.REF(C, 1) - H)), pn.ABS(pn.REF(C, 1) - L)), 动量周期)
+        COND_波动 = (ATR值 / C) < 波动过滤 / 100
+
+        COND_流动性 = V > pn.MA(V, 30) * 0.5
+
+    选股信号 = COND_趋势 & COND_放量 & COND_动量 & COND_波动 & COND_流动性
+    return 选股信号 & (panel.lengths >= 90)[:, None]    # 历史不足 90 根的整行不通过
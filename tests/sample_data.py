@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+
+# 测试共用的模拟行情数据
+
+
+def make_history(n: int, seed: int = 0) -> pd.DataFrame:
+    # n 天的日线历史，datetime 为字符串
+    rng = np.random.default_rng(seed)
+    close = np.round(10 * np.exp(np.cumsum(rng.normal(0, 0.02, n))), 2)
+    return pd.DataFrame({
+        'datetime': [f'2025{i:04d}' for i in range(n)],
+        'open': close,
+        'high': np.round(close * (1 + rng.uniform(0, 0.03, n)), 2),
+        'low': np.round(close * (1 - rng.uniform(0, 0.03, n)), 2),
+        'close': close,
+        'volume': rng.integers(1000, 9000, n),
+        'amount': close * 1000,
+    })
+
+
+def make_universe(n_codes: int, n_bars: int, seed: int = 0) -> dict[str, pd.DataFrame]:
+    # 主板和创业板混合，部分票历史较短，部分票有停牌的横盘段和涨停
+    rng = np.random.default_rng(seed)
+    ans = {}
+    for i in range(n_codes):
+        code = f'{["000", "300", "600", "688"][i % 4]}{i:03d}.{["SZ", "SZ", "SH", "SH"][i % 4]}'
+        n = n_bars if i % 5 else int(rng.integers(20, n_bars))
+        ret = rng.normal(0.004, 0.03, n)
+        ret[rng.random(n) < 0.04] = 0.2 if i % 4 in (1, 3) else 0.1
+        close = np.round(10 * np.cumprod(1 + ret), 2)
+        if i % 7 == 0:
+            close[n // 2:n // 2 + 15] = close[n // 2]
+        open_ = np.round(close / (1 + rng.normal(0, 0.01, n)), 2)
+        volume = np.round(rng.random(n) * 1e6)
+        ans[code] = pd.DataFrame({
+            'datetime': np.arange(n),
+            'open': open_,
+            'high': np.maximum(close, open_) + np.round(rng.random(n) * 0.1, 2),
+            'low': np.minimum(close, open_) - np.round(rng.random(n) * 0.1, 2),
+            'close': close,
+            'volume': volume,
+            'amount': volume * close,
+        })
+    return ans
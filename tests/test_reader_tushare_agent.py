@@ -0,0 +1,67 @@
+import time
+import threading
+
+from reader.tushare_agent import TushareClientPool
+from tools.utils_governor import RequestGovernor, RequestSource
+
+
+class FakeProClient:
+    def __init__(self, token: str):
+        self.token = token
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.running = 0
+        self.peak = 0
+
+    def daily(self, **kwargs):
+        with self.lock:
+            self.calls += 1
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(0.01)
+        with self.lock:
+            self.running -= 1
+        return self.token, kwargs['ts_code']
+
+
+def _make_pool(**kwargs) -> TushareClientPool:
+    pool = TushareClientPool(
+        tokens=[['token_a', 'a'], ['token_b', 'b'], ['token_c', 'c']],
+        client_factory=FakeProClient,
+        **kwargs,
+    )
+    RequestGovernor().configure(RequestSource.TUSHARE, pool.governor_policy())
+    return pool
+
+
+def test_tushare_pool_spread_by_headroom():
+    pool = _make_pool(minute_quota=10, token_concurrency=1)
+
+    results = pool.map(lambda code: pool.call('daily', ts_code=code), [f'{i:06d}.SZ' for i in range(30)])
+
+    assert [r[1] for r in results] == [f'{i:06d}.SZ' for i in range(30)]
+    # 三个 token 的额度叠加，刚好用满
+    assert [c.api.calls for c in pool.clients] == [10, 10, 10]
+    assert all(c.api.peak == 1 for c in pool.clients)
+    assert pool.remaining() == {'a': {'daily': 0}, 'b': {'daily': 0}, 'c': {'daily': 0}}
+
+
+def test_tushare_pool_wait_for_window():
+    pool = _make_pool(minute_quota=1, endpoint_quotas={'daily': 2}, window=0.2)
+
+    t0 = time.monotonic()
+    for i in range(7):
+        pool.call('daily', ts_code=f'{i:06d}.SZ')
+    elapsed = time.monotonic() - t0
+
+    # 窗口内总额度为 6 次，第 7 次需要等最早的调用滑出窗口
+    assert elapsed >= 0.2 * 0.9
+    assert sum(c.api.calls for c in pool.clients) == 7
+
+
+def test_tushare_pool_leaves_governor_alone():
+    # 构造连接池不改全局 Governor 的 TUSHARE 配置
+    policy = RequestGovernor().policy(RequestSource.TUSHARE)
+    pool = TushareClientPool(tokens=[['token_a', 'a']], client_factory=FakeProClient)
+    assert RequestGovernor().policy(RequestSource.TUSHARE) is policy
+    assert pool.governor_policy().max_concurrency == pool.max_workers
@@ -0,0 +1,68 @@
+import datetime
+import numpy as np
+
+from tools.utils_archive import TickArchive, TickArchiveDay, archive_tick_journal, archive_tick_lists, \
+    get_archive_path
+from tools.utils_journal import TickJournalWriter, TickJournalReader
+
+
+CODES = ['000001.SZ', '600000.SH', '300750.SZ']
+
+
+def _quotes(base_ms: int, second: int) -> dict:
+    return {code: {
+        'time': base_ms + second * 1000,
+        'lastPrice': 10.0 + k + second * 0.01,
+        'high': 11.0 + k,
+        'low': 9.0 + k,
+        'volume': 100 * second,
+        'amount': 1000.0 * second,
+        'askPrice': [10.1 + k] * 5,
+        'askVol': [1, 2, 3, 4, 5],
+        'bidPrice': [9.9 + k] * 5,
+        'bidVol': [5, 4, 3, 2, 1],
+    } for k, code in enumerate(CODES)}
+
+
+def test_tick_archive_query(tmp_path):
+    root = str(tmp_path / 'archive')
+    for day in [20, 23, 24]:
+        trade_date = f'202506{day}'
+        base_ms = int(datetime.datetime(2025, 6, day, 9, 30).timestamp() * 1000)
+        journal = str(tmp_path / f'{trade_date}.bin')
+        writer = TickJournalWriter(journal, trade_date)
+        for second in range(0, 3600, 3):
+            writer.append_quotes(_quotes(base_ms, second))
+        writer.close()
+        assert archive_tick_journal(journal, root) == get_archive_path(root, trade_date)
+
+    day = TickArchiveDay(get_archive_path(root, '20250623'))
+    assert sorted(day.codes()) == sorted(CODES)
+    reader = TickJournalReader(str(tmp_path / '20250623.bin'))
+    assert np.array_equal(day.read('600000.SH'), reader.read_code('600000.SH'))
+
+    archive = TickArchive(root)
+    assert archive.dates('20250621', '20250630') == ['20250623', '20250624']
+
+    ans = archive.query(['600000.SH', '688001.SH'], '20250621', '20250624', '09:40:00', '09:50:00', ['price'])
+    ticks = ans['600000.SH']
+    assert sorted(ticks) == ['price', 'time']
+    assert len(ticks['time']) == 2 * (600 // 3 + 1)
+    assert np.all(np.diff(ticks['time']) > 0)
+    first = datetime.datetime.fromtimestamp(ticks['time'][0] / 1000)
+    assert first == datetime.datetime(2025, 6, 23, 9, 40)
+    assert np.allclose(ticks['price'][0], 11.0 + 600 * 0.01)
+    assert len(ans['688001.SH']['time']) == 0
+
+
+def test_tick_archive_from_lists(tmp_path):
+    ticks = {'000001.SZ': [
+        ['09:30:00', 10.0, 10.0, 10.0, 100, 1000.0, [10.01] * 5, [1] * 5, [9.99] * 5, [2] * 5],
+        ['09:30:03', 10.1, 10.1, 10.0, 200, 2000.0, [10.11] * 5, [1] * 5, [10.09] * 5, [2] * 5],
+    ]}
+    path = archive_tick_lists(ticks, '20250620', str(tmp_path))
+    assert TickArchiveDay(path).read('000001.SZ')['price'].tolist() == [10.0, 10.1]
+
+    ans = TickArchive(str(tmp_path)).query('000001.SZ', start_time='09:30:01')
+    assert ans['000001.SZ']['volume'].tolist() == [200]
+    assert ans['000001.SZ']['askPrice'].shape == (1, 5)
@@ -0,0 +1,94 @@
+import datetime
+
+import numpy as np
+
+from tools.utils_bars import MinuteBarAggregator, get_minute_slot, get_bar_end_times
+
+
+TRADE_DATE = datetime.date(2025, 6, 20)
+
+
+def _quote(hms: str, price: float, volume: int, amount: float) -> dict:
+    t = datetime.datetime.combine(TRADE_DATE, datetime.datetime.strptime(hms, '%H:%M:%S').time())
+    return {'time': int(t.timestamp() * 1000), 'lastPrice': price, 'volume': volume, 'amount': amount}
+
+
+def test_minute_slot():
+    assert get_minute_slot(9 * 3600 + 20 * 60) == -1
+    assert get_minute_slot(9 * 3600 + 25 * 60) == 0
+    assert get_minute_slot(9 * 3600 + 30 * 60 + 59) == 0
+    assert get_minute_slot(11 * 3600 + 29 * 60 + 59) == 119
+    assert get_minute_slot(11 * 3600 + 30 * 60 + 3) == 119
+    assert get_minute_slot(13 * 3600) == 120
+    assert get_minute_slot(15 * 3600 + 3) == 239
+
+    assert get_bar_end_times(1)[:2] == ['09:31', '09:32']
+    assert get_bar_end_times(5)[23:25] == ['11:30', '13:05']
+    assert get_bar_end_times(15)[-1] == '15:00'
+
+
+def test_minute_bar_aggregator():
+    agg = MinuteBarAggregator(init_codes=1)
+    ticks = [
+        ('09:20:00', 10.5, 0, 0.0),         # 虚拟撮合，不计入
+        ('09:25:03', 10.0, 100, 1000.0),    # 开盘集合竞价并入第一根
+        ('09:30:05', 10.2, 150, 1510.0),
+        ('09:30:50', 9.9, 170, 1708.0),
+        ('09:34:10', 10.3, 200, 2017.0),
+        ('11:30:02', 10.4, 210, 2121.0),    # 午休时的尾单并入 11:30
+        ('13:00:03', 10.6, 230, 2333.0),
+        ('15:00:01', 10.8, 260, 2657.0),    # 收盘集合竞价并入最后一根
+    ]
+    for hms, price, volume, amount in ticks:
+        agg.update_quotes({'000001.SZ': _quote(hms, price, volume, amount), '600000.SH': _quote(hms, 5.0, 1, 1.0)})
+
+    bars = agg.bars_of('000001.SZ', 1)
+    assert len(bars) == 240
+    assert bars[0].tolist() == [10.0, 10.2, 9.9, 9.9, 170, 1708.0]
+    assert np.isnan(bars[1][0]) and bars[1][4] == 0
+    assert bars[4].tolist() == [10.3, 10.3, 10.3, 10.3, 30, 309.0]
+    assert bars[119].tolist() == [10.4, 10.4, 10.4, 10.4, 10, 104.0]
+    assert bars[120].tolist() == [10.6, 10.6, 10.6, 10.6, 20, 212.0]
+    assert bars[239].tolist() == [10.8, 10.8, 10.8, 10.8, 30, 324.0]
+
+    bars5 = agg.bars_of('000001.SZ', 5)
+    assert bars5[0].tolist() == [10.0, 10.3, 9.9, 10.3, 200, 2017.0]
+    assert agg.bars_of('000001.SZ', 15)[:, 4].sum() == 260
+    assert agg.latest('600000.SH', 15).tolist() == [5.0, 5.0, 5.0, 5.0, 0, 0.0]
+
+    df = agg.to_frame('000001.SZ', 5)
+    assert df['time'].iloc[0] == '09:35' and df['time'].iloc[-1] == '15:00'
+
+    # 跨日自动重置
+    next_day = _quote('09:31:00', 11.0, 50, 550.0)
+    next_day['time'] += 86400000
+    agg.update('000001.SZ', next_day)
+    assert agg.trade_date == TRADE_DATE + datetime.timedelta(days=1)
+    bars = agg.bars_of('000001.SZ', 1)
+    assert len(bars) == 2 and np.isnan(bars[0][0])
+    assert bars[1].tolist() == [11.0, 11.0, 11.0, 11.0, 0, 0.0]      # 盘中第一次出现只作为成交量基准
+    assert '600000.SH' not in agg.code_index
+
+    # 前一天的过期行情不会把已经跨过去的日期拨回去
+    stale = _quote('14:00:00', 9.0, 10, 90.0)
+    agg.update('600000.SH', stale)
+    assert agg.trade_date == TRADE_DATE + datetime.timedelta(days=1)
+    assert agg.bars_of('000001.SZ', 1)[1].tolist() == [11.0, 11.0, 11.0, 11.0, 0, 0.0]
+    assert '600000.SH' not in agg.code_index
+
+
+def test_minute_bar_mid_session_start():
+    # 盘中启动时第一笔的累计量是全天的，不能计入当前这根K线
+    agg = MinuteBarAggregator()
+    agg.update('000001.SZ', _quote('10:30:05', 10.0, 5_000_000, 5e7))
+    agg.update('000001.SZ', _quote('10:30:40', 10.1, 5_000_100, 5e7 + 1010.0))
+    agg.update('000001.SZ', _quote('10:31:10', 10.2, 5_000_300, 5e7 + 3050.0))
+
+    bars = agg.bars_of('000001.SZ', 1)
+    assert bars[60].tolist() == [10.0, 10.1, 10.0, 10.1, 100, 1010.0]
+    assert bars[61].tolist() == [10.2, 10.2, 10.2, 10.2, 200, 2040.0]
+    assert agg.bars_of('000001.SZ', 15)[:, 4].sum() == 300
+
+    # 开盘第一根之内启动，之前的累计量都属于第一根
+    agg.update('600000.SH', _quote('09:30:20', 5.0, 800, 4000.0))
+    assert agg.bars_of('600000.SH', 1)[0].tolist() == [5.0, 5.0, 5.0, 5.0, 800, 4000.0]
@@ -0,0 +1,25 @@
+import datetime
+
+from tools.utils_basic import hms_to_past_seconds, xt_time_to_hms, xt_time_tag_to_hms
+from tools.utils_clock import get_session_past_seconds, get_midnight_ms, ms_to_hms, hhmm_to_seconds
+
+
+def _ms(day: int, hour: int, minute: int, second: int = 0) -> int:
+    return int(datetime.datetime(2025, 6, day, hour, minute, second).timestamp() * 1000) + 123
+
+
+def test_session_tables():
+    for hour, minute, second in [(9, 0, 0), (9, 30, 1), (11, 29, 59), (12, 0, 0), (13, 0, 0), (14, 59, 59), (16, 0, 0)]:
+        assert get_session_past_seconds(_ms(20, hour, minute, second)) == hms_to_past_seconds(hour, minute, second)
+
+
+def test_integer_time_helpers():
+    # 跨日后零点缓存要刷新
+    assert ms_to_hms(_ms(20, 23, 59, 59)) == (23, 59, 59)
+    assert ms_to_hms(_ms(21, 0, 0, 1)) == (0, 0, 1)
+    assert get_midnight_ms(_ms(21, 10, 0)) == int(datetime.datetime(2025, 6, 21).timestamp() * 1000)
+
+    assert xt_time_to_hms(_ms(20, 10, 5, 7)) == (10, 5, 7)
+    assert xt_time_to_hms(1750383000) == (0, 0, 0)              # 秒级时间戳不处理
+    assert xt_time_tag_to_hms('20250620 10:05:07') == (10, 5, 7)
+    assert hhmm_to_seconds('09:30', '05') == 9 * 3600 + 30 * 60 + 5
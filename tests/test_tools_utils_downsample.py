@@ -0,0 +1,31 @@
+import numpy as np
+
+from tools.utils_downsample import downsample_indices, get_run_edges, get_limit_touch_mask
+
+
+def test_downsample_keeps_extremes_and_touches():
+    rng = np.random.default_rng(0)
+    n = 200_000
+    price = 10 + np.cumsum(rng.normal(0, 0.01, n))
+    volume = rng.integers(0, 1000, n).astype(float)
+    price[123_456] = price.max() + 1
+    volume[77_777] = -1
+    sealed = np.zeros(n, dtype=bool)
+    sealed[150_000:150_500] = True
+
+    index = downsample_indices([price, volume], 4000, sealed)
+
+    assert len(index) <= 4000 + 2
+    assert np.all(np.diff(index) > 0)
+    assert {0, n - 1, 123_456, 77_777, 150_000, 150_499} <= set(index.tolist())
+    assert price[index].min() == price.min()
+
+    short = [1.0, 2.0, 3.0]
+    assert downsample_indices([short, short], 10).tolist() == [0, 1, 2]
+
+
+def test_limit_touch_edges():
+    ask_vol = np.array([5, 0, 0, 3, 0, 4])
+    bid_vol = np.array([5, 9, 9, 3, 9, 4])
+    mask = get_limit_touch_mask(ask_vol, bid_vol, np.full(6, 10.0))
+    assert get_run_edges(mask).tolist() == [1, 2, 4]
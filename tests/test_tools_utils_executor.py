@@ -0,0 +1,70 @@
+import time
+import threading
+
+from tools.utils_executor import LatestSnapshotExecutor
+
+
+def test_executor_coalesce_latest():
+    seen = []
+    gate = threading.Event()
+
+    def handler(i):
+        gate.wait()
+        seen.append(i)
+
+    executor = LatestSnapshotExecutor(handler, name='test')
+    executor.publish(0)
+    time.sleep(0.05)            # 0 已经在执行，卡在 gate 上
+    for i in range(1, 10):
+        executor.publish(i)     # 只保留最新的 9
+    time.sleep(0.05)
+
+    gate.set()
+    assert executor.wait_idle(timeout=2)
+    executor.stop(timeout=1)
+
+    assert seen == [0, 9]
+    stats = executor.stats()
+    assert stats['published'] == 10
+    assert stats['executed'] == 2
+    assert stats['skipped'] == 8
+    assert stats['lag_max'] >= 0.04
+
+
+def test_executor_survives_failure():
+    seen = []
+
+    def handler(i):
+        if i == 1:
+            raise ValueError('bad quote')
+        seen.append(i)
+
+    executor = LatestSnapshotExecutor(handler, name='test')
+    for i in range(3):
+        executor.publish(i)
+        assert executor.wait_idle(timeout=1)
+    executor.stop(timeout=1)
+
+    assert seen == [0, 2]
+    assert executor.stats()['failed'] == 1
+    assert not executor.thread.is_alive()
+
+
+def test_executor_merge_replaced():
+    seen = []
+    gate = threading.Event()
+
+    def handler(i, changed):
+        gate.wait()
+        seen.append((i, changed))
+
+    executor = LatestSnapshotExecutor(handler, name='test', merge=lambda old, new: (new[0], old[1] | new[1]))
+    executor.publish(0, {'a'})
+    time.sleep(0.05)
+    executor.publish(1, {'b'})
+    executor.publish(2, {'c'})      # 覆盖 1，但 1 的变动代码要保留
+    gate.set()
+    assert executor.wait_idle(timeout=2)
+    executor.stop(timeout=1)
+
+    assert seen == [(0, {'a'}), (2, {'b', 'c'})]
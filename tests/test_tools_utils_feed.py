@@ -0,0 +1,53 @@
+import datetime
+
+from tools.utils_clock import FakeClock
+from tools.utils_feed import SyntheticMarket, SyntheticXtData, make_synthetic_codes
+
+
+TRADE_DATE = datetime.date(2025, 6, 20)
+
+
+def test_make_synthetic_codes():
+    codes = make_synthetic_codes(100)
+    assert len(codes) == len(set(codes)) == 100
+    assert codes[0] == '600000.SH' and codes[-1].startswith('688')
+
+
+def test_synthetic_feed_session():
+    clock = FakeClock()
+    market = SyntheticMarket(count=50, limit_up_ratio=0.2, seed=1)
+    feed = SyntheticXtData(market, start=datetime.datetime.combine(TRADE_DATE, datetime.time(9, 15)),
+                           speed=0, clock=clock)
+
+    batches = []
+    seq = feed.subscribe_whole_quote(['SH', 'SZ'], callback=batches.append)
+    picked = []
+    feed.subscribe_whole_quote(['600000.SH', '300001.SZ'], callback=picked.append)
+
+    while feed.now.time() < datetime.time(9, 25):
+        feed.step()
+    auction = batches[0][next(iter(batches[0]))]
+    assert auction['volume'] == 0 and auction['open'] == 0
+    assert auction['askPrice'][0] == auction['bidPrice'][0] == auction['lastPrice']
+
+    matched = batches[-1]
+    assert len(matched) == 50                  # 开盘撮合全部推送
+    assert all(q['open'] > 0 and q['volume'] > 0 for q in matched.values())
+    assert clock.now() == feed.now
+
+    feed.run(until=datetime.time(15, 0, 3))
+    assert feed.now.time() >= datetime.time(15, 0)
+    assert all(set(batch) <= {'600000.SH', '300001.SZ'} for batch in picked)
+
+    # 涨跌停限制和封板盘口
+    last = {}
+    for batch in batches:
+        last.update(batch)
+    sealed = [q for q in last.values() if q['lastPrice'] >= q['bidPrice'][0] and q['askPrice'][0] == 0]
+    assert len(sealed) > 0
+    for code, quote in last.items():
+        i = market.codes.index(code)
+        assert market.limit_down[i] <= quote['lastPrice'] <= market.limit_up[i]
+
+    feed.unsubscribe_quote(seq)
+    assert len(feed.subscriptions) == 1
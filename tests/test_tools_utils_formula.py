@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from selector import selector_6msj, selector_daban, selector_deepseek
+from tools.utils_basic import get_limiting_up_rate
+from tools.utils_formula import FormulaSelector, compile_formula
+from tools.utils_panel import build_history_panel
+
+from sample_data import make_universe
+
+
+FORMULA_6MSJ = '''
+DIFF:=EMA(CLOSE,8)-EMA(CLOSE,13);
+DEA:=EMA(DIFF,5);
+SL1:=DIFF>DEA;
+RSV:=(CLOSE-LLV(LOW,8))/(HHV(HIGH,8)-LLV(LOW,8))*100;
+K:=SMA(RSV,3,1);
+D:=SMA(K,3,1);
+SL2:=K>D;
+RSV:=REF(CLOSE,1);
+RSI1:=(SMA(MAX(CLOSE-RSV,0),5,1))/(SMA(ABS(CLOSE-RSV),5,1))*100;
+RSI2:=(SMA(MAX(CLOSE-RSV,0),13,1))/(SMA(ABS(CLOSE-RSV),13,1))*100;
+SL3:=RSI1>RSI2;
+ZN:=-(HHV(HIGH,13)-CLOSE)/(HHV(HIGH,13)-LLV(LOW,13))*100;
+JC1:=SMA(ZN,3,1);
+JC2:=SMA(JC1,3,1);
+SL4:=JC1>JC2;
+BBI:=(MA(CLOSE,3)+MA(CLOSE,6)+MA(CLOSE,12)+MA(CLOSE,24))/4;
+SL5:=CLOSE>BBI;
+MTM:=CLOSE-REF(CLOSE,1);
+MMS:=100*EMA(EMA(MTM,5),3)/EMA(EMA(ABS(MTM),5),3);
+MMM:=100*EMA(EMA(MTM,13),8)/EMA(EMA(ABS(MTM),13),8);
+SL6:=MMS>MMM;
+GZ:=SL1 AND SL2 AND SL3 AND SL4 AND SL5 AND SL6;
+LM:=5;
+PC:=REF(COUNT(GZ=0,LM),1);
+LMZJ:=IF(GZ=1 AND (REF(GZ,1)=0) AND (PC=LM),6,0),NODRAW;
+DD:=C>O;                             // 当日阳线
+EE:=C>REF(C,1)*1.02;                 // 当日涨幅 > 2%
+FF:=(H-MAX(C,O))/(H-L)<0.2;          // 上影线 < K线长度 * 0.2
+BUY:LMZJ AND DD AND EE AND FF;
+HOLD:IF(GZ,6,0),NODRAW;
+DRAWICON(LMZJ,6.6,8);
+STICKLINE(BUY,0,6,0.6,0),COLORYELLOW;
+'''
+
+FORMULA_DABAN = '''
+AA:C>=REF(C,1)*LIMITINGUPRATE;
+BB:C>REF(HHV(C,30),1);
+CC:C<LLV(C,60)*2.0;
+DD:VOL<REF(VOL,1)*3.00;
+MA10:=MA(C,10);
+MA20:=MA(C,20);
+MA30:=MA(C,30);
+MA60:=MA(C,60);
+EE:H<MA60*1.3;
+FF:(SLOPE(MA10,3)>0) AND (SLOPE(MA20,3)>0) AND (SLOPE(MA30,3)>0) AND (SLOPE(MA60,3)>0);
+GG:(C>MA10) AND (MA10>MA20) AND (MA20>MA30) AND (MA30>MA60);
+HH:COUNT(C>=REF(C,1)*LIMITINGUPRATE,60)<3;
+II:COUNT(C>=REF(C,1)*LIMITINGUPRATE,3)<1;
+BUY:AA AND BB AND CC AND DD AND EE AND FF AND GG AND HH AND II;
+'''
+
+FORMULA_DEEPSEEK = '''
+{————— 参数模块 —————}
+趋势周期:=30; 动量周期:=5; 放量倍数:=1.6; 波动过滤:=3;
+MA_趋势线:=EMA(C,趋势周期);
+趋势角度:=ATAN((MA_趋势线/REF(MA_趋势线,1)-1)*100)*180/3.1416;
+COND_趋势:=趋势角度>15;
+VOL_基准:=MA(V,动量周期);
+COND_放量:=V>VOL_基准*放量倍数 AND C>REF(HHV(H,动量周期),1);
+RSI_动量:=SMA(MAX(C-REF(C,1),0),动量周期)/SMA(ABS(C-REF(C,1)),动量周期)*100;
+COND_动量:=RSI_动量>60 AND RSI_动量>REF(RSI_动量,3);
+ATR值:=MA(MAX(MAX(H-L,ABS(REF(C,1)-H)),ABS(REF(C,1)-L)),动量周期);
+COND_波动:=(ATR值/C)<波动过滤/100;
+COND_流动性:=V>MA(V,30)*0.5;
+选股信号:COND_趋势 AND COND_放量 AND COND_动量 AND COND_波动 AND COND_流动性;
+'''
+
+
+def test_compile_shares_common_subexpressions():
+    formula = compile_formula('A:=MA(C,5)+MA(CLOSE,5); B:MA(C,5)*2; X:A>B OR b<a;')
+    assert formula.outputs == ['B', 'X']
+    assert len(formula) == 8      # C, 5, MA, +, 2, *, >, OR：两处 MA(C,5) 和互换的比较都只建一次
+
+    formula = compile_formula(FORMULA_6MSJ)
+    assert formula.outputs == ['BUY', 'HOLD']
+    assert formula.params == set()
+
+    with pytest.raises(ValueError):
+        compile_formula('A:MA(C,N);')
+    with pytest.raises(ValueError):
+        compile_formula('A:FOO(C);')
+    with pytest.raises(ValueError):
+        compile_formula('A:C>REF(C,1)*RATE;').evaluate(make_universe(1, 30)['000000.SZ'])
+
+
+@pytest.mark.parametrize('source, output, params, min_bars, selector', [
+    (FORMULA_6MSJ, 'BUY', None, 0, selector_6msj),
+    (FORMULA_DABAN, None, {'LIMITINGUPRATE': get_limiting_up_rate}, 0, selector_daban),
+    (FORMULA_DEEPSEEK, None, None, 90, selector_deepseek),
+], ids=['6msj', 'daban', 'deepseek'])
+def test_formula_selector_matches_hand_written(source, output, params, min_bars, selector):
+    histories = make_universe(40, 200)
+    formula_selector = FormulaSelector(source, output=output, params=params, min_bars=min_bars)
+    for code, df in histories.items():
+        assert np.array_equal(formula_selector.select(df.copy(), code, None)['PASS'].values,
+                              selector.select(df.copy(), code, None)['PASS'].to_numpy(dtype=bool)), code
+
+    panel = build_history_panel(histories)
+    assert np.array_equal(formula_selector.select_batch(panel), selector.select_batch(panel))
+
+
+def test_formula_window_on_constant():
+    # SUM(1,N) 数K线根数，常数参数先展开成和行情一样长的序列
+    histories = make_universe(4, 30)
+    formula = compile_formula('N:SUM(1,5); R:REF(5,1); X:C>REF(C,1) AND SUM(1,3)=3;')
+    df = histories['000000.SZ']
+    result = formula.evaluate(df)
+    assert np.array_equal(result['N'], np.r_[[np.nan] * 4, [5.0] * (len(df) - 4)], equal_nan=True)
+    assert np.array_equal(result['R'], np.r_[np.nan, [5.0] * (len(df) - 1)], equal_nan=True)
+
+    panel = build_history_panel(histories)
+    mask = panel.valid_mask()
+    result_panel = formula.evaluate_panel(panel)
+    assert result_panel['N'].shape == panel['close'].shape
+    for i, (code, df) in enumerate(histories.items()):
+        assert np.array_equal(result_panel['X'][i][mask[i]], formula.evaluate(df)['X']), code
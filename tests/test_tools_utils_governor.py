@@ -0,0 +1,70 @@
+import pytest
+
+import time
+import threading
+
+from tools.utils_governor import RequestGovernor, SourcePolicy, CircuitOpenError
+
+
+def test_governor_rate_limit():
+    governor = RequestGovernor()
+    governor.configure('test_rate', SourcePolicy(rate=50.0, burst=1, max_concurrency=4))
+
+    t0 = time.monotonic()
+    for _ in range(6):
+        governor.call('test_rate', lambda: None)
+    elapsed = time.monotonic() - t0
+
+    # 突发1个，之后每个间隔 1/50 秒
+    assert elapsed >= 5 / 50 * 0.9
+    stats = governor.stats('test_rate')['test_rate']
+    assert stats['completed'] == 6
+    assert stats['throttled'] >= 4
+
+
+def test_governor_max_concurrency():
+    governor = RequestGovernor()
+    governor.configure('test_concurrency', SourcePolicy(rate=1000.0, burst=100, max_concurrency=2))
+
+    lock = threading.Lock()
+    running = [0]
+    peak = [0]
+
+    def work():
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+
+    threads = [threading.Thread(target=governor.call, args=('test_concurrency', work)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert peak[0] == 2
+    assert governor.stats('test_concurrency')['test_concurrency']['completed'] == 8
+
+
+def test_governor_circuit_breaker():
+    governor = RequestGovernor()
+    governor.configure('test_circuit', SourcePolicy(rate=1000.0, burst=100, failure_threshold=2, cooldown=0.05))
+
+    def fail():
+        raise ValueError('banned')
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            governor.call('test_circuit', fail)
+
+    with pytest.raises(CircuitOpenError):
+        governor.call('test_circuit', lambda: None)
+
+    time.sleep(0.06)
+    assert governor.call('test_circuit', lambda: 1) == 1    # 半开试探成功后关闭
+    stats = governor.stats('test_circuit')['test_circuit']
+    assert stats['circuit'] == 'closed'
+    assert stats['rejected'] == 1
+    assert stats['circuit_trips'] == 1
@@ -0,0 +1,37 @@
+import numpy as np
+
+from mytt.MyTT import MA, CCI, WR, MACD
+from tools.utils_indicators import DailyIndicatorState, IndicatorCache
+from tools.utils_remote import concat_ak_quote_dict
+
+from sample_data import make_history
+
+
+def test_daily_indicator_state_matches_full_recompute():
+    history = make_history(300)
+    state = DailyIndicatorState(history)
+    rng = np.random.default_rng(1)
+    for price in rng.uniform(8, 14, 20).round(2):
+        quote = {'open': price, 'high': price + 0.2, 'low': price - 0.3, 'lastPrice': price,
+                 'volume': 100, 'amount': 1000.0}
+        df = concat_ak_quote_dict(history, quote, '20260101')
+
+        assert np.isclose(state.ma(price, 20), MA(df.close.tail(21), 20)[-1])
+        assert np.allclose(state.cci(price, price + 0.2, price - 0.3, 14),
+                           CCI(df['close'], df['high'], df['low'], 14)[-2:])
+        assert np.array_equal(state.wr(price, price + 0.2, price - 0.3, 14),
+                              WR(df['close'], df['high'], df['low'], 14)[-2:])
+        assert np.array_equal(state.macd(price), MACD(df['close'])[2][-2:])
+
+
+def test_indicator_cache_rebuilds_on_history_change():
+    cache = IndicatorCache()
+    history = make_history(30)
+    cache.build({'000001.SZ': history})
+    state = cache.get('000001.SZ', history)
+    assert state is cache.get('000001.SZ', history)
+
+    longer = make_history(31)
+    assert cache.get('000001.SZ', longer) is not state
+    assert cache.get('000001.SZ', longer).length == 31
+    assert np.isnan(DailyIndicatorState(make_history(5)).ma(10.0, 20))
@@ -0,0 +1,108 @@
+import datetime
+
+from tools.utils_journal import TickJournalWriter, TickJournalReader, JOURNAL_BLOCK_RECORDS
+
+
+BASE_MS = int(datetime.datetime(2025, 6, 20, 9, 30).timestamp() * 1000)
+CODES = ['000001.SZ', '600000.SH', '300750.SZ']
+
+
+def _quotes(second: int) -> dict:
+    return {code: {
+        'time': BASE_MS + second * 1000,
+        'lastPrice': 10.0 + k + second * 0.01,
+        'high': 11.0 + k,
+        'low': 9.0 + k,
+        'volume': 100 * second,
+        'amount': 1000.0 * second,
+        'askPrice': [10.1 + k] * 5,
+        'askVol': [1, 2, 3, 4, 5],
+        'bidPrice': [9.9 + k] * 2,
+        'bidVol': [5, 4],
+    } for k, code in enumerate(CODES)}
+
+
+def test_tick_journal_index(tmp_path):
+    path = str(tmp_path / 'ticks.bin')
+    writer = TickJournalWriter(path, '20250620')
+    seconds = JOURNAL_BLOCK_RECORDS // len(CODES) + 100     # 跨越多个时间块
+    for second in range(seconds):
+        writer.append_quotes(_quotes(second))
+    writer.close()
+
+    reader = TickJournalReader(path)
+    assert reader.is_indexed
+    assert reader.trade_date == '20250620'
+    assert reader.codes() == CODES
+
+    records = reader.read_code('600000.SH')
+    assert len(records) == seconds
+    assert records['time'][0] == BASE_MS and records['price'][-1] == 11.0 + (seconds - 1) * 0.01
+
+    records = reader.read_code('000001.SZ', BASE_MS + 10_000, BASE_MS + 19_000)
+    assert records['volume'].tolist() == [100 * s for s in range(10, 20)]
+
+    records = reader.read_range(BASE_MS + 5_000, BASE_MS + 6_000)
+    assert len(records) == 2 * len(CODES)
+
+    tick = reader.read_ticks('300750.SZ')[3]
+    assert tick[0] == '09:30:03'
+    assert tick[1] == 12.03
+    assert tick[8] == [11.9, 11.9, 0.0, 0.0, 0.0]
+    assert reader.read_code('688001.SH').shape == (0,)
+    reader.close()
+
+
+def test_tick_journal_recover(tmp_path):
+    path = str(tmp_path / 'ticks.bin')
+    writer = TickJournalWriter(path, '20250620', fsync_seconds=0)
+    for second in range(10):
+        writer.append_quotes(_quotes(second))
+    writer.flush()
+    writer.file.close()
+
+    # 模拟崩溃：留下半条记录，也没有索引
+    with open(path, 'ab') as f:
+        f.write(b'\x00' * 17)
+    reader = TickJournalReader(path)
+    assert not reader.is_indexed
+    assert len(reader.read_code('000001.SZ')) == 10
+    reader.close()
+
+    # 重启后接着写
+    writer = TickJournalWriter(path, '20250620')
+    for second in range(10, 15):
+        writer.append_quotes(_quotes(second))
+    writer.close()
+
+    reader = TickJournalReader(path)
+    assert reader.is_indexed
+    assert reader.read_code('600000.SH')['volume'].tolist() == [100 * s for s in range(15)]
+    reader.close()
+
+
+def test_tick_journal_crash_in_close(tmp_path):
+    path = str(tmp_path / 'ticks.bin')
+    writer = TickJournalWriter(path, '20250620', fsync_seconds=0)
+    for second in range(10):
+        writer.append_quotes(_quotes(second))
+
+    # 模拟收盘写索引时崩溃：头部已记下条数，索引只写了一半，没有尾部
+    writer._write_header(writer.record_count)
+    writer.file.seek(0, 2)
+    writer.file.write(b'{"codes": {"000001.SZ": [0, 10], "600000.SH"' + b'\x00' * 300)
+    writer.file.close()
+
+    reader = TickJournalReader(path)
+    assert not reader.is_indexed
+    assert reader.record_count == 10 * len(CODES)
+    assert reader.codes() == sorted(CODES)
+    reader.close()
+
+    writer = TickJournalWriter(path, '20250620')
+    writer.append_quotes(_quotes(10))
+    writer.close()
+    reader = TickJournalReader(path)
+    assert reader.is_indexed
+    assert reader.read_code('300750.SZ')['volume'].tolist() == [100 * s for s in range(11)]
+    reader.close()
@@ -0,0 +1,47 @@
+import numpy as np
+
+from selector.selector_6msj import select
+from tools.utils_livebar import LiveBarCache
+from tools.utils_remote import concat_ak_quote_dict
+
+from sample_data import make_history
+
+
+def test_live_bar_matches_concat():
+    cache = LiveBarCache()
+    history = make_history(120)
+    cache.build({'000001.SZ': history})
+    rng = np.random.default_rng(1)
+    frames = set()
+    for price in rng.uniform(8, 14, 10).round(2):
+        quote = {'open': 10.0, 'high': max(price, 10.5), 'low': min(price, 9.5), 'lastPrice': price,
+                 'volume': 3000, 'amount': 3000 * price}
+        df = cache.update('000001.SZ', history, quote, '20260101')
+        frames.add(id(df))
+        expected = concat_ak_quote_dict(history, quote, '20260101')
+
+        assert len(df) == len(expected) == 121
+        assert df['datetime'].values[-1] == '20260101'
+        for column in ['open', 'high', 'low', 'close', 'volume', 'amount']:
+            assert np.array_equal(df[column].to_numpy(dtype=float), expected[column].to_numpy(dtype=float))
+        assert np.array_equal(select(df, '000001.SZ', quote)['PASS'].values,
+                              select(expected, '000001.SZ', quote)['PASS'].values)
+
+    assert len(frames) == 1                     # 同一个 DataFrame 原地覆盖今天一行
+    assert len(history) == 120 and 'PASS' not in history.columns
+
+    longer = make_history(121)
+    assert len(cache.update('000001.SZ', longer, quote, '20260102')) == 122
+
+
+def test_live_bar_with_int_datetime():
+    # 各数据源的 cache_history 里 datetime 都是 20250101 这样的整数
+    history = make_history(30)
+    history['datetime'] = np.arange(20250101, 20250131)
+    quote = {'open': 10.0, 'high': 10.5, 'low': 9.5, 'lastPrice': 10.2, 'volume': 3000, 'amount': 30600.0}
+    df = LiveBarCache().update('000001.SZ', history, quote, '2026-01-01')
+
+    assert df['datetime'].values[-1] == 20260101
+    assert df['datetime'].dtype.kind == 'i'
+    assert np.array_equal(df['datetime'].values[:-1], history['datetime'].values)
+    assert df['close'].values[-1] == 10.2
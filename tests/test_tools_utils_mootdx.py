@@ -0,0 +1,336 @@
+import pytest
+
+import time
+import socket
+import datetime
+import threading
+
+import numpy as np
+import pandas as pd
+
+import tools.utils_mootdx as utils_mootdx
+from tools.utils_governor import RequestGovernor, RequestSource
+from tools.utils_mootdx import MootdxClientPool, probe_mootdx_servers, mootdx_quotes_to_ticks, \
+    get_mootdx_quotes_frame, MOOTDX_QUOTES_BATCH, MootdxQuotePoller
+
+
+class FakeTdxServer:
+    # 本地监听一个端口，只负责接受连接，供测速使用
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.bind(('127.0.0.1', 0))
+        self.sock.listen(16)
+        self.port = self.sock.getsockname()[1]
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+                conn.close()
+            except OSError:
+                return
+
+    def close(self):
+        self.sock.close()
+
+
+class FakeQuotes:
+    def __init__(self, ip: str, port: int, broken: bool = False):
+        self.port = port
+        self.broken = broken
+        self.lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+        self.closed = False
+
+    def quotes(self, symbol):
+        if self.broken:
+            raise ConnectionError('server gone')
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(0.02)
+        with self.lock:
+            self.running -= 1
+        return self.port, symbol
+
+    def close(self):
+        self.closed = True
+
+
+def _dead_port() -> int:
+    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    s.bind(('127.0.0.1', 0))
+    port = s.getsockname()[1]
+    s.close()
+    return port
+
+
+@pytest.fixture
+def servers():
+    ans = [FakeTdxServer() for _ in range(3)]
+    yield ans
+    for server in ans:
+        server.close()
+
+
+def test_probe_mootdx_servers(servers):
+    dead = _dead_port()
+    hosts = [('127.0.0.1', dead)] + [('127.0.0.1', s.port) for s in servers]
+
+    ranking = probe_mootdx_servers(hosts, timeout=0.5)
+
+    assert sorted(port for _, _, port in ranking) == sorted(s.port for s in servers)
+    assert [r[0] for r in ranking] == sorted(r[0] for r in ranking)
+
+
+def test_mootdx_pool_parallel_dispatch(servers):
+    created = []
+
+    def factory(ip, port):
+        created.append(FakeQuotes(ip, port))
+        return created[-1]
+
+    hosts = [('127.0.0.1', _dead_port())] + [('127.0.0.1', s.port) for s in servers]
+    policy = RequestGovernor().policy(RequestSource.MOOTDX)
+    pool = MootdxClientPool(size=2, hosts=hosts, client_factory=factory, probe_timeout=0.5)
+    assert RequestGovernor().policy(RequestSource.MOOTDX) is policy     # 构造连接池不改全局 Governor
+    RequestGovernor().configure(RequestSource.MOOTDX, pool.governor_policy())
+
+    results = pool.map('quotes', [{'symbol': [str(i)]} for i in range(8)])
+
+    assert [r[1] for r in results] == [[str(i)] for i in range(8)]
+    assert len(created) == 2
+    # 两个连接同时在用，但每个连接同一时间只有一个请求
+    assert len({r[0] for r in results}) == 2
+    assert all(c.peak == 1 for c in created)
+
+
+def test_mootdx_pool_evict_broken_server(servers):
+    created = []
+
+    def factory(ip, port):
+        # 第一台连上的服务器是坏的
+        created.append(FakeQuotes(ip, port, broken=(len(created) == 0)))
+        return created[-1]
+
+    hosts = [('127.0.0.1', s.port) for s in servers]
+    pool = MootdxClientPool(size=2, hosts=hosts, client_factory=factory, probe_timeout=0.5, max_failures=2)
+    broken_port = created[0].port
+
+    failures = 0
+    for i in range(10):
+        try:
+            pool.call('quotes', symbol=[str(i)])
+        except ConnectionError:
+            failures += 1
+
+    assert failures == 2
+    assert created[0].closed
+    # 剔除后用排名靠后的第三台服务器补足
+    assert len(created) == 3
+    assert sorted(m.port for m in pool.members) == sorted(s.port for s in servers if s.port != broken_port)
+
+
+def test_mootdx_pool_refresh_closes_idle_evicted(servers):
+    created = []
+
+    def factory(ip, port):
+        created.append(FakeQuotes(ip, port))
+        return created[-1]
+
+    hosts = [('127.0.0.1', s.port) for s in servers]
+    pool = MootdxClientPool(size=2, hosts=hosts, client_factory=factory, probe_timeout=0.5)
+    gone = created[0]
+    pool.hosts = [host for host in hosts if host[1] != gone.port]     # 这台服务器测速不再可达
+
+    # 重新测速时剔除的空闲连接要立即关闭，不能等到下次取出时才丢弃
+    pool.refresh()
+    assert gone.closed
+    assert len(created) == 3 and not any(c.closed for c in created[1:])
+    results = [pool.call('quotes', symbol=[str(i)]) for i in range(4)]
+    assert gone.port not in {r[0] for r in results}
+
+
+def _make_quotes_frame(symbols: list[str]) -> pd.DataFrame:
+    rng = np.random.default_rng(len(symbols))
+    n = len(symbols)
+    data = {
+        'market': [1 if s.startswith('6') else (2 if s.startswith(('8', '9')) else 0) for s in symbols],
+        'code': symbols,
+        'servertime': [f'{9 + i % 6}:{i % 60:02d}:{(i * 7 % 600) / 10:06.3f}' for i in range(n)],
+        'price': rng.uniform(5, 50, n).round(2),
+        'open': rng.uniform(5, 50, n).round(2),
+        'high': rng.uniform(5, 50, n).round(2),
+        'low': rng.uniform(5, 50, n).round(2),
+        'last_close': rng.uniform(5, 50, n).round(2),
+        'amount': rng.uniform(1e6, 1e8, n).round(0),
+        'vol': rng.integers(100, 100000, n),
+    }
+    for i in range(5):
+        data[f'ask{i + 1}'] = rng.uniform(5, 50, n).round(2)
+        data[f'bid{i + 1}'] = rng.uniform(5, 50, n).round(2)
+        data[f'ask_vol{i + 1}'] = rng.integers(1, 1000, n)
+        data[f'bid_vol{i + 1}'] = rng.integers(1, 1000, n)
+    return pd.DataFrame(data)
+
+
+def _row_to_tick(row: pd.Series) -> dict:
+    # 逐行转换的旧实现，用来比对结果
+    date_str = datetime.datetime.today().strftime('%Y-%m-%d')
+    datetime_obj = datetime.datetime.strptime(f"{date_str} {row['servertime']}", '%Y-%m-%d %H:%M:%S.%f')
+    return {
+        'time': int(datetime_obj.timestamp() * 1000),
+        'lastPrice': row['price'],
+        'open': row['open'],
+        'high': row['high'],
+        'low': row['low'],
+        'lastClose': row['last_close'],
+        'amount': row['amount'],
+        'volume': row['vol'],
+        'pvolume': row['vol'] * 100,
+        'askPrice': [row[f'ask{i + 1}'] for i in range(5)],
+        'bidPrice': [row[f'bid{i + 1}'] for i in range(5)],
+        'askVol': [row[f'ask_vol{i + 1}'] for i in range(5)],
+        'bidVol': [row[f'bid_vol{i + 1}'] for i in range(5)],
+    }
+
+
+def test_mootdx_quotes_to_ticks():
+    df = _make_quotes_frame(['000001', '600000', '300750', '688001', '830799'])
+    ticks = mootdx_quotes_to_ticks(df)
+
+    assert list(ticks.keys()) == ['000001.SZ', '600000.SH', '300750.SZ', '688001.SH', '830799.BJ']
+    for (_, row), tick in zip(df.iterrows(), ticks.values()):
+        expected = _row_to_tick(row)
+        # 旧实现浮点截断可能差 1 毫秒
+        assert abs(tick.pop('time') - expected.pop('time')) <= 1
+        assert tick == expected
+
+
+def test_get_mootdx_quotes_frame_batched(monkeypatch):
+    class FakePool:
+        size = 4
+
+        def __init__(self):
+            self.lock = threading.Lock()
+            self.batches = []
+
+        def call(self, method, symbol):
+            with self.lock:
+                self.batches.append(len(symbol))
+            return _make_quotes_frame(symbol)
+
+    pool = FakePool()
+    monkeypatch.setattr(utils_mootdx, 'get_mootdx_pool', lambda: pool)
+
+    codes = [f'{i:06d}.SZ' for i in range(1, 201)]
+    quotes = mootdx_quotes_to_ticks(get_mootdx_quotes_frame(codes))
+
+    assert sorted(pool.batches) == sorted([MOOTDX_QUOTES_BATCH, MOOTDX_QUOTES_BATCH, 200 - 2 * MOOTDX_QUOTES_BATCH])
+    assert list(quotes.keys()) == codes
+
+
+def test_mootdx_quote_poller_pipelined():
+    slow_code = '000101.SZ'
+    release = threading.Event()
+    calls = []
+
+    def fetch(code_list):
+        calls.append(tuple(code_list))
+        if slow_code in code_list:
+            release.wait(2)
+        return {code: {'time': 0, 'lastPrice': 1.0} for code in code_list if code != '000002.SZ'}
+
+    codes = [f'{i:06d}.SZ' for i in range(1, 201)]
+    poller = MootdxQuotePoller(codes, period=0.2, workers=4, fetch=fetch)
+    try:
+        sent = poller.poll_once()
+        time.sleep(0.1)
+        stats = poller.finish_cycle(sent)
+        assert stats['sent'] == 3
+        assert stats['returned'] == 2 and stats['inflight'] == 1
+        assert stats['missing'] == MOOTDX_QUOTES_BATCH + 1
+        assert stats['completeness'] == (200 - MOOTDX_QUOTES_BATCH - 1) / 200
+
+        # 慢批次还没返回时不重复发送
+        assert poller.poll_once() == 2
+        release.set()
+        time.sleep(0.1)
+        snapshot = poller.snapshot()
+        assert len(snapshot) == 199 and '000002.SZ' not in snapshot
+        assert poller.get_received_ms(slow_code) >= poller.get_received_ms('000001.SZ') > 0
+        assert len(calls) == 5
+    finally:
+        poller.stop()
+
+    poller.set_codes(codes[:10])
+    assert sorted(poller.snapshot()) == [c for c in codes[:10] if c != '000002.SZ']
+
+
+class FakeBarsPool:
+    size = 4
+
+    def __init__(self, bar_count: int, fail_start: int = None):
+        self.dates = pd.bdate_range(end='2025-06-30', periods=bar_count)
+        self.fail_start = fail_start
+        self.lock = threading.Lock()
+        self.requests = []
+
+    def call(self, method, symbol, frequency, offset, start):
+        with self.lock:
+            self.requests.append((start, offset))
+        if start == self.fail_start:
+            raise ConnectionError('timeout')
+        # start=0 为最新一根，每页内部按时间升序
+        end = len(self.dates) - start
+        begin = max(0, end - offset)
+        if end <= 0:
+            return pd.DataFrame()
+        dates = self.dates[begin:end]
+        return pd.DataFrame({
+            'datetime': dates.strftime('%Y-%m-%d 15:00'),
+            'close': np.arange(begin, end, dtype=float),
+        })
+
+
+def test_plan_bar_pages():
+    assert utils_mootdx._plan_bar_pages(0) == []
+    assert utils_mootdx._plan_bar_pages(500, 3) == [(3, 500)]
+    assert utils_mootdx._plan_bar_pages(2000, 5) == [(5, 800), (805, 800), (1605, 400)]
+
+
+def test_get_bars_with_offset_pages():
+    pool = FakeBarsPool(3000)
+    df = utils_mootdx._get_bars_with_offset(pool, '000001', 2000, 10)
+
+    assert len(df) == 2000
+    assert df['close'].tolist() == list(np.arange(990, 2990, dtype=float))
+    assert df['datetime'].is_monotonic_increasing
+    assert sorted(pool.requests) == [(10, 800), (810, 800), (1610, 400)]
+
+    # 上市不足的票，超出部分的分页为空
+    pool = FakeBarsPool(1000)
+    df = utils_mootdx._get_bars_with_offset(pool, '000001', 2000, 0)
+    assert df['close'].tolist() == list(np.arange(0, 1000, dtype=float))
+
+    # 中间分页失败时只保留最新的连续部分
+    pool = FakeBarsPool(3000, fail_start=800)
+    df = utils_mootdx._get_bars_with_offset(pool, '000001', 2400, 0)
+    assert df['close'].tolist() == list(np.arange(2200, 3000, dtype=float))
+
+
+def test_get_offset_start(tmp_path):
+    path = tmp_path / 'trade_days.csv'
+    days = pd.bdate_range('2025-06-02', '2025-06-30')
+    pd.DataFrame({'trade_date': days.strftime('%Y-%m-%d')}).to_csv(path)
+
+    now = datetime.datetime(2025, 6, 20, 16, 0)
+    # 6/9 - 6/13 共5个交易日，+1 为当天日线，6/13 到 6/20 还有5个交易日
+    assert utils_mootdx._get_offset_start(str(path), '20250609', '20250613', now) == (6, 5)
+    # 开盘前当天还没有日线
+    now = datetime.datetime(2025, 6, 20, 9, 0)
+    assert utils_mootdx._get_offset_start(str(path), '20250607', '20250614', now) == (6, 4)
+    assert str(path) in utils_mootdx.trade_dates_cache
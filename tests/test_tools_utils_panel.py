@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+import mytt.MyTT_panel as pn
+from mytt.MyTT import EMA, SMA, HHV, MA, SUM, SLOPE
+from selector import selector_6msj, selector_daban, selector_deepseek
+from tools.utils_panel import build_history_panel
+
+from sample_data import make_universe
+
+
+def test_panel_functions_match_single_series():
+    rng = np.random.default_rng(3)
+    panel = np.round(rng.random((40, 120)) * 20 + 5, 2)
+    panel[:10, 40:70] = panel[:10, 40:41]        # 横盘段：均线走平，SLOPE 的符号取决于逐位一致
+    panel[10:20, :30] = np.nan                   # 历史较短，左侧补位
+    for N in [3, 5, 10, 30, 60]:
+        ma = pn.MA(panel, N)
+        for i in range(len(panel)):
+            row = panel[i][~np.isnan(panel[i])]
+            start = len(panel[i]) - len(row)
+            assert np.array_equal(ma[i][start:], MA(row, N), equal_nan=True)
+            assert np.array_equal(pn.SUM(panel, N)[i][start:], SUM(row, N), equal_nan=True)
+            assert np.array_equal(pn.SLOPE(ma, 3)[i][start:], SLOPE(MA(row, N), 3), equal_nan=True)
+            assert np.array_equal(pn.EMA(panel, N)[i][start:], EMA(row, N), equal_nan=True)
+            assert np.array_equal(pn.SMA(panel, N, 1)[i][start:], SMA(row, N, 1), equal_nan=True)
+            assert np.array_equal(pn.HHV(panel, N)[i][start:], HHV(row, N), equal_nan=True)
+
+
+def test_select_batch_matches_select():
+    histories = make_universe(120, 250)
+    panel = build_history_panel(histories)
+    mask = panel.valid_mask()
+    for selector in [selector_6msj, selector_daban, selector_deepseek]:
+        result = selector.select_batch(panel)
+        for i, (code, df) in enumerate(histories.items()):
+            expected = selector.select(df.copy(), code, None)['PASS'].to_numpy(dtype=bool)
+            assert np.array_equal(result[i][mask[i]], expected), f'{selector.__name__} {code}'
+
+    passed = panel.last_passed(selector_6msj.select_batch(panel))
+    assert len(passed) == len(histories)
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from tools.utils_quotes import QuoteMatrix, get_changed_codes
+
+
+def _quote(price: float, last_close: float) -> dict:
+    return {
+        'time': 1750383000000,
+        'lastPrice': price,
+        'open': last_close,
+        'high': price,
+        'low': last_close,
+        'lastClose': last_close,
+        'volume': 100,
+        'amount': 100 * price * 100,
+        'bidPrice': [price - 0.01, price - 0.02],
+        'bidVol': [10, 20],
+        'askPrice': [],
+        'askVol': [],
+    }
+
+
+def test_quote_matrix_update_in_place():
+    matrix = QuoteMatrix(init_codes=2)
+    matrix.update({'000001.SZ': _quote(11.0, 10.0), '600000.SH': _quote(9.5, 10.0)})
+    matrix.update({'300750.SZ': _quote(12.0, 10.0), '000001.SZ': _quote(10.5, 10.0)})
+
+    assert matrix.codes == ['000001.SZ', '600000.SH', '300750.SZ']
+    assert matrix.view().shape == (3, 12)
+    assert matrix.column('lastPrice').tolist() == [10.5, 9.5, 12.0]
+    assert matrix.column('bidVol1').tolist() == [10, 10, 10]
+    assert matrix.column('askPrice1').tolist() == [0, 0, 0]
+    assert np.allclose(matrix.change_pct(), [5.0, -5.0, 20.0])
+
+    assert matrix.top_gainers(2) == ['300750.SZ', '000001.SZ']
+    assert matrix.top_gainers(5, ['600000.SH', '000001.SZ', '688001.SH']) == ['000001.SZ', '600000.SH']
+
+    with pytest.raises(ValueError):
+        matrix.column('lastPrice')[0] = 0
+    with pytest.raises(ValueError):
+        matrix.data[0, 0] = 0
+
+    snapshot = matrix.snapshot()
+    matrix.update({'000001.SZ': _quote(11.0, 10.0)})
+    assert snapshot.column('lastPrice')[0] == 10.5
+    assert matrix.column('lastPrice')[0] == 11.0
+
+
+def test_get_changed_codes():
+    prev = {'000001.SZ': _quote(11.0, 10.0), '600000.SH': _quote(9.5, 10.0)}
+    quiet = dict(prev['000001.SZ'])
+    moved = _quote(9.5, 10.0)
+    moved['bidVol'] = [30, 20]
+    quotes = {'000001.SZ': quiet, '600000.SH': moved, '300750.SZ': _quote(12.0, 10.0)}
+    assert get_changed_codes(prev, quotes) == ['600000.SH', '300750.SZ']
+    assert get_changed_codes({}, quotes) == list(quotes)
@@ -0,0 +1,69 @@
+import json
+import datetime
+
+from tools.utils_clock import FakeClock, get_now
+from tools.utils_journal import TickJournalWriter
+from tools.utils_replay import TickReplayer, load_journal_batches, load_tick_history_batches
+
+
+BASE = datetime.datetime(2025, 6, 20, 9, 30)
+BASE_MS = int(BASE.timestamp() * 1000)
+
+
+def _quote(second: int, price: float) -> dict:
+    return {
+        'time': BASE_MS + second * 1000,
+        'lastPrice': price,
+        'high': price,
+        'low': price,
+        'volume': 100 * (second + 1),
+        'amount': 1000.0 * (second + 1),
+        'askPrice': [price + 0.01],
+        'askVol': [1],
+        'bidPrice': [price - 0.01],
+        'bidVol': [2],
+    }
+
+
+def test_replay_journal(tmp_path):
+    path = str(tmp_path / 'ticks.bin')
+    writer = TickJournalWriter(path, '20250620')
+    writer.append_quotes({'000001.SZ': _quote(0, 10.0), '600000.SH': _quote(0, 8.0)})
+    writer.append_quotes({'000001.SZ': _quote(3, 10.1)})
+    writer.append_quotes({'600000.SH': _quote(2, 8.1)})     # 乱序写入，回放时按时间排序
+    writer.close()
+
+    seen = []
+
+    def callback(quotes):
+        seen.append((get_now(), sorted(quotes), [q['open'] for q in quotes.values()]))
+
+    replayer = TickReplayer(callback, speed=0)
+    stats = replayer.run(load_journal_batches(path, last_closes={'000001.SZ': 9.9}))
+
+    assert [s[0] for s in seen] == [BASE, BASE + datetime.timedelta(seconds=2), BASE + datetime.timedelta(seconds=3)]
+    assert seen[0][1] == ['000001.SZ', '600000.SH']
+    assert seen[2][2] == [10.0]                 # 开盘价取第一笔成交价
+    assert stats['batches'] == 3 and stats['quotes'] == 4
+    assert get_now() != BASE                    # 回放结束恢复系统时间
+
+    batches = list(load_journal_batches(path, codes=['600000.SH']))
+    assert [len(q) for _, q in batches] == [1, 1]
+    assert batches[0][1]['600000.SH']['lastClose'] == 0.0
+
+
+def test_replay_tick_history_speed(tmp_path):
+    path = str(tmp_path / 'tick_history.json')
+    with open(path, 'w') as f:
+        json.dump({'000001.SZ': [
+            ['09:30:00', 10.0, 10.0, 10.0, 100, 1000.0, [10.01], [1], [9.99], [2]],
+            ['09:30:01', 10.1, 10.1, 10.0, 200, 2010.0, [10.11], [1], [10.09], [2]],
+        ]}, f)
+
+    clock = FakeClock()
+    times = []
+    replayer = TickReplayer(lambda quotes: times.append(clock.now()), speed=5, clock=clock)
+    stats = replayer.run(load_tick_history_batches(path, '2025-06-20'))
+
+    assert times == [BASE, BASE + datetime.timedelta(seconds=1)]
+    assert stats['elapsed'] >= 0.2              # 5 倍速回放 1 秒的行情
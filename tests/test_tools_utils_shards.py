@@ -0,0 +1,66 @@
+import time
+
+from tools.utils_shards import ShardedEvaluator, get_shard_index, split_quotes
+
+
+def evaluate_breakout(curr_date, curr_time, curr_seconds, quotes, ticks):
+    # 分片内逐票判断：最近 3 个 tick 连续上涨
+    intents = []
+    for code in quotes:
+        prices = ticks.last(code, 3)
+        if code == 'ERR.SZ':
+            raise ValueError('bad code')
+        if len(prices) == 3 and prices[0] < prices[1] < prices[2]:
+            intents.append(('buy', code, float(prices[-1])))
+    return intents
+
+
+slow_rounds = []
+
+
+def evaluate_slow(curr_date, curr_time, curr_seconds, quotes, ticks):
+    # 每轮都比超时慢，返回子进程里实际执行过的轮次和本轮看到的 tick 条数
+    time.sleep(0.3)
+    slow_rounds.append(curr_seconds)
+    return [(list(slow_rounds), len(ticks.last(code, 10))) for code in quotes]
+
+
+def _quote(price: float) -> dict:
+    return {'time': 1750383000000, 'lastPrice': price, 'high': price, 'low': price, 'volume': 1, 'amount': 1.0,
+            'askPrice': [], 'askVol': [], 'bidPrice': [], 'bidVol': []}
+
+
+def test_split_quotes():
+    codes = [f'{i:06d}.SZ' for i in range(100)]
+    shards = split_quotes({code: {} for code in codes}, 3)
+    assert sum(len(s) for s in shards) == 100
+    assert all(get_shard_index(code, 3) == k for k, s in enumerate(shards) for code in s)
+
+
+def test_sharded_evaluator():
+    codes = [f'{i:06d}.SZ' for i in range(20)]
+    with ShardedEvaluator(evaluate_breakout, shard_count=2, tick_capacity=10, timeout=5) as evaluator:
+        assert evaluator.evaluate('2025-06-20', '09:30', '00', {code: _quote(10.0) for code in codes}) == []
+        evaluator.evaluate('2025-06-20', '09:30', '01', {code: _quote(10.1) for code in codes})
+        rising = {code: _quote(10.2 if i % 2 == 0 else 10.0) for i, code in enumerate(codes)}
+        intents = evaluator.evaluate('2025-06-20', '09:30', '02', rising)
+        assert sorted(intents) == sorted(('buy', code, 10.2) for code in codes[::2])
+
+        evaluator.reset()       # 新的一天清空分片 tick
+        assert evaluator.evaluate('2025-06-21', '09:30', '00', rising) == []
+
+        quotes = {code: _quote(10.0) for code in codes}
+        quotes['ERR.SZ'] = _quote(10.0)
+        assert evaluator.evaluate('2025-06-21', '09:30', '01', quotes) is not None
+        assert evaluator.failed == 1 and evaluator.late == 0
+    assert evaluator.processes == []
+
+
+def test_sharded_evaluator_skips_backlog():
+    # 落后的分片只执行最新一轮，积压的行情仍然记进 tick
+    with ShardedEvaluator(evaluate_slow, shard_count=1, tick_capacity=10, timeout=0.05) as evaluator:
+        for i in range(3):
+            assert evaluator.evaluate('2025-06-20', '09:30', f'{i:02d}', {'000001.SZ': _quote(10.0 + i)}) == []
+        evaluator.timeout = 5
+        assert evaluator.evaluate('2025-06-20', '09:30', '03', {'000001.SZ': _quote(10.3)}) == [(['00', '03'], 4)]
+        assert evaluator.late == 3
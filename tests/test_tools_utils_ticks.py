@@ -0,0 +1,72 @@
+import datetime
+
+import numpy as np
+
+from tools.utils_ticks import TickRingBuffer, get_tick_prices_since
+
+
+BASE_MS = int(datetime.datetime(2025, 6, 20, 9, 30).timestamp() * 1000)
+
+
+def _quote(i: int, price: float = None) -> dict:
+    price = 10.0 + i * 0.01 if price is None else price
+    return {
+        'time': BASE_MS + i * 1000,
+        'lastPrice': price,
+        'high': price + 0.1,
+        'low': price - 0.1,
+        'volume': 100 * i,
+        'amount': 1000.0 * i,
+        'askPrice': [price + 0.01 * (k + 1) for k in range(5)],
+        'askVol': [k + 1 for k in range(5)],
+        'bidPrice': [price - 0.01 * (k + 1) for k in range(3)],    # 档位不足时补 0
+        'bidVol': [k + 1 for k in range(3)],
+    }
+
+
+def test_tick_ring_buffer_wrap_and_grow():
+    buffer = TickRingBuffer(capacity=5, init_codes=1)
+    for i in range(8):
+        buffer.append_quotes({'000001.SZ': _quote(i), f'{i:06d}.SH': _quote(i)})
+
+    assert len(buffer) == 9     # 从 1 行扩容
+    assert buffer.size('000001.SZ') == 5
+    assert buffer.size('000007.SH') == 1
+    assert buffer.size('600000.SH') == 0
+
+    assert np.allclose(buffer.last('000001.SZ'), [10.03, 10.04, 10.05, 10.06, 10.07])
+    assert np.allclose(buffer.last('000001.SZ', 2), [10.06, 10.07])
+    assert buffer.last('000001.SZ', field='volume').tolist() == [300, 400, 500, 600, 700]
+    assert buffer.last('000001.SZ', 1, field='bidVol').tolist() == [[1, 2, 3, 0, 0]]
+
+    view = buffer['000001.SZ']
+    assert len(view) == 5
+    assert view[0][:6] == ['09:30:03', 10.03, 10.13, 9.93, 300, 3000.0]
+    assert view[-1][1] == 10.07
+    assert view[-1][8] == [10.06, 10.05, 10.04, 0.0, 0.0]
+
+    buffer.clear()
+    assert len(buffer) == 0 and '000001.SZ' not in buffer
+
+
+def test_tick_ring_buffer_since():
+    buffer = TickRingBuffer(capacity=10)
+    for i in range(25):
+        buffer.append('000001.SZ', _quote(i, price=10.5 if i >= 20 else 10.0))
+
+    start_ms = BASE_MS + (24 - 3) * 1000
+    assert buffer['000001.SZ'].since(start_ms).tolist() == [10.5] * 4
+    assert buffer['000001.SZ'].since(start_ms, field='time').tolist() == [BASE_MS + i * 1000 for i in range(21, 25)]
+    assert len(buffer.since('000001.SZ', BASE_MS)) == 10
+
+
+def test_tick_prices_since_list_mode():
+    # 不开环形缓冲时 today_ticks 是 list，取窗口内价格的结果要一致
+    buffer = TickRingBuffer(capacity=30)
+    for i in range(25):
+        buffer.append('000001.SZ', _quote(i, price=10.5 if i >= 20 else 10.0))
+    start_ms = BASE_MS + 21 * 1000
+    view = buffer['000001.SZ']
+    assert get_tick_prices_since(view, start_ms).tolist() == [10.5] * 4
+    assert get_tick_prices_since(view.to_list(), start_ms).tolist() == [10.5] * 4
+    assert len(get_tick_prices_since([], start_ms)) == 0
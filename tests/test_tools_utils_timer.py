@@ -0,0 +1,48 @@
+import time
+import datetime
+
+from tools.utils_clock import FakeClock, install_fake_clock, uninstall_fake_clock
+from tools.utils_timer import TimerWheel, parse_windows
+
+
+def test_timer_wheel_cadence():
+    wheel = TimerWheel(name='test')
+    fired = []
+    steady = wheel.add_job(lambda: fired.append(time.monotonic()), interval=0.05, name='steady', align=False)
+    slow = wheel.add_job(lambda: time.sleep(0.12), interval=0.05, name='slow', align=False)
+
+    wheel.start()
+    time.sleep(0.6)
+    wheel.stop(timeout=1)
+
+    # 慢任务拖慢了同一线程里的其他任务，错过的周期跳过不补跑
+    assert slow.overruns == slow.runs > 0
+    assert slow.skipped > 0
+    assert steady.runs + steady.skipped >= 9
+    gaps = [b - a for a, b in zip(fired, fired[1:])]
+    assert all(gap > 0.04 for gap in gaps)          # 没有补跑造成的连发
+    assert 'steady' in wheel.summary()
+
+
+def test_timer_wheel_windows():
+    assert parse_windows([('09:15:00', '11:30:00'), ('13:00', '15:00')]) == [(33300, 41400), (46800, 54000)]
+
+    clock = FakeClock(datetime.datetime(2025, 6, 20, 12, 0))
+    install_fake_clock(clock)
+    try:
+        wheel = TimerWheel(name='test')
+        calls = []
+        job = wheel.add_job(calls.append, interval=0.01, args=(1,), windows=[('09:15', '11:30')], align=False)
+        wheel.advance(time.monotonic() + 0.05)
+        assert calls == [] and job.runs == 0        # 午休不执行
+
+        clock.set(datetime.datetime(2025, 6, 20, 10, 0))
+        wheel.advance(time.monotonic() + 0.2)
+        assert len(calls) == job.runs > 0
+
+        wheel.remove_job(job)
+        runs = job.runs
+        wheel.advance(time.monotonic() + 0.5)
+        assert job.runs == runs
+    finally:
+        uninstall_fake_clock()
@@ -0,0 +1,58 @@
+import json
+import random
+import threading
+
+from tools.utils_trace import LatencyHistogram, LatencyTracer
+
+
+def test_latency_histogram_precision():
+    hist = LatencyHistogram()
+    values = [random.randint(1, 5_000_000) for _ in range(20000)]     # 1us - 5s
+    for v in values:
+        hist.record(v / 1_000_000)
+    values.sort()
+
+    assert hist.count == len(values) and hist.max == values[-1]
+    for q in [50, 90, 99, 99.9]:
+        exact = values[int(len(values) * q / 100 + 0.5) - 1]
+        assert exact <= hist.percentile(q) <= exact * 1.035
+    assert hist.percentile(100) == values[-1]
+
+    small = LatencyHistogram()
+    for v in [0, 3, 31]:
+        small.record(v / 1_000_000)
+    assert [small.percentile(q) for q in [30, 60, 100]] == [0, 3, 31]
+
+
+def test_latency_tracer(tmp_path):
+    path = str(tmp_path / 'trace' / 'latency.jsonl')
+    tracer = LatencyTracer(path=path, dump_seconds=3600)
+
+    assert tracer.begin() == 0.0
+    tracer.mark('quote_merged')
+    with tracer.span('order_submit_call'):
+        pass
+    assert tracer.histograms == {}          # 未开启不记录
+
+    tracer.enable()
+    origin = tracer.begin()
+    tracer.mark('quote_merged')
+
+    def strategy():
+        tracer.resume(origin)               # 策略线程接续行情线程的起点
+        tracer.mark('strategy_start')
+        with tracer.span('order_submit_call'):
+            pass
+
+    thread = threading.Thread(target=strategy)
+    thread.start()
+    thread.join()
+    assert sorted(tracer.histograms) == ['order_submit_call', 'quote_merged', 'strategy_start']
+    assert tracer.histograms['strategy_start'].max >= tracer.histograms['quote_merged'].max
+
+    tracer.dump()
+    assert tracer.histograms == {}
+    with open(path) as f:
+        lines = [json.loads(line) for line in f]
+    assert len(lines) == 1
+    assert lines[0]['stages']['strategy_start']['count'] == 1
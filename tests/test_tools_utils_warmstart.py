@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+from tools.utils_bars import MinuteBarAggregator
+from tools.utils_ticks import TickRingBuffer
+from tools.utils_warmstart import write_snapshot, read_snapshot, pack_histories, unpack_histories, \
+    pack_ring_buffer, unpack_ring_buffer, pack_tick_lists, unpack_tick_lists, pack_minute_bars, unpack_minute_bars
+
+
+def _quote(time_ms: int, price: float, volume: int) -> dict:
+    return {
+        'time': time_ms, 'lastPrice': price, 'high': price, 'low': price, 'volume': volume, 'amount': volume * price,
+        'askPrice': [price + 0.01] * 5, 'askVol': [1] * 5, 'bidPrice': [price - 0.01] * 5, 'bidVol': [2] * 5,
+    }
+
+
+def test_warm_start_snapshot_roundtrip(tmp_path):
+    histories = {
+        '000001.SZ': pd.DataFrame({'datetime': ['20250102', '20250103'], 'close': [10.0, 10.5], 'volume': [1, 2]}),
+        '600000.SH': pd.DataFrame({'datetime': ['20250103'], 'close': [7.0], 'volume': [3]}),
+        '300750.SZ': pd.DataFrame({'datetime': [20250103], 'close': [200.0]}),
+    }
+    meta = {}
+    meta['histories'], arrays = pack_histories(histories)
+
+    trade_date = '2025-01-06'
+    base = int(pd.Timestamp('2025-01-06 09:30:00').timestamp() * 1000)
+    ring = TickRingBuffer(capacity=4)
+    for i in range(6):
+        ring.append('000001.SZ', _quote(base + i * 3000, 10.0 + i * 0.01, 100 + i))
+    meta['ticks'], ring_arrays = pack_ring_buffer(ring)
+    arrays.update(ring_arrays)
+
+    ticks = {'600000.SH': [['09:30:03', 7.0, 7.0, 7.0, 10, 7000.0, [7.01] * 5, [1] * 5, [6.99] * 5, [2] * 5]]}
+    arrays['tick_records'] = pack_tick_lists(ticks, trade_date)
+
+    bars = MinuteBarAggregator(periods=[1, 5])
+    bars.reset(pd.Timestamp(trade_date).date())
+    for i in range(6):
+        bars.update('000001.SZ', _quote(base + i * 20000, 10.0 + i * 0.01, 100 + i))
+    meta['bars'], bar_arrays = pack_minute_bars(bars)
+    arrays.update(bar_arrays)
+
+    path = str(tmp_path / 'warm.bin')
+    write_snapshot(path, meta, arrays)
+    meta, arrays = read_snapshot(path)
+
+    restored = unpack_histories(meta['histories'], arrays)
+    assert list(restored) == list(histories)
+    for code, df in histories.items():
+        pd.testing.assert_frame_equal(restored[code], df)
+
+    restored_ring = unpack_ring_buffer(meta['ticks'], arrays)
+    assert restored_ring.size('000001.SZ') == 4
+    assert np.array_equal(restored_ring.last('000001.SZ'), ring.last('000001.SZ'))
+    restored_ring.append('000001.SZ', _quote(base + 30000, 11.0, 200))    # 恢复后可以继续写入
+    assert restored_ring.last('000001.SZ', 1)[0] == 11.0
+
+    assert unpack_tick_lists(arrays['tick_records']) == ticks
+
+    restored_bars = MinuteBarAggregator(periods=[1, 5])
+    assert unpack_minute_bars(restored_bars, meta['bars'], arrays)
+    pd.testing.assert_frame_equal(restored_bars.to_frame('000001.SZ', 1), bars.to_frame('000001.SZ', 1))
+
+
+def test_warm_start_snapshot_corrupted(tmp_path):
+    path = str(tmp_path / 'warm.bin')
+    assert read_snapshot(path) is None
+
+    write_snapshot(path, {'trade_date': '2025-01-06'}, {'a': np.arange(10)})
+    with open(path, 'r+b') as f:
+        f.seek(-2, 2)
+        f.write(b'xx')
+    assert read_snapshot(path) is None
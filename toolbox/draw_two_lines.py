@@ -1,6 +1,8 @@
 from pyecharts import options as opts
 from pyecharts.charts import Grid, Line
 
+from tools.utils_downsample import DEFAULT_MAX_POINTS, downsample_indices
+
 
 def draw_two(
     data: list,
@@ -11,6 +13,8 @@ def draw_two(
     maxmin_A: list = None,
     maxmin_B: list = None,
     init_range: list = None,
+    max_points: int = DEFAULT_MAX_POINTS,   # 超过这个点数先降采样，0 为不降采样
+    keep: list = None,                      # 降采样时必须保留的点，bool 序列，与 x 等长
 ):
     if names is None:
         names = ['A', 'B']
@@ -22,6 +26,12 @@ def draw_two(
     y0_data = data[1]
     y1_data = data[2]
 
+    if 0 < max_points < len(x_data):
+        index = downsample_indices([y0_data, y1_data], max_points, keep).tolist()
+        x_data = [x_data[i] for i in index]
+        y0_data = [y0_data[i] for i in index]
+        y1_data = [y1_data[i] for i in index]
+
     max_A = max(y0_data) if maxmin_A is None else maxmin_A[0]
     min_A = min(y0_data) if maxmin_A is None else maxmin_A[1]
 
@@ -1,53 +1,74 @@
 import json
 import datetime
 import pandas as pd
+
+from tools.utils_archive import TickArchive, DEFAULT_ARCHIVE_ROOT, archive_tick_lists
+from tools.utils_downsample import get_limit_touch_mask
 from toolbox.draw_two_lines import draw_two
 
 stock_code = '301396.SZ'
+strategy_name = ''                  # XtSubscriber 按策略名分目录归档
 root = './_cache/debug'
 today = datetime.datetime.now().date().strftime("%Y%m%d")
 
+start_date = today                  # 查询的日期范围：20240101
+end_date = today
+start_time = '09:15:00'             # 每天的时间窗口
+end_time = '15:00:00'
+max_points = 4000                   # 画图的点数上限，超过的按分桶极值降采样
+
+archive_root = f'{DEFAULT_ARCHIVE_ROOT}/{strategy_name}' if strategy_name else DEFAULT_ARCHIVE_ROOT
 source_path = f'{root}/tick_history.json'
-target_path = f'{root}/tick_{today}_{stock_code.split(".")[0]}.csv'
-visualization_path = f'{root}/tick_{today}_{stock_code.split(".")[0]}.html'
+target_path = f'{root}/tick_{start_date}_{end_date}_{stock_code.split(".")[0]}.csv'
+visualization_path = f'{root}/tick_{start_date}_{end_date}_{stock_code.split(".")[0]}.html'
 
 headers = ['timestamp', 'price', 'volume', 'askPrice', 'askVol', 'bidPrice', 'bidVol']
 
 
-def locate_and_save():
+def archive_json_dump(trade_date: str = today):
+    # 把旧版整文件的 tick_history.json 转存到归档，之后按代码和日期查询
     with open(source_path, 'r') as file:
-        ticks = json.load(file)[stock_code]
+        ticks = json.load(file)
+    print(f'归档 {len(ticks)} 支到 {archive_tick_lists(ticks, trade_date, archive_root)}')
+
+
+def _format_times(times, fmt: str) -> list[str]:
+    return [datetime.datetime.fromtimestamp(t / 1000).strftime(fmt) for t in times.tolist()]
 
-    with open(target_path, 'w') as w:
-        w.write(',  \t'.join(headers))
-        w.write('\n')
-        for tick in ticks:
-            w.write(',   \t'.join([str(i) for i in tick]))
-            w.write('\n')
+
+def query_ticks() -> dict:
+    archive = TickArchive(archive_root)
+    return archive.query(stock_code, start_date, end_date, start_time, end_time)[stock_code]
+
+
+def locate_and_save():
+    ticks = query_ticks()
+    df = pd.DataFrame({
+        'timestamp': _format_times(ticks['time'], '%Y-%m-%d %H:%M:%S'),
+        'price': ticks['price'],
+        'volume': ticks['volume'],
+        'askPrice': ticks['askPrice'][:, 0],
+        'askVol': ticks['askVol'][:, 0],
+        'bidPrice': ticks['bidPrice'][:, 0],
+        'bidVol': ticks['bidVol'][:, 0],
+    }, columns=headers)
+    df.to_csv(target_path, index=False)
+    print(f'{len(df)} ticks saved to {target_path}')
 
 
 def visualization():
-    # with open(source_path, 'r') as file:
-    #     data = json.load(file)[stock_code]
-    #
-    # x_data = [str(row[0]) for row in data]
-    # y1_data = [row[1] for row in data]
-    # y2_data = [row[6] for row in data]
-
-    df = pd.read_csv(target_path)
-    df.columns = headers
-    x_data = list(df['timestamp'].astype(str).values)
-    y1_data = list(df['price'].astype(float).values)
-    y2_data = list(df['bidVol'].astype(float).values)
-
-    print(x_data)
-    print(y1_data)
-    print(y2_data)
+    ticks = query_ticks()
+    x_data = _format_times(ticks['time'], '%m-%d %H:%M:%S')
+    y1_data = ticks['price'].tolist()
+    y2_data = ticks['bidVol'][:, 0].astype(float).tolist()
+
+    keep = get_limit_touch_mask(ticks['askVol'][:, 0], ticks['bidVol'][:, 0], ticks['price'])   # 封板的起止
 
     data = [x_data, y1_data, y2_data]
-    draw_two(data, visualization_path, stock_code)
+    draw_two(data, visualization_path, stock_code, max_points=max_points, keep=keep)
 
 
 if __name__ == '__main__':
+    # archive_json_dump()
     # locate_and_save()
     visualization()
@@ -0,0 +1,79 @@
+import time
+import datetime
+import tracemalloc
+
+from delegate.xt_subscriber import XtSubscriber
+from tools.utils_clock import FakeClock, install_fake_clock, uninstall_fake_clock
+from tools.utils_feed import SyntheticMarket, SyntheticXtData, FULL_MARKET_CODES
+
+# 用合成的全市场行情给 XtSubscriber 压测：回调吞吐、内存增长、策略线程延迟
+code_count = FULL_MARKET_CODES
+trade_date = datetime.date(2025, 6, 20)
+report_steps = 200      # 每 200 批（10 分钟行情）输出一次
+
+
+def execute_strategy(curr_date: str, curr_time: str, curr_seconds: str, curr_quotes: dict,
+                     changed_codes: set = None) -> bool:
+    # 模拟一次简单的横截面扫描
+    codes = curr_quotes.keys() if changed_codes is None else changed_codes
+    for code in codes:
+        quote = curr_quotes.get(code)
+        if quote is not None and quote['lastClose'] > 0:
+            _ = quote['lastPrice'] / quote['lastClose'] - 1
+    return False
+
+
+def load_test():
+    clock = FakeClock(datetime.datetime.combine(trade_date, datetime.time(9, 15)))
+    install_fake_clock(clock)
+    feed = SyntheticXtData(SyntheticMarket(count=code_count), start=clock.now(), speed=0, clock=clock)
+
+    suber = XtSubscriber(
+        account_id='000000',
+        strategy_name='压测',
+        delegate=None,
+        path_deal='',
+        path_assets='',
+        execute_strategy=execute_strategy,
+        quote_feed=feed,
+        open_tick_memory_cache=True,
+        tick_memory_ring_buffer=True,
+        open_minute_bars=True,
+        use_strategy_thread=True,
+        open_quote_matrix=True,
+    )
+    suber.update_code_list(feed.market.codes)
+
+    costs = []
+
+    def callback(quotes: dict):
+        t0 = time.perf_counter()
+        suber.callback_sub_whole(quotes)
+        costs.append(time.perf_counter() - t0)
+
+    feed.subscribe_whole_quote(suber.code_list, callback=callback)
+
+    tracemalloc.start()
+    t_start = time.perf_counter()
+    steps = 0
+    while feed.now.time() < datetime.time(15, 0, 3):
+        feed.step()
+        steps += 1
+        if steps % report_steps == 0:
+            current, peak = tracemalloc.get_traced_memory()
+            recent = sorted(costs[-report_steps:])
+            print(f'\n[{feed.now.strftime("%H:%M:%S")}] quotes:{feed.quotes} '
+                  f'callback p50:{recent[len(recent) // 2] * 1000:.2f}ms max:{recent[-1] * 1000:.2f}ms '
+                  f'memory:{current / 1024 / 1024:.1f}MB peak:{peak / 1024 / 1024:.1f}MB')
+
+    suber.strategy_executor.wait_idle(timeout=10)
+    elapsed = time.perf_counter() - t_start
+    print(f'\n{feed.batches} batches {feed.quotes} quotes in {elapsed:.1f}s, {feed.quotes / elapsed:.0f} quotes/s')
+    print(suber.strategy_executor.summary())
+    suber.strategy_executor.stop(timeout=1)
+    tracemalloc.stop()
+    uninstall_fake_clock()
+
+
+if __name__ == '__main__':
+    load_test()
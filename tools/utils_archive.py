@@ -0,0 +1,194 @@
+import os
+import re
+import json
+import struct
+import datetime
+import numpy as np
+
+from typing import Dict, Optional
+
+from tools.utils_clock import date_to_midnight_ms, hhmm_to_seconds
+from tools.utils_journal import TICK_RECORD_DTYPE, TickJournalReader, quotes_to_records
+
+
+# ================================================
+# tick 历史归档：每天一个文件，记录按代码、时间排序，同一代码的 tick 在文件中连续存放
+# 文件结构：[头部 32 字节][定长记录 ...][索引 json][尾部 32 字节]，索引为每只票的起始序号、条数和首末时间
+# 查询时只读头尾和索引，记录通过 memmap 按需读取，时间窗口在该代码的区间内二分定位
+# ================================================
+
+
+DEFAULT_ARCHIVE_ROOT = './_cache/_tick_archive'
+
+ARCHIVE_MAGIC = b'SQTA'
+ARCHIVE_INDEX_MAGIC = b'SQTX'
+ARCHIVE_VERSION = 1
+ARCHIVE_HEADER = struct.Struct('<4sHH8s16x')     # magic, version, record_size, date
+ARCHIVE_TRAILER = struct.Struct('<4s4xQQQ')      # magic, index_offset, json_length, record_count
+ARCHIVE_FIELDS = [name for name in TICK_RECORD_DTYPE.names if name != 'code']
+
+_ARCHIVE_NAME = re.compile(r'^(\d{8})\.tka$')
+
+
+def get_archive_path(root: str, trade_date: str) -> str:
+    return os.path.join(root, f'{trade_date}.tka')
+
+
+def write_archive_day(path: str, trade_date: str, records: np.ndarray) -> int:
+    # trade_date: 20240101，返回写入的记录数
+    order = np.lexsort((records['time'], records['code']))
+    records = np.ascontiguousarray(records[order])
+    codes, starts, counts = np.unique(records['code'], return_index=True, return_counts=True)
+    times = records['time']
+    index = {code.decode(): [int(start), int(count), int(times[start]), int(times[start + count - 1])]
+             for code, start, count in zip(codes, starts, counts)}
+    meta = json.dumps({'codes': index}).encode()
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(ARCHIVE_HEADER.pack(ARCHIVE_MAGIC, ARCHIVE_VERSION, TICK_RECORD_DTYPE.itemsize, trade_date.encode()))
+        f.write(records.tobytes())
+        index_offset = f.tell()
+        f.write(meta)
+        f.write(ARCHIVE_TRAILER.pack(ARCHIVE_INDEX_MAGIC, index_offset, len(meta), len(records)))
+    os.replace(temp_path, path)
+    return len(records)
+
+
+def archive_tick_journal(journal_path: str, root: str = DEFAULT_ARCHIVE_ROOT) -> str:
+    # 把当天的 tick 日志转换成归档文件，返回归档路径
+    reader = TickJournalReader(journal_path)
+    try:
+        path = get_archive_path(root, reader.trade_date)
+        write_archive_day(path, reader.trade_date, np.asarray(reader.records))
+    finally:
+        reader.close()
+    return path
+
+
+def archive_tick_lists(ticks: Dict[str, list], trade_date: str, root: str = DEFAULT_ARCHIVE_ROOT) -> str:
+    # 旧版 tick_history_*.json 的 list 格式：[HH:MM:SS, price, high, low, volume, amount, askPrice, askVol, bidPrice, bidVol]
+    midnight_ms = date_to_midnight_ms(datetime.datetime.strptime(trade_date, '%Y%m%d').date())
+    parts = []
+    for code, items in ticks.items():
+        if len(items) == 0:
+            continue
+        part = quotes_to_records({str(i): {
+            'time': midnight_ms + hhmm_to_seconds(t[0][:5], t[0][6:8]) * 1000,
+            'lastPrice': t[1], 'high': t[2], 'low': t[3], 'volume': t[4], 'amount': t[5],
+            'askPrice': t[6], 'askVol': t[7], 'bidPrice': t[8], 'bidVol': t[9],
+        } for i, t in enumerate(items)})
+        part['code'] = code.encode()
+        parts.append(part)
+    records = np.concatenate(parts) if len(parts) > 0 else np.zeros(0, dtype=TICK_RECORD_DTYPE)
+    path = get_archive_path(root, trade_date)
+    write_archive_day(path, trade_date, records)
+    return path
+
+
+class TickArchiveDay:
+    def __init__(self, path: str):
+        self.path = path
+        file_size = os.path.getsize(path)
+        with open(path, 'rb') as f:
+            magic, version, record_size, trade_date = ARCHIVE_HEADER.unpack(f.read(ARCHIVE_HEADER.size))
+            if magic != ARCHIVE_MAGIC or record_size != TICK_RECORD_DTYPE.itemsize:
+                raise ValueError(f'{path} 不是当前版本的tick归档文件')
+            self.trade_date = trade_date.decode()
+
+            f.seek(file_size - ARCHIVE_TRAILER.size)
+            magic, index_offset, json_length, self.record_count = ARCHIVE_TRAILER.unpack(f.read(ARCHIVE_TRAILER.size))
+            if magic != ARCHIVE_INDEX_MAGIC:
+                raise ValueError(f'{path} 没有索引，归档未完成')
+            f.seek(index_offset)
+            self.index: Dict[str, list[int]] = json.loads(f.read(json_length).decode())['codes']
+
+        self.records = np.memmap(
+            path, dtype=TICK_RECORD_DTYPE, mode='r', offset=ARCHIVE_HEADER.size, shape=(self.record_count,),
+        ) if self.record_count > 0 else np.zeros(0, dtype=TICK_RECORD_DTYPE)
+
+    def codes(self) -> list[str]:
+        return list(self.index.keys())
+
+    def read(self, code: str, start_ms: int = None, end_ms: int = None) -> np.ndarray:
+        # 返回该代码 [start_ms, end_ms] 之间的记录，只映射该代码所在的区间
+        item = self.index.get(code)
+        if item is None:
+            return np.zeros(0, dtype=TICK_RECORD_DTYPE)
+        start, count, first_ms, last_ms = item
+        if (start_ms is not None and last_ms < start_ms) or (end_ms is not None and first_ms > end_ms):
+            return np.zeros(0, dtype=TICK_RECORD_DTYPE)
+
+        records = self.records[start:start + count]
+        times = records['time']
+        lo = 0 if start_ms is None else int(np.searchsorted(times, start_ms, side='left'))
+        hi = count if end_ms is None else int(np.searchsorted(times, end_ms, side='right'))
+        return np.array(records[lo:hi])
+
+
+class TickArchive:
+    def __init__(self, root: str = DEFAULT_ARCHIVE_ROOT, cache_days: int = 32):
+        self.root = root
+        self.cache_days = cache_days
+        self.days: Dict[str, TickArchiveDay] = {}   # 已打开的日期，超过 cache_days 时关闭最早打开的
+
+    def dates(self, start_date: str = None, end_date: str = None) -> list[str]:
+        # 按文件名列出归档日期，不打开文件
+        if not os.path.isdir(self.root):
+            return []
+        ans = []
+        for name in os.listdir(self.root):
+            match = _ARCHIVE_NAME.match(name)
+            if match is None:
+                continue
+            trade_date = match.group(1)
+            if (start_date is None or trade_date >= start_date) and (end_date is None or trade_date <= end_date):
+                ans.append(trade_date)
+        return sorted(ans)
+
+    def open_day(self, trade_date: str) -> Optional[TickArchiveDay]:
+        if trade_date not in self.days:
+            path = get_archive_path(self.root, trade_date)
+            if not os.path.exists(path):
+                return None
+            if len(self.days) >= self.cache_days:
+                self.days.pop(next(iter(self.days)))
+            self.days[trade_date] = TickArchiveDay(path)
+        return self.days[trade_date]
+
+    def query(
+        self,
+        codes: str | list[str],
+        start_date: str = None,             # 20240101
+        end_date: str = None,
+        start_time: str = '09:15:00',
+        end_time: str = '15:00:00',
+        fields: list[str] = None,
+    ) -> Dict[str, Dict[str, np.ndarray]]:
+        # 每只票返回 {field: array}，多天按时间顺序拼接，time 为毫秒时间戳
+        if isinstance(codes, str):
+            codes = [codes]
+        fields = ARCHIVE_FIELDS if fields is None else fields
+        if 'time' not in fields:
+            fields = ['time'] + list(fields)
+        start_seconds = hhmm_to_seconds(start_time[:5], start_time[6:8] or '00')
+        end_seconds = hhmm_to_seconds(end_time[:5], end_time[6:8] or '00')
+
+        parts: Dict[str, list[np.ndarray]] = {code: [] for code in codes}
+        for trade_date in self.dates(start_date, end_date):
+            day = self.open_day(trade_date)
+            midnight_ms = date_to_midnight_ms(datetime.datetime.strptime(trade_date, '%Y%m%d').date())
+            for code in codes:
+                records = day.read(code, midnight_ms + start_seconds * 1000, midnight_ms + end_seconds * 1000)
+                if len(records) > 0:
+                    parts[code].append(records)
+
+        ans = {}
+        for code in codes:
+            records = np.concatenate(parts[code]) if len(parts[code]) > 0 else np.zeros(0, dtype=TICK_RECORD_DTYPE)
+            ans[code] = {field: records[field] for field in fields}
+        return ans
+
+    def close(self) -> None:
+        self.days.clear()
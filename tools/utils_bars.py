@@ -0,0 +1,167 @@
+import datetime
+import numpy as np
+import pandas as pd
+
+from typing import Dict, Optional
+
+
+# ================================================
+# 盘中实时分钟线聚合
+# A股连续竞价 09:30-11:30 13:00-15:00 共 240 分钟，K线按结束时间标记（09:31 为第一根）
+# 09:25 集合竞价的成交并入第一根，11:30 之后午休期间的尾单并入 11:30，15:00 收盘集合竞价并入最后一根
+# ================================================
+
+
+BAR_PERIODS = [1, 5, 15]
+BAR_FIELDS = ['open', 'high', 'low', 'close', 'volume', 'amount']
+SESSION_MINUTES = 240
+
+_AUCTION_START = 9 * 3600 + 25 * 60
+_AM_OPEN = 9 * 3600 + 30 * 60
+_AM_CLOSE = 11 * 3600 + 30 * 60
+_PM_OPEN = 13 * 3600
+_PM_CLOSE = 15 * 3600
+
+
+def get_minute_slot(seconds: float) -> int:
+    # 当天秒数转换为分钟线下标 0-239，不属于任何一根K线的返回 -1
+    if seconds < _AUCTION_START:
+        return -1                               # 09:25 之前只有虚拟撮合价格，没有成交
+    if seconds < _AM_OPEN:
+        return 0
+    if seconds < _AM_CLOSE:
+        return int(seconds - _AM_OPEN) // 60
+    if seconds < _PM_OPEN:
+        return 119
+    if seconds < _PM_CLOSE:
+        return 120 + int(seconds - _PM_OPEN) // 60
+    return SESSION_MINUTES - 1
+
+
+def get_bar_end_times(period: int) -> list[str]:
+    # 每根K线的结束时间，例如 5 分钟线为 09:35 ... 11:30 13:05 ... 15:00
+    ans = []
+    for slot in range(period - 1, SESSION_MINUTES, period):
+        minutes = 9 * 60 + 31 + slot if slot < 120 else 13 * 60 + 1 + slot - 120
+        ans.append(f'{minutes // 60:02d}:{minutes % 60:02d}')
+    return ans
+
+
+class MinuteBarAggregator:
+    def __init__(self, periods: list[int] = None, init_codes: int = 64):
+        self.periods = BAR_PERIODS if periods is None else periods
+        for period in self.periods:
+            assert 120 % period == 0, f'{period} 分钟线不能整除半天交易时长'
+
+        self.code_index: Dict[str, int] = {}
+        self.codes: list[str] = []
+        self.trade_date: Optional[datetime.date] = None
+        self.midnight_ms = 0
+        self._allocate(max(1, init_codes))
+
+    def _allocate(self, rows: int) -> None:
+        bars = {}
+        for period in self.periods:
+            bars[period] = np.full((rows, SESSION_MINUTES // period, len(BAR_FIELDS)), np.nan)
+            bars[period][:, :, 4:] = 0.0
+        last_slot = np.full(rows, -1, dtype=np.int64)           # 每只票最新一根1分钟线的下标
+        last_volume = np.zeros(rows, dtype=np.float64)          # 上一笔累计成交量
+        last_amount = np.zeros(rows, dtype=np.float64)          # 上一笔累计成交额
+
+        if hasattr(self, 'bars'):
+            used = len(self.codes)
+            for period in self.periods:
+                bars[period][:used] = self.bars[period][:used]
+            last_slot[:used] = self.last_slot[:used]
+            last_volume[:used] = self.last_volume[:used]
+            last_amount[:used] = self.last_amount[:used]
+
+        self.bars = bars
+        self.last_slot = last_slot
+        self.last_volume = last_volume
+        self.last_amount = last_amount
+
+    def reset(self, trade_date: datetime.date) -> None:
+        self.trade_date = trade_date
+        self.midnight_ms = int(datetime.datetime.combine(trade_date, datetime.time.min).timestamp() * 1000)
+        self.code_index.clear()
+        self.codes.clear()
+        for period in self.periods:
+            self.bars[period][:] = np.nan
+            self.bars[period][:, :, 4:] = 0.0
+        self.last_slot[:] = -1
+        self.last_volume[:] = 0.0
+        self.last_amount[:] = 0.0
+
+    def _row(self, code: str) -> int:
+        if code not in self.code_index:
+            if len(self.codes) >= len(self.last_slot):
+                self._allocate(len(self.last_slot) * 2)
+            self.code_index[code] = len(self.codes)
+            self.codes.append(code)
+        return self.code_index[code]
+
+    def update(self, code: str, quote: dict) -> None:
+        time_ms = quote['time']
+        if self.trade_date is None or time_ms >= self.midnight_ms + 86400000:
+            self.reset(datetime.datetime.fromtimestamp(time_ms / 1000).date())    # 跨日自动重置
+        elif time_ms < self.midnight_ms:
+            return                                                                  # 前一天的过期行情直接丢弃
+
+        slot = get_minute_slot((time_ms - self.midnight_ms) / 1000)
+        price = quote['lastPrice']
+        if slot < 0 or price is None or price <= 0:
+            return
+
+        row = self._row(code)
+
+        # 累计量转换成增量，数据源重连导致累计量回退时不计入
+        volume = quote['volume']
+        amount = quote['amount']
+        if self.last_slot[row] < 0 and slot > 0:
+            # 盘中启动或盘中新加的代码，之前的累计量不属于当前这根K线，只作为基准
+            self.last_volume[row] = volume
+            self.last_amount[row] = amount
+        delta_volume = max(0.0, volume - self.last_volume[row])
+        delta_amount = max(0.0, amount - self.last_amount[row])
+        self.last_volume[row] = max(volume, self.last_volume[row])
+        self.last_amount[row] = max(amount, self.last_amount[row])
+        if slot < self.last_slot[row]:
+            slot = self.last_slot[row]          # 乱序到达的旧 tick 并入当前K线
+        self.last_slot[row] = slot
+
+        for period in self.periods:
+            bar = self.bars[period][row, slot // period]
+            if np.isnan(bar[0]):
+                bar[0] = price
+                bar[1] = price
+                bar[2] = price
+            else:
+                if price > bar[1]:
+                    bar[1] = price
+                if price < bar[2]:
+                    bar[2] = price
+            bar[3] = price
+            bar[4] += delta_volume
+            bar[5] += delta_amount
+
+    def update_quotes(self, quotes: Dict[str, dict]) -> None:
+        for code in quotes:
+            self.update(code, quotes[code])
+
+    def bars_of(self, code: str, period: int = 1) -> np.ndarray:
+        # 截至最新一根的 [open, high, low, close, volume, amount] 视图，尚无成交的K线价格为 nan
+        if code not in self.code_index:
+            return self.bars[period][0, :0]
+        row = self.code_index[code]
+        return self.bars[period][row, :self.last_slot[row] // period + 1]
+
+    def latest(self, code: str, period: int = 1) -> Optional[np.ndarray]:
+        bars = self.bars_of(code, period)
+        return bars[-1] if len(bars) > 0 else None
+
+    def to_frame(self, code: str, period: int = 1) -> pd.DataFrame:
+        bars = self.bars_of(code, period)
+        df = pd.DataFrame(bars, columns=BAR_FIELDS)
+        df.insert(0, 'time', get_bar_end_times(period)[:len(bars)])
+        return df
@@ -3,6 +3,8 @@ import logging
 
 from decimal import Decimal, ROUND_HALF_UP
 
+from tools.utils_clock import ms_to_hms, get_session_past_seconds
+
 
 IS_DEBUG = False
 
@@ -395,8 +397,8 @@ def hms_to_past_seconds(hour: int, minute: int, second: int) -> int:
 
 
 def xt_time_tag_to_hms(time_tag: str) -> tuple[int, int, int]:
-    dt = datetime.datetime.strptime(time_tag, '%Y%m%d %H:%M:%S')
-    return dt.hour, dt.minute, dt.second
+    # '%Y%m%d %H:%M:%S' 按位取数字
+    return int(time_tag[9:11]), int(time_tag[12:14]), int(time_tag[15:17])
 
 
 def xt_time_tag_to_past_seconds(time_tag: int | str) -> int:
@@ -406,13 +408,12 @@ def xt_time_tag_to_past_seconds(time_tag: int | str) -> int:
 
 # sub_whole 的 quotes 时间格式
 def xt_time_to_hms(timestamp: int) -> tuple[int, int, int]:
-    if len(str(timestamp)) > 10:
-        timestamp = timestamp // 1000
-        dt = datetime.datetime.fromtimestamp(timestamp)
-        return dt.hour, dt.minute, dt.second
+    if timestamp > 9999999999:     # 毫秒时间戳
+        return ms_to_hms(timestamp)
     return 0, 0, 0
 
 
 def xt_time_to_past_seconds(timestamp: int) -> int:
-    hour, minute, second = xt_time_to_hms(timestamp)
-    return hms_to_past_seconds(hour, minute, second)
+    if timestamp > 9999999999:
+        return get_session_past_seconds(timestamp)
+    return 0
@@ -13,6 +13,7 @@ import akshare as ak
 
 from tools.constants import *
 from tools.utils_basic import symbol_to_code
+from tools.utils_clock import get_now
 
 trade_day_cache = {}
 trade_max_year_key = 'max_year'
@@ -281,7 +282,7 @@ def all_held_inc(lock: threading.Lock, path: str) -> bool:
     with lock:
         try:
             held_info = load_json(path)
-            today = datetime.datetime.now().strftime('%Y-%m-%d')
+            today = get_now().strftime('%Y-%m-%d')
             if (InfoItem.IncDate not in held_info) or (held_info[InfoItem.IncDate] != today):
                 held_info[InfoItem.IncDate] = today
                 for code in held_info.keys():
@@ -674,6 +675,6 @@ def get_stock_codes_and_circulation_mv() -> Dict[str, int]:
 def check_open_day(func):
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        if check_is_open_day(datetime.datetime.now().strftime('%Y-%m-%d')):
+        if check_is_open_day(get_now().strftime('%Y-%m-%d')):
             return func(*args, **kwargs)    # 开放日正常执行
     return wrapper
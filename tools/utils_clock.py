@@ -0,0 +1,121 @@
+import datetime
+
+from typing import Optional
+
+
+# ================================================
+# 策略时钟：默认就是系统时间，回放历史 tick 时换成 FakeClock
+# 订阅器、策略和下单记录里的时间判断都走 get_now()，回放时读到的是行情时间
+# 文件缓存过期这类与行情无关的判断仍然用系统时间
+# ================================================
+
+
+class FakeClock:
+    def __init__(self, start: datetime.datetime = None):
+        self.current = datetime.datetime.now() if start is None else start
+
+    def now(self) -> datetime.datetime:
+        return self.current
+
+    def set(self, now: datetime.datetime) -> None:
+        self.current = now
+
+    def set_ms(self, timestamp_ms: int) -> None:
+        self.current = datetime.datetime.fromtimestamp(timestamp_ms / 1000)
+
+    def advance(self, seconds: float) -> None:
+        self.current += datetime.timedelta(seconds=seconds)
+
+
+fake_clock: Optional[FakeClock] = None
+
+
+def get_now() -> datetime.datetime:
+    if fake_clock is not None:
+        return fake_clock.now()
+    return datetime.datetime.now()
+
+
+def install_fake_clock(clock: FakeClock) -> None:
+    global fake_clock
+    fake_clock = clock
+
+
+def uninstall_fake_clock() -> None:
+    global fake_clock
+    fake_clock = None
+
+
+# ================================================
+# 整数时间：行情时间统一用 int64 毫秒时间戳，日内时间用当天秒数，开盘后秒数查预先算好的表
+# ================================================
+
+
+def hms_to_seconds(hour: int, minute: int, second: int = 0) -> int:
+    return hour * 3600 + minute * 60 + second
+
+
+def hhmm_to_seconds(hhmm: str, ss: str = '00') -> int:
+    # 策略回调的 '%H:%M' 和 '%S' 直接按位取数字，不走 strptime
+    return int(hhmm[:2]) * 3600 + int(hhmm[3:5]) * 60 + int(ss)
+
+
+def _build_past_seconds_table() -> list[int]:
+    # 与 hms_to_past_seconds 一致：连续竞价已经过去的秒数，午休 7200，收盘后 14400
+    ans = []
+    for s in range(86400):
+        if s < hms_to_seconds(9, 30):
+            past = 0
+        elif s < hms_to_seconds(11, 30):
+            past = s - hms_to_seconds(9, 30)
+        elif s < hms_to_seconds(13, 0):
+            past = 7200
+        elif s < hms_to_seconds(15, 0):
+            past = s - hms_to_seconds(13, 0) + 7200
+        else:
+            past = 14400
+        ans.append(past)
+    return ans
+
+
+SESSION_PAST_SECONDS = _build_past_seconds_table()
+
+
+class _MidnightCache:
+    # 只缓存最近一天的本地零点，同一天内换算全部是整数运算
+    def __init__(self):
+        self.start_ms = 0
+        self.end_ms = 0
+
+    def get(self, timestamp_ms: int) -> int:
+        if not (self.start_ms <= timestamp_ms < self.end_ms):
+            day = datetime.datetime.fromtimestamp(timestamp_ms / 1000).date()
+            self.start_ms = int(datetime.datetime.combine(day, datetime.time.min).timestamp() * 1000)
+            self.end_ms = int(datetime.datetime.combine(day + datetime.timedelta(days=1), datetime.time.min)
+                              .timestamp() * 1000)
+        return self.start_ms
+
+
+midnight_cache = _MidnightCache()
+
+
+def get_midnight_ms(timestamp_ms: int) -> int:
+    return midnight_cache.get(timestamp_ms)
+
+
+def date_to_midnight_ms(date: datetime.date) -> int:
+    return int(datetime.datetime.combine(date, datetime.time.min).timestamp() * 1000)
+
+
+def ms_to_day_seconds(timestamp_ms: int) -> int:
+    # 当天零点以来的秒数
+    return (timestamp_ms - midnight_cache.get(timestamp_ms)) // 1000
+
+
+def ms_to_hms(timestamp_ms: int) -> tuple[int, int, int]:
+    seconds = ms_to_day_seconds(timestamp_ms)
+    return seconds // 3600, seconds // 60 % 60, seconds % 60
+
+
+def get_session_past_seconds(timestamp_ms: int) -> int:
+    return SESSION_PAST_SECONDS[ms_to_day_seconds(timestamp_ms)]
@@ -0,0 +1,53 @@
+import numpy as np
+
+
+# ================================================
+# 画图前的降采样：按等长分桶保留每桶的首、尾、最大、最小点（M4），多条共用 x 轴的序列取并集
+# 极值点必然保留，额外需要保留的点（如涨跌停封板的起止）通过 keep 传入
+# ================================================
+
+
+DEFAULT_MAX_POINTS = 4000   # 浏览器里 echarts 能流畅缩放的点数
+
+
+def _first_in_bucket(mask: np.ndarray, bucket_id: np.ndarray) -> np.ndarray:
+    # 每个桶内第一个满足 mask 的下标
+    idx = np.flatnonzero(mask)
+    _, first = np.unique(bucket_id[idx], return_index=True)
+    return idx[first]
+
+
+def get_run_edges(mask: np.ndarray) -> np.ndarray:
+    # mask 为 True 的每一段的起点和终点
+    mask = np.asarray(mask, dtype=bool)
+    if len(mask) == 0:
+        return np.zeros(0, dtype=np.int64)
+    change = np.flatnonzero(mask[1:] != mask[:-1])
+    edges = np.concatenate([[0], change, change + 1, [len(mask) - 1]])
+    return np.unique(edges[mask[edges]])
+
+
+def downsample_indices(series: list, max_points: int = DEFAULT_MAX_POINTS, keep: np.ndarray = None) -> np.ndarray:
+    # 返回保留点的下标，升序；点数不超过 max_points 时原样返回
+    n = len(series[0])
+    if n <= max_points:
+        return np.arange(n)
+
+    buckets = max(1, max_points // (4 * len(series)))
+    bucket_id = np.arange(n) * buckets // n
+    starts = np.searchsorted(bucket_id, np.arange(buckets))
+    selected = [starts, np.append(starts[1:] - 1, n - 1)]
+    for values in series:
+        y = np.asarray(values, dtype=np.float64)
+        selected.append(_first_in_bucket(y == np.fmax.reduceat(y, starts)[bucket_id], bucket_id))
+        selected.append(_first_in_bucket(y == np.fmin.reduceat(y, starts)[bucket_id], bucket_id))
+    if keep is not None:
+        selected.append(get_run_edges(keep))
+    return np.unique(np.concatenate(selected))
+
+
+def get_limit_touch_mask(ask_vol1: np.ndarray, bid_vol1: np.ndarray, price: np.ndarray) -> np.ndarray:
+    # 卖一为空即封涨停，买一为空即封跌停，按盘口判断不需要知道昨收
+    ask_vol1 = np.asarray(ask_vol1)
+    bid_vol1 = np.asarray(bid_vol1)
+    return (np.asarray(price) > 0) & ((ask_vol1 < 0.001) | (bid_vol1 < 0.001))
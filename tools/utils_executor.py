@@ -0,0 +1,126 @@
+import time
+import threading
+import traceback
+
+from typing import Callable, Optional
+
+
+# 策略执行线程：行情回调只负责发布最新快照，策略线程永远执行最新的一份
+# 策略跑得比发布慢时，中间的快照直接丢弃并计数，积压最多一份
+# merge(旧参数, 新参数) 可选，用于把被覆盖快照里需要累积的部分（例如变动代码集合）并入新快照
+class LatestSnapshotExecutor:
+    def __init__(self, handler: Callable, name: str = 'strategy', merge: Callable = None):
+        self.handler = handler
+        self.name = name
+        self.merge = merge
+
+        self.condition = threading.Condition()
+        self.pending: Optional[tuple] = None    # 后台缓冲：等待执行的最新快照
+        self.pending_time = 0.0
+        self.running = False
+        self.stopped = False
+        self.thread: Optional[threading.Thread] = None
+
+        self.published = 0
+        self.executed = 0
+        self.skipped = 0            # 被更新的快照覆盖，没有执行的次数
+        self.failed = 0
+        self.lag_total = 0.0        # 从发布到开始执行的等待
+        self.lag_max = 0.0
+        self.cost_total = 0.0       # 策略执行耗时
+        self.cost_max = 0.0
+
+    def start(self) -> None:
+        with self.condition:
+            if self.thread is not None and self.thread.is_alive():
+                return
+            self.stopped = False
+            self.thread = threading.Thread(target=self._loop, name=f'{self.name}_executor', daemon=True)
+            self.thread.start()
+
+    def stop(self, timeout: float = None) -> None:
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    def publish(self, *args) -> bool:
+        # 返回 True 表示覆盖了一份还没来得及执行的快照
+        if self.thread is None:
+            self.start()
+
+        with self.condition:
+            replaced = self.pending is not None
+            if replaced:
+                self.skipped += 1
+                if self.merge is not None:
+                    args = self.merge(self.pending, args)
+            self.pending = args
+            self.pending_time = time.monotonic()
+            self.published += 1
+            self.condition.notify()
+        return replaced
+
+    def _loop(self) -> None:
+        while True:
+            with self.condition:
+                while self.pending is None and not self.stopped:
+                    self.condition.wait()
+                if self.stopped:
+                    return
+                args = self.pending
+                lag = time.monotonic() - self.pending_time
+                self.pending = None
+                self.running = True
+
+            t0 = time.monotonic()
+            success = False
+            try:
+                self.handler(*args)
+                success = True
+            except Exception as e:
+                print(f'[{self.name}] 执行出错：', e)
+                traceback.print_exc()
+            cost = time.monotonic() - t0
+
+            with self.condition:
+                self.running = False
+                self.executed += 1
+                if not success:
+                    self.failed += 1
+                self.lag_total += lag
+                self.lag_max = max(self.lag_max, lag)
+                self.cost_total += cost
+                self.cost_max = max(self.cost_max, cost)
+                self.condition.notify_all()
+
+    def wait_idle(self, timeout: float = None) -> bool:
+        # 等待已发布的快照全部处理完
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.condition:
+            while self.pending is not None or self.running:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.condition.wait(remaining)
+        return True
+
+    def stats(self) -> dict:
+        with self.condition:
+            return {
+                'published': self.published,
+                'executed': self.executed,
+                'skipped': self.skipped,
+                'failed': self.failed,
+                'lag_avg': self.lag_total / self.executed if self.executed > 0 else 0.0,
+                'lag_max': self.lag_max,
+                'cost_avg': self.cost_total / self.executed if self.executed > 0 else 0.0,
+                'cost_max': self.cost_max,
+            }
+
+    def summary(self) -> str:
+        s = self.stats()
+        return f'[{self.name}] published:{s["published"]} executed:{s["executed"]} skipped:{s["skipped"]} ' \
+               f'failed:{s["failed"]} lag avg:{s["lag_avg"] * 1000:.1f}ms max:{s["lag_max"] * 1000:.1f}ms ' \
+               f'cost avg:{s["cost_avg"] * 1000:.1f}ms max:{s["cost_max"] * 1000:.1f}ms'
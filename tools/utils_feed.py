@@ -0,0 +1,274 @@
+import time
+import datetime
+import threading
+import numpy as np
+
+from typing import Callable, Dict, Optional
+
+from tools.utils_basic import get_limit_up_price, get_limit_down_price
+from tools.utils_clock import FakeClock
+
+
+# ================================================
+# 合成全市场行情：替代 xtdata.subscribe_whole_quote 的本地行情源，用于在 Linux 上给 XtSubscriber 压测
+# 每 3 秒生成一批快照，只推送有变动的代码；包含 09:15-09:25 集合竞价虚拟撮合、09:25 开盘撮合、涨跌停封板
+# ================================================
+
+
+SNAPSHOT_INTERVAL = 3.0     # QMT 全推行情约 3 秒一批
+FULL_MARKET_CODES = 5300    # 沪深 A 股数量量级
+
+_AUCTION_START = 9 * 3600 + 15 * 60
+_AUCTION_MATCH = 9 * 3600 + 25 * 60
+_AM_OPEN = 9 * 3600 + 30 * 60
+_AM_CLOSE = 11 * 3600 + 30 * 60
+_PM_OPEN = 13 * 3600
+_CLOSE_AUCTION = 14 * 3600 + 57 * 60
+_PM_CLOSE = 15 * 3600
+
+
+def make_synthetic_codes(count: int) -> list[str]:
+    # 按沪深主板、创业板、科创板的大致比例生成代码
+    boards = [(600000, 'SH', 0.32), (1, 'SZ', 0.30), (300001, 'SZ', 0.26), (688001, 'SH', 0.12)]
+    ans = []
+    for i, (start, market, ratio) in enumerate(boards):
+        n = count - len(ans) if i == len(boards) - 1 else int(count * ratio)
+        ans += [f'{start + k:06d}.{market}' for k in range(n)]
+    return ans
+
+
+class SyntheticMarket:
+    def __init__(
+        self,
+        codes: list[str] = None,
+        count: int = FULL_MARKET_CODES,
+        active_ratio: float = 0.6,          # 每批快照有成交变动的比例
+        limit_up_ratio: float = 0.02,       # 当天会冲击涨停的比例
+        seed: int = 0,
+    ):
+        self.codes = make_synthetic_codes(count) if codes is None else list(codes)
+        self.active_ratio = active_ratio
+        self.rng = np.random.default_rng(seed)
+
+        n = len(self.codes)
+        self.last_close = np.round(self.rng.lognormal(np.log(12.0), 0.6, n), 2)
+        self.limit_up = np.array([get_limit_up_price(c, p) for c, p in zip(self.codes, self.last_close)])
+        self.limit_down = np.array([get_limit_down_price(c, p) for c, p in zip(self.codes, self.last_close)])
+        self.strong = self.rng.random(n) < limit_up_ratio
+        self.drift = np.where(self.strong, 0.004, 0.0)     # 强势股每批平均上涨 0.4%，半小时左右触板
+
+        self.price = self.last_close.copy()
+        self.open = np.zeros(n)
+        self.high = np.zeros(n)
+        self.low = np.zeros(n)
+        self.volume = np.zeros(n, dtype=np.int64)     # 累计成交量（手）
+        self.amount = np.zeros(n)                     # 累计成交额（元）
+        self.matched = False                          # 是否已经完成开盘撮合
+        self.closed = False
+
+    def _quotes(self, rows: np.ndarray, time_ms: int, auction: bool) -> Dict[str, dict]:
+        # 盘口挂单量按批生成，逐只拼装成 QMT 格式
+        vols = self.rng.integers(1, 500, (len(rows), 10)).tolist()
+        seals = self.rng.integers(10000, 200000, len(rows)).tolist()
+        prices = self.price[rows]
+        ups = np.round(prices[:, None] + np.arange(6) * 0.01, 2).tolist()       # 现价往上 0-5 档
+        downs = np.round(prices[:, None] - np.arange(5) * 0.01, 2).tolist()     # 现价往下 0-4 档
+        ans = {}
+        for k, i in enumerate(rows.tolist()):
+            price = float(self.price[i])
+            if auction:
+                # 虚拟撮合阶段买一卖一都是撮合价，没有成交
+                ask_price = [price, 0.0, 0.0, 0.0, 0.0]
+                bid_price = [price, 0.0, 0.0, 0.0, 0.0]
+                ask_vol = [vols[k][0], 0, 0, 0, 0]
+                bid_vol = [vols[k][0] + vols[k][5], 0, 0, 0, 0]
+            elif price >= self.limit_up[i]:
+                # 涨停封板：卖盘为空，买一挂大单
+                ask_price = [0.0] * 5
+                ask_vol = [0] * 5
+                bid_price = downs[k]
+                bid_vol = [seals[k]] + vols[k][1:5]
+            elif price <= self.limit_down[i]:
+                ask_price = ups[k][:5]
+                ask_vol = [seals[k]] + vols[k][1:5]
+                bid_price = [0.0] * 5
+                bid_vol = [0] * 5
+            else:
+                ask_price = ups[k][1:]
+                bid_price = downs[k]
+                ask_vol = vols[k][:5]
+                bid_vol = vols[k][5:]
+
+            ans[self.codes[i]] = {
+                'time': time_ms,
+                'lastPrice': price,
+                'open': float(self.open[i]),
+                'high': float(self.high[i]),
+                'low': float(self.low[i]),
+                'lastClose': float(self.last_close[i]),
+                'amount': float(self.amount[i]),
+                'volume': int(self.volume[i]),
+                'pvolume': int(self.volume[i]) * 100,
+                'stockStatus': 0,
+                'openInt': 13 if auction else 0,
+                'transactionNum': 0,
+                'lastSettlementPrice': 0.0,
+                'settlementPrice': 0.0,
+                'pe': 0.0,
+                'askPrice': ask_price,
+                'bidPrice': bid_price,
+                'askVol': ask_vol,
+                'bidVol': bid_vol,
+                'volRatio': 0.0,
+                'speed1Min': 0.0,
+                'speed5Min': 0.0,
+            }
+        return ans
+
+    def _trade(self, rows: np.ndarray) -> None:
+        # 随机游走成交，价格限制在涨跌停之间，按 0.01 取整
+        steps = self.rng.normal(self.drift[rows], 0.002)
+        prices = np.clip(np.round(self.price[rows] * (1 + steps), 2), self.limit_down[rows], self.limit_up[rows])
+        lots = self.rng.integers(1, 200, len(rows))
+        self.price[rows] = prices
+        self.high[rows] = np.maximum(self.high[rows], prices)
+        self.low[rows] = np.minimum(self.low[rows], prices)
+        self.volume[rows] += lots
+        self.amount[rows] += lots * 100 * prices
+
+    def snapshot(self, now: datetime.datetime) -> Dict[str, dict]:
+        # 生成 now 时刻的一批快照，只包含有变动的代码
+        seconds = now.hour * 3600 + now.minute * 60 + now.second
+        time_ms = int(now.timestamp() * 1000)
+        n = len(self.codes)
+
+        if seconds < _AUCTION_START or self.closed or _AM_CLOSE <= seconds < _PM_OPEN:
+            return {}
+
+        if seconds < _AUCTION_MATCH:
+            # 虚拟撮合价在昨收附近波动，强势股高开
+            gap = self.rng.normal(np.where(self.strong, 0.03, 0.0), 0.01, n)
+            self.price = np.clip(np.round(self.last_close * (1 + gap), 2), self.limit_down, self.limit_up)
+            rows = np.flatnonzero(self.rng.random(n) < self.active_ratio)
+            return self._quotes(rows, time_ms, True)
+
+        if not self.matched:
+            # 09:25 开盘撮合，全部代码推送一次
+            self.matched = True
+            lots = self.rng.integers(100, 5000, n)
+            self.open = self.price.copy()
+            self.high = self.price.copy()
+            self.low = self.price.copy()
+            self.volume += lots
+            self.amount += lots * 100 * self.price
+            return self._quotes(np.arange(n), time_ms, False)
+
+        if seconds < _AM_OPEN or _CLOSE_AUCTION <= seconds < _PM_CLOSE:
+            return {}
+
+        if seconds >= _PM_CLOSE:
+            # 收盘集合竞价撮合后推送最后一批
+            self.closed = True
+            rows = np.arange(n)
+            self._trade(rows)
+            return self._quotes(rows, time_ms, False)
+
+        # 封板的票只有偶尔的成交
+        sealed = self.price >= self.limit_up
+        active = self.rng.random(n) < np.where(sealed, 0.1, self.active_ratio)
+        rows = np.flatnonzero(active)
+        self._trade(rows)
+        return self._quotes(rows, time_ms, False)
+
+    def full_tick(self, codes: list[str], now: datetime.datetime) -> Dict[str, dict]:
+        index = {code: i for i, code in enumerate(self.codes)}
+        rows = np.array([index[code] for code in codes if code in index], dtype=np.int64)
+        return self._quotes(rows, int(now.timestamp() * 1000), not self.matched)
+
+
+class SyntheticXtData:
+    # 实现 XtSubscriber 用到的 xtdata 订阅接口，通过 quote_feed 参数传入
+    def __init__(
+        self,
+        market: SyntheticMarket = None,
+        start: datetime.datetime = None,
+        interval: float = SNAPSHOT_INTERVAL,
+        speed: float = 1.0,                 # 1 为真实节奏，N 为 N 倍速，0 为不等待
+        clock: FakeClock = None,            # 传入时同步为行情时间
+    ):
+        self.market = SyntheticMarket() if market is None else market
+        self.now = datetime.datetime.combine(datetime.date.today(), datetime.time(9, 15)) if start is None else start
+        self.interval = interval
+        self.speed = speed
+        self.clock = clock
+        self.enable_hello = True
+
+        self.lock = threading.Lock()
+        self.subscriptions: Dict[int, tuple[Optional[set[str]], Callable]] = {}
+        self.next_seq = 1
+        self.thread: Optional[threading.Thread] = None
+        self.stopped = threading.Event()
+
+        self.batches = 0
+        self.quotes = 0
+
+    def subscribe_whole_quote(self, code_list: list[str], callback: Callable = None) -> int:
+        # 和 xtdata 一样支持传入 ['SH', 'SZ'] 订阅整个市场
+        markets = [c for c in code_list if c in ('SH', 'SZ')]
+        codes = None if len(markets) == 2 else \
+            {c for c in code_list if '.' in c} | {c for c in self.market.codes if c.split('.')[1] in markets}
+        with self.lock:
+            seq = self.next_seq
+            self.next_seq += 1
+            self.subscriptions[seq] = (codes, callback)
+        return seq
+
+    def unsubscribe_quote(self, seq: int) -> None:
+        with self.lock:
+            self.subscriptions.pop(seq, None)
+
+    def get_client(self):
+        return self
+
+    def get_full_tick(self, code_list: list[str]) -> Dict[str, dict]:
+        return self.market.full_tick(code_list, self.now)
+
+    def step(self) -> int:
+        # 推进一个快照周期并分发，返回生成的行情数量；午休直接跳到 13:00
+        self.now += datetime.timedelta(seconds=self.interval)
+        if datetime.time(11, 30) < self.now.time() < datetime.time(13, 0):
+            self.now = datetime.datetime.combine(self.now.date(), datetime.time(13, 0))
+        if self.clock is not None:
+            self.clock.set(self.now)
+
+        quotes = self.market.snapshot(self.now)
+        if len(quotes) == 0:
+            return 0
+
+        with self.lock:
+            subscriptions = list(self.subscriptions.values())
+        for codes, callback in subscriptions:
+            batch = quotes if codes is None else {c: q for c, q in quotes.items() if c in codes}
+            if len(batch) > 0 and callback is not None:
+                callback(batch)
+
+        self.batches += 1
+        self.quotes += len(quotes)
+        return len(quotes)
+
+    def run(self, until: datetime.time = datetime.time(15, 0, 3)) -> None:
+        while not self.stopped.is_set() and self.now.time() < until:
+            t0 = time.monotonic()
+            self.step()
+            if self.speed > 0:
+                self.stopped.wait(max(0.0, self.interval / self.speed - (time.monotonic() - t0)))
+
+    def start(self) -> None:
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self.run, name='synthetic_xtdata', daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout: float = None) -> None:
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
@@ -0,0 +1,378 @@
+import re
+import functools
+import numpy as np
+import pandas as pd
+
+from typing import Callable, Dict, Optional
+
+import mytt.MyTT as single
+import mytt.MyTT_panel as panel_backend
+from tools.utils_panel import HistoryPanel
+
+
+# ================================================
+# 通达信公式编译：把公式源码解析成 mytt 运算的有向无环图，相同的子表达式（如多处出现的 MA(C,5)）只保留一个节点
+# 同一张图既可以按单票的一维数组求值（mytt.MyTT），也可以按全市场 代码 × K线 的面板求值（mytt.MyTT_panel）
+# 布尔值按通达信的习惯用 1/0 表示，NAN 视为不成立
+# ================================================
+
+
+_TOKEN = re.compile(r'''
+    (?P<space>\s+|\{[^}]*\}|//[^\n]*)
+  | (?P<number>\d+\.\d*|\.\d+|\d+)
+  | (?P<name>[A-Za-z_一-鿿][A-Za-z0-9_一-鿿]*)
+  | (?P<op>:=|>=|<=|<>|!=|==|&&|\|\||[-+*/(),;:=<>])
+''', re.VERBOSE)
+
+FIELD_ALIASES = {
+    'C': 'close', 'CLOSE': 'close',
+    'O': 'open', 'OPEN': 'open',
+    'H': 'high', 'HIGH': 'high',
+    'L': 'low', 'LOW': 'low',
+    'V': 'volume', 'VOL': 'volume', 'VOLUME': 'volume',
+    'AMO': 'amount', 'AMOUNT': 'amount',
+}
+
+# 第一个参数是序列，其余参数必须是常数的滚动函数，以及参数的默认值
+WINDOW_FUNCS = {
+    'MA': (1, ()), 'EMA': (1, ()), 'SMA': (1, (1,)), 'REF': (0, (1,)), 'HHV': (1, ()), 'LLV': (1, ()),
+    'SUM': (1, ()), 'COUNT': (1, ()), 'SLOPE': (1, ()),
+}
+ELEMENT_FUNCS = {'ABS': 1, 'MAX': 2, 'MIN': 2, 'ATAN': 1, 'SQRT': 1, 'IF': 3, 'NOT': 1}
+DRAW_FUNCS = {'DRAWICON', 'DRAWTEXT', 'DRAWNUMBER', 'DRAWLINE', 'DRAWKLINE', 'DRAWBAND', 'STICKLINE', 'POLYLINE',
+              'PLOYLINE', 'DRAWGBK', 'DRAWSL', 'VERTLINE', 'PARTLINE'}
+COMMUTATIVE = {'+', '*', '=', '<>', 'AND', 'OR', 'MAX', 'MIN'}
+
+
+def _tokenize(source: str) -> list[tuple[str, str]]:
+    tokens = []
+    pos = 0
+    while pos < len(source):
+        match = _TOKEN.match(source, pos)
+        if match is None:
+            raise ValueError(f'公式第 {source.count(chr(10), 0, pos) + 1} 行无法识别：{source[pos:pos + 10]}')
+        kind = match.lastgroup
+        if kind != 'space':
+            text = match.group(kind)
+            if kind == 'name':
+                text = text.upper()
+                if text in ('AND', 'OR'):
+                    kind = 'op'
+            elif kind == 'op':
+                text = {'&&': 'AND', '||': 'OR', '==': '=', '!=': '<>'}.get(text, text)
+            tokens.append((kind, text))
+        pos = match.end()
+    return tokens
+
+
+def _truth(x):
+    x = np.asarray(x, dtype=np.float64)
+    return (x != 0) & ~np.isnan(x)
+
+
+def _compare(op: str, a, b):
+    with np.errstate(invalid='ignore'):
+        if op == '>':
+            ans = np.greater(a, b)
+        elif op == '<':
+            ans = np.less(a, b)
+        elif op == '>=':
+            ans = np.greater_equal(a, b)
+        elif op == '<=':
+            ans = np.less_equal(a, b)
+        elif op == '=':
+            ans = np.equal(a, b)
+        else:
+            ans = np.not_equal(a, b) & ~np.isnan(a) & ~np.isnan(b)
+    return np.asarray(ans, dtype=np.float64)
+
+
+def _binary(op: str, a, b):
+    if op in ('AND', 'OR'):
+        ans = (_truth(a) & _truth(b)) if op == 'AND' else (_truth(a) | _truth(b))
+        return ans.astype(np.float64)
+    if op in ('>', '<', '>=', '<=', '=', '<>'):
+        return _compare(op, a, b)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if op == '+':
+            return np.add(a, b)
+        if op == '-':
+            return np.subtract(a, b)
+        if op == '*':
+            return np.multiply(a, b)
+        return np.divide(a, b)
+
+
+def _element(name: str, args: list):
+    if name == 'IF':
+        return np.where(_truth(args[0]), args[1], args[2]).astype(np.float64)
+    if name == 'NOT':
+        return (~_truth(args[0])).astype(np.float64)
+    with np.errstate(invalid='ignore'):
+        if name == 'ABS':
+            return np.abs(args[0])
+        if name == 'MAX':
+            return np.maximum(args[0], args[1])
+        if name == 'MIN':
+            return np.minimum(args[0], args[1])
+        if name == 'ATAN':
+            return np.arctan(args[0])
+        return np.sqrt(args[0])
+
+
+class TdxFormula:
+    def __init__(self, source: str):
+        self.source = source
+        self.nodes: list[tuple] = []            # (op, 子节点编号, 常数参数)，子节点一定排在父节点前面
+        self.keys: Dict[tuple, int] = {}        # 公共子表达式消除：同样的运算只建一次
+        self.names: Dict[str, int] = {}         # 赋值的变量名，同名重新赋值时覆盖
+        self.outputs: list[str] = []            # 用冒号输出的变量名，按出现顺序
+        self.params: set[str] = set()           # 公式里用到但不是行情字段的名字，求值时由调用方提供
+        self.tokens = _tokenize(source)
+        self.pos = 0
+        while self.pos < len(self.tokens):
+            self._statement()
+        del self.tokens
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    # -----------------------
+    # 构图
+    # -----------------------
+    def _node(self, op: str, children: tuple = (), consts: tuple = ()) -> int:
+        if op in ('<', '<='):
+            op, children = {'<': '>', '<=': '>='}[op], children[::-1]     # B<A 与 A>B 共用一个节点
+        if op in COMMUTATIVE:
+            children = tuple(sorted(children))
+        if op not in ('const', 'field', 'param') and op not in WINDOW_FUNCS and len(children) > 0 and \
+                all(self.nodes[c][0] == 'const' for c in children):
+            # 常数折叠，如 波动过滤 / 100
+            values = [self.nodes[c][2][0] for c in children]
+            return self._node('const', (), (float(self._apply(op, values, consts, single)),))
+        key = (op, children, consts)
+        if key not in self.keys:
+            self.keys[key] = len(self.nodes)
+            self.nodes.append(key)
+        return self.keys[key]
+
+    def _const_value(self, index: int, func: str):
+        op, _, consts = self.nodes[index]
+        if op != 'const':
+            raise ValueError(f'{func} 的周期参数必须是常数')
+        value = consts[0]
+        return int(value) if float(value).is_integer() else value
+
+    def _peek(self, offset: int = 0) -> tuple[str, str]:
+        index = self.pos + offset
+        return self.tokens[index] if index < len(self.tokens) else ('end', '')
+
+    def _take(self, text: str = None) -> tuple[str, str]:
+        token = self._peek()
+        if text is not None and token[1] != text:
+            raise ValueError(f'公式缺少 {text}，遇到 {token[1] or "结尾"}')
+        self.pos += 1
+        return token
+
+    def _statement(self):
+        kind, text = self._peek()
+        if kind == 'op' and text == ';':
+            self._take()
+            return
+        if kind == 'name' and text in DRAW_FUNCS:
+            while self._peek()[0] != 'end' and self._take()[1] != ';':    # 画图语句不参与计算
+                pass
+            return
+
+        name = None
+        if kind == 'name' and self._peek(1)[1] in (':=', ':'):
+            name = text
+            output = self._peek(1)[1] == ':'
+            self.pos += 2
+        index = self._expr()
+        while self._peek()[1] == ',':       # NODRAW、COLORRED 等显示属性
+            self._take()
+            self._take()
+        if self._peek()[0] != 'end':
+            self._take(';')
+
+        if name is None:
+            name = f'OUT{len(self.outputs) + 1}'
+            output = True
+        self.names[name] = index
+        if output:
+            if name in self.outputs:
+                self.outputs.remove(name)
+            self.outputs.append(name)
+
+    def _expr(self) -> int:
+        return self._binary_level(0)
+
+    _LEVELS = [('OR',), ('AND',), ('=', '<>', '>', '<', '>=', '<='), ('+', '-'), ('*', '/')]
+
+    def _binary_level(self, level: int) -> int:
+        if level == len(self._LEVELS):
+            return self._unary()
+        left = self._binary_level(level + 1)
+        while self._peek()[0] == 'op' and self._peek()[1] in self._LEVELS[level]:
+            op = self._take()[1]
+            right = self._binary_level(level + 1)
+            left = self._node(op, (left, right))
+        return left
+
+    def _unary(self) -> int:
+        kind, text = self._peek()
+        if text == '-':
+            self._take()
+            return self._node('NEG', (self._unary(),))
+        if text == '+':
+            self._take()
+            return self._unary()
+        return self._primary()
+
+    def _primary(self) -> int:
+        kind, text = self._take()
+        if kind == 'number':
+            return self._node('const', (), (float(text),))
+        if text == '(':
+            index = self._expr()
+            self._take(')')
+            return index
+        if kind != 'name':
+            raise ValueError(f'公式在 {text or "结尾"} 处不完整')
+
+        if self._peek()[1] == '(':
+            self._take()
+            args = []
+            if self._peek()[1] != ')':
+                args.append(self._expr())
+                while self._peek()[1] == ',':
+                    self._take()
+                    args.append(self._expr())
+            self._take(')')
+            return self._call(text, args)
+
+        if text in self.names:
+            return self.names[text]
+        if text in FIELD_ALIASES:
+            return self._node('field', (), (FIELD_ALIASES[text],))
+        self.params.add(text)
+        return self._node('param', (), (text,))
+
+    def _call(self, func: str, args: list[int]) -> int:
+        if func in WINDOW_FUNCS:
+            required, defaults = WINDOW_FUNCS[func]
+            if not required < len(args) <= required + len(defaults) + 1:
+                raise ValueError(f'{func} 的参数个数不对')
+            consts = [self._const_value(arg, func) for arg in args[1:]]
+            consts += defaults[len(consts) - required:]     # 补上省略的参数，如 REF(C) 即 REF(C,1)
+            return self._node(func, (args[0],), tuple(consts))
+        if func in ELEMENT_FUNCS:
+            if len(args) != ELEMENT_FUNCS[func]:
+                raise ValueError(f'{func} 需要 {ELEMENT_FUNCS[func]} 个参数')
+            return self._node(func, tuple(args))
+        # 由基本运算组合出的函数
+        if func == 'CROSS' and len(args) == 2:
+            above = self._node('>', (args[0], args[1]))
+            return self._node('AND', (above, self._node('=', (self._node('REF', (above,), (1,)), self._zero()))))
+        if func in ('EVERY', 'EXIST') and len(args) == 2:
+            n = self._const_value(args[1], func)
+            total = self._node('SUM', (self._node('<>', (args[0], self._zero())),), (n,))
+            return self._node('=', (total, args[1])) if func == 'EVERY' else self._node('>', (total, self._zero()))
+        raise ValueError(f'不支持的函数 {func}')
+
+    def _zero(self) -> int:
+        return self._node('const', (), (0.0,))
+
+    # -----------------------
+    # 求值
+    # -----------------------
+    @staticmethod
+    def _apply(op: str, values: list, consts: tuple, backend, blank: np.ndarray = None):
+        if op in WINDOW_FUNCS:
+            series = values[0]
+            if blank is not None and np.shape(series) != blank.shape:
+                # 常数或按代码的参数先展开成序列（如 SUM(1,N) 数K线根数），面板左侧补位的空K线不计入
+                series = np.where(blank, np.nan, np.broadcast_to(series, blank.shape))
+            return getattr(backend, op)(np.array(series, dtype=np.float64), *consts)
+        if op in ELEMENT_FUNCS:
+            return _element(op, values)
+        if op == 'NEG':
+            return np.negative(values[0])
+        return _binary(op, values[0], values[1])
+
+    def _required(self, targets: list[int]) -> list[int]:
+        needed = set()
+        stack = list(targets)
+        while stack:
+            index = stack.pop()
+            if index not in needed:
+                needed.add(index)
+                stack.extend(self.nodes[index][1])
+        return sorted(needed)
+
+    def _run(self, names: Optional[list[str]], fields: Callable, params: dict, backend) -> Dict[str, np.ndarray]:
+        names = self.outputs if names is None else names
+        for name in names:
+            if name not in self.names:
+                raise ValueError(f'公式里没有 {name}')
+        missing = self.params - set(params)
+        if missing:
+            raise ValueError(f'公式里的 {",".join(sorted(missing))} 需要通过 params 提供')
+
+        values = {}
+        blank = np.isnan(fields('close'))
+        for index in self._required([self.names[name] for name in names]):
+            op, children, consts = self.nodes[index]
+            if op == 'const':
+                values[index] = consts[0]
+            elif op == 'field':
+                values[index] = fields(consts[0])
+            elif op == 'param':
+                values[index] = params[consts[0]]
+            else:
+                values[index] = self._apply(op, [values[c] for c in children], consts, backend, blank)
+        return {name: values[self.names[name]] for name in names}
+
+    def evaluate(self, df: pd.DataFrame, names: list[str] = None, params: dict = None) -> Dict[str, np.ndarray]:
+        # 单票：df 为日线 DataFrame，返回 {变量名: 一维数组}
+        return self._run(names, lambda column: df[column].to_numpy(dtype=np.float64), params or {}, single)
+
+    def evaluate_panel(self, panel: HistoryPanel, names: list[str] = None, params: dict = None) -> Dict[str, np.ndarray]:
+        # 全市场面板：params 里按代码给出的一维数组会扩展成每行一个值，返回 {变量名: 代码 × K线 的二维数组}
+        params = {name: np.asarray(value, dtype=np.float64)[:, None] if np.ndim(value) == 1 else value
+                  for name, value in (params or {}).items()}
+        return self._run(names, lambda column: panel[column], params, panel_backend)
+
+
+@functools.lru_cache(maxsize=64)
+def compile_formula(source: str) -> TdxFormula:
+    return TdxFormula(source)
+
+
+class FormulaSelector:
+    # 直接用公式源码作为选股公式，提供与 selector 模块相同的 select 和 select_batch
+    def __init__(
+        self,
+        source: str,
+        output: str = None,                                 # 作为 PASS 的输出，默认最后一个输出
+        params: Dict[str, Callable[[str], float]] = None,   # 按代码取值的参数，如 LIMITINGUPRATE: get_limiting_up_rate
+        min_bars: int = 0,                                  # 历史不足的票直接不通过
+    ):
+        self.formula = compile_formula(source)
+        self.output = self.formula.outputs[-1] if output is None else output
+        self.params = params or {}
+        self.min_bars = min_bars
+
+    def select(self, df: pd.DataFrame, code: str, quote: dict) -> pd.DataFrame:
+        if len(df) < self.min_bars:
+            df['PASS'] = False
+            return df
+        params = {name: func(code) for name, func in self.params.items()}
+        df['PASS'] = _truth(self.formula.evaluate(df, [self.output], params)[self.output])
+        return df
+
+    def select_batch(self, panel: HistoryPanel) -> np.ndarray:
+        params = {name: np.array([func(code) for code in panel.codes]) for name, func in self.params.items()}
+        result = _truth(self.formula.evaluate_panel(panel, [self.output], params)[self.output])
+        return result & (panel.lengths >= self.min_bars)[:, None]
@@ -0,0 +1,229 @@
+import time
+import threading
+import contextlib
+from typing import Callable, Dict, Optional
+
+
+# 上游数据源常量，按实际请求的服务端划分，而非按 SDK 划分
+class RequestSource:
+    SINA = 'sina'               # akshare 新浪日线、复权因子
+    EASTMONEY = 'eastmoney'     # akshare 东财 ETF、板块接口
+    TUSHARE = 'tushare'
+    MOOTDX = 'mootdx'
+    WENCAI = 'wencai'
+    BAIDU = 'baidu'             # 百度股市通除权除息日历
+
+
+class CircuitOpenError(Exception):
+    """ 熔断器打开期间直接拒绝请求，避免持续请求被 ban 的接口 """
+    pass
+
+
+class SourcePolicy:
+    def __init__(
+        self,
+        rate: float,                    # 每秒平均请求数
+        burst: int = 1,                 # 令牌桶容量，允许的瞬时突发请求数
+        max_concurrency: int = 1,       # 同时在途的最大请求数
+        failure_threshold: int = 5,     # 连续失败多少次触发熔断
+        cooldown: float = 60.0,         # 熔断后冷却秒数，之后半开放行一次试探
+    ):
+        assert rate > 0, 'rate 必须大于0'
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.max_concurrency = max(1, max_concurrency)
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+
+
+# 默认策略参照原先散落各处的 sleep 间隔设置
+DEFAULT_SOURCE_POLICIES: Dict[str, SourcePolicy] = {
+    # 新浪对高频请求会封 IP，沿用原先日线下载每只间隔 5 秒的串行节奏
+    RequestSource.SINA: SourcePolicy(rate=0.2, burst=1, max_concurrency=1),
+    RequestSource.EASTMONEY: SourcePolicy(rate=1.0, burst=1, max_concurrency=1),
+    RequestSource.TUSHARE: SourcePolicy(rate=2.0, burst=2, max_concurrency=2),
+    RequestSource.MOOTDX: SourcePolicy(rate=10.0, burst=10, max_concurrency=1),
+    RequestSource.WENCAI: SourcePolicy(rate=0.5, burst=1, max_concurrency=1),
+    RequestSource.BAIDU: SourcePolicy(rate=2.0, burst=1, max_concurrency=1),
+}
+
+
+class _SourceState:
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, policy: SourcePolicy):
+        self.policy = policy
+        self.lock = threading.Lock()
+        self.semaphore = threading.BoundedSemaphore(policy.max_concurrency)
+
+        # 令牌桶
+        self.tokens = float(policy.burst)
+        self.refill_time = time.monotonic()
+
+        # 熔断器
+        self.circuit = self.CLOSED
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.half_open_probing = False
+
+        # 统计计数
+        self.created_time = time.monotonic()
+        self.requests = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.throttled = 0
+        self.in_flight = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.circuit_trips = 0
+
+    def reserve(self) -> float:
+        # 预约一个令牌，返回需要等待的秒数，令牌允许为负数以保证先来先服务
+        now = time.monotonic()
+        self.tokens = min(self.policy.burst, self.tokens + (now - self.refill_time) * self.policy.rate)
+        self.refill_time = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.policy.rate
+
+    def admit(self) -> None:
+        now = time.monotonic()
+        if self.circuit == self.OPEN:
+            if now < self.open_until:
+                self.rejected += 1
+                raise CircuitOpenError(f'熔断中，{self.open_until - now:.1f}秒后重试')
+            self.circuit = self.HALF_OPEN
+            self.half_open_probing = False
+
+        if self.circuit == self.HALF_OPEN:
+            if self.half_open_probing:
+                self.rejected += 1
+                raise CircuitOpenError('熔断半开，试探请求进行中')
+            self.half_open_probing = True
+
+    def record(self, success: bool) -> None:
+        if success:
+            self.completed += 1
+            self.consecutive_failures = 0
+            self.circuit = self.CLOSED
+            self.half_open_probing = False
+            return
+
+        self.failed += 1
+        self.consecutive_failures += 1
+        if self.circuit == self.HALF_OPEN or self.consecutive_failures >= self.policy.failure_threshold:
+            self.circuit = self.OPEN
+            self.open_until = time.monotonic() + self.policy.cooldown
+            self.half_open_probing = False
+            self.circuit_trips += 1
+
+
+# 进程内全局的上游请求调度器：限速、限并发、熔断，并统计吞吐和排队情况
+class RequestGovernor:
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __new__(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = super(RequestGovernor, cls).__new__(cls)
+                cls._instance._states_lock = threading.Lock()
+                cls._instance._states = {}
+        return cls._instance
+
+    def configure(self, source: str, policy: SourcePolicy) -> None:
+        # 重新配置会重置该数据源的计数和熔断状态
+        with self._states_lock:
+            self._states[source] = _SourceState(policy)
+
+    def policy(self, source: str) -> SourcePolicy:
+        return self._get_state(source).policy
+
+    def _get_state(self, source: str) -> _SourceState:
+        with self._states_lock:
+            if source not in self._states:
+                policy = DEFAULT_SOURCE_POLICIES.get(source, SourcePolicy(rate=1.0))
+                self._states[source] = _SourceState(policy)
+            return self._states[source]
+
+    @contextlib.contextmanager
+    def slot(self, source: str):
+        state = self._get_state(source)
+        with state.lock:
+            state.requests += 1
+            state.admit()
+
+        t0 = time.monotonic()
+        state.semaphore.acquire()
+        try:
+            with state.lock:
+                wait = state.reserve()
+            if wait > 0:
+                time.sleep(wait)
+
+            queued = time.monotonic() - t0
+            with state.lock:
+                state.wait_total += queued
+                state.wait_max = max(state.wait_max, queued)
+                if wait > 0:
+                    state.throttled += 1
+                state.in_flight += 1
+
+            success = False
+            try:
+                yield
+                success = True
+            finally:
+                with state.lock:
+                    state.in_flight -= 1
+                    state.record(success)
+        finally:
+            state.semaphore.release()
+
+    def call(self, source: str, func: Callable, *args, **kwargs):
+        with self.slot(source):
+            return func(*args, **kwargs)
+
+    def reset_circuit(self, source: str) -> None:
+        state = self._get_state(source)
+        with state.lock:
+            state.circuit = _SourceState.CLOSED
+            state.consecutive_failures = 0
+            state.half_open_probing = False
+
+    def stats(self, source: Optional[str] = None) -> Dict[str, Dict]:
+        with self._states_lock:
+            sources = [source] if source is not None else list(self._states.keys())
+
+        ans = {}
+        for src in sources:
+            state = self._get_state(src)
+            with state.lock:
+                elapsed = max(time.monotonic() - state.created_time, 1e-6)
+                admitted = state.completed + state.failed
+                ans[src] = {
+                    'requests': state.requests,
+                    'completed': state.completed,
+                    'failed': state.failed,
+                    'rejected': state.rejected,
+                    'throttled': state.throttled,
+                    'in_flight': state.in_flight,
+                    'throughput': state.completed / elapsed,    # 每秒成功请求数
+                    'wait_avg': state.wait_total / admitted if admitted > 0 else 0.0,
+                    'wait_max': state.wait_max,
+                    'circuit': state.circuit,
+                    'circuit_trips': state.circuit_trips,
+                }
+        return ans
+
+    def summary(self, source: str) -> str:
+        s = self.stats(source)[source]
+        return f'[{source}] ok:{s["completed"]} fail:{s["failed"]} reject:{s["rejected"]} ' \
+               f'throttled:{s["throttled"]} {s["throughput"]:.2f}/s ' \
+               f'wait avg:{s["wait_avg"]:.2f}s max:{s["wait_max"]:.2f}s circuit:{s["circuit"]}'
+
+
+def governed_call(source: str, func: Callable, *args, **kwargs):
+    return RequestGovernor().call(source, func, *args, **kwargs)
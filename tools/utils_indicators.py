@@ -0,0 +1,139 @@
+import threading
+import numpy as np
+import pandas as pd
+
+from typing import Dict, Optional
+
+from mytt.MyTT import CCI, WR
+
+
+# ================================================
+# 日线指标的递推状态：盘前用截至昨天的历史算好滚动窗口和 EMA 的递推值，盘中代入实时价格 O(1) 得到今天的指标
+# 与 concat_ak_quote_dict 拼接今天一行后整列重算的结果一致，EMA 按 pandas ewm(adjust=False) 的同一公式递推
+# ================================================
+
+
+def _ema_alpha(span: int) -> float:
+    return 2 / (span + 1)
+
+
+def _ema_next(prev: float, value: float, alpha: float) -> float:
+    # 与 pandas ewm(adjust=False) 的浮点运算顺序一致
+    return ((1 - alpha) * prev + alpha * value) / ((1 - alpha) + alpha)
+
+
+def _ema(values: np.ndarray, span: int) -> np.ndarray:
+    return pd.Series(values).ewm(span=span, adjust=False).mean().values
+
+
+class DailyIndicatorState:
+    def __init__(self, history: pd.DataFrame):
+        self.length = len(history)
+        self.last_date = history['datetime'].values[-1] if self.length > 0 else None
+        self.close = history['close'].to_numpy(dtype=np.float64)
+        self.high = history['high'].to_numpy(dtype=np.float64)
+        self.low = history['low'].to_numpy(dtype=np.float64)
+        self.lock = threading.Lock()
+        self.cache: Dict[tuple, any] = {}   # 按指标和参数缓存截至昨天的状态
+
+    def _cached(self, key: tuple, build):
+        with self.lock:
+            if key not in self.cache:
+                self.cache[key] = build()
+            return self.cache[key]
+
+    def ma(self, price: float, n: int) -> float:
+        # 今天的 n 日均线
+        prev_sum = self._cached(('ma', n), lambda: float(self.close[-(n - 1):].sum()) if n > 1 else 0.0)
+        if self.length < n - 1:
+            return np.nan
+        return (prev_sum + price) / n
+
+    def cci(self, close: float, high: float, low: float, n: int = 14) -> tuple[float, float]:
+        # (昨天, 今天)
+        def _build():
+            prev = CCI(self.close, self.high, self.low, n)[-1] if self.length > 0 else np.nan
+            tp = (self.high[-(n - 1):] + self.low[-(n - 1):] + self.close[-(n - 1):]) / 3 if n > 1 else np.zeros(0)
+            return prev, tp
+        prev, tp = self._cached(('cci', n), _build)
+        if self.length < n - 1:
+            return prev, np.nan
+        window = np.append(tp, (high + low + close) / 3)
+        mean = window.mean()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return prev, (window[-1] - mean) / (0.015 * np.abs(window - mean).mean())
+
+    def wr(self, close: float, high: float, low: float, n: int = 10) -> tuple[float, float]:
+        # (昨天, 今天)，与 MyTT.WR 一样保留 3 位小数
+        def _build():
+            prev = WR(self.close, self.high, self.low, n)[-1] if self.length > 0 else np.nan
+            hhv = self.high[-(n - 1):].max() if 1 < n <= self.length + 1 else -np.inf
+            llv = self.low[-(n - 1):].min() if 1 < n <= self.length + 1 else np.inf
+            return prev, hhv, llv
+        prev, hhv, llv = self._cached(('wr', n), _build)
+        if self.length < n - 1:
+            return prev, np.nan
+        hhn = np.float64(max(hhv, high))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return prev, np.round((hhn - close) / (hhn - min(llv, low)) * 100, 3)
+
+    def macd(self, close: float, short: int = 12, long: int = 26, m: int = 9) -> tuple[float, float]:
+        # (昨天, 今天) 的 MACD 柱，与 MyTT.MACD 一样保留 3 位小数
+        def _build():
+            if self.length == 0:
+                return np.nan, None
+            ema_short = _ema(self.close, short)
+            ema_long = _ema(self.close, long)
+            dif = ema_short - ema_long
+            dea = _ema(dif, m)
+            return np.round((dif[-1] - dea[-1]) * 2, 3), (ema_short[-1], ema_long[-1], dea[-1])
+        prev, emas = self._cached(('macd', short, long, m), _build)
+        if emas is None:
+            return prev, np.nan
+        ema_short = _ema_next(emas[0], close, _ema_alpha(short))
+        ema_long = _ema_next(emas[1], close, _ema_alpha(long))
+        dif = ema_short - ema_long
+        dea = _ema_next(emas[2], dif, _ema_alpha(m))
+        return prev, np.round((dif - dea) * 2, 3)
+
+
+class IndicatorCache:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.states: Dict[str, DailyIndicatorState] = {}
+
+    def build(self, cache_history: Dict[str, pd.DataFrame]) -> None:
+        # 盘前一次性为全部历史建好状态
+        states = {code: DailyIndicatorState(df) for code, df in cache_history.items()}
+        with self.lock:
+            self.states = states
+
+    def clear(self) -> None:
+        with self.lock:
+            self.states = {}
+
+    def get(self, code: str, history: pd.DataFrame) -> Optional[DailyIndicatorState]:
+        # 历史有变动（条数或最后日期不同）时按当前历史重建
+        if history is None:
+            return None
+        with self.lock:
+            state = self.states.get(code)
+        if state is None or state.length != len(history) or \
+                (state.length > 0 and state.last_date != history['datetime'].values[-1]):
+            state = DailyIndicatorState(history)
+            with self.lock:
+                self.states[code] = state
+        return state
+
+    def __len__(self) -> int:
+        return len(self.states)
+
+
+indicator_cache: Optional[IndicatorCache] = None
+
+
+def get_indicator_cache() -> IndicatorCache:
+    global indicator_cache
+    if indicator_cache is None:
+        indicator_cache = IndicatorCache()
+    return indicator_cache
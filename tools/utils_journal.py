@@ -0,0 +1,301 @@
+import os
+import json
+import time
+import struct
+import datetime
+import threading
+import numpy as np
+
+from array import array
+from typing import Dict, Optional
+
+
+# ================================================
+# 盘中 tick 追加写日志
+# 文件结构：[头部 32 字节][定长记录 ...][索引 json][按代码分组的记录序号 int64 ...][尾部 32 字节]
+# 进程中途崩溃时没有索引和尾部，读取时按文件长度恢复记录并重建索引
+# 收盘写索引前先把记录条数写进头部并落盘，写索引中途崩溃时按头部的条数截掉写了一半的索引
+# ================================================
+
+
+JOURNAL_MAGIC = b'SQTJ'
+JOURNAL_INDEX_MAGIC = b'SQTI'
+JOURNAL_VERSION = 1
+JOURNAL_HEADER = struct.Struct('<4sHH8sQ8x')     # magic, version, record_size, date, closed_count（写入中为 0）
+JOURNAL_TRAILER = struct.Struct('<4s4xQQQ')      # magic, index_offset, json_length, record_count
+
+JOURNAL_FSYNC_SECONDS = 5.0     # 定期落盘间隔
+JOURNAL_BLOCK_RECORDS = 4096    # 时间索引的块大小，按时间范围读取时只读相关的块
+
+TICK_RECORD_DTYPE = np.dtype([
+    ('code', 'S12'),
+    ('time', '<i8'),            # 毫秒时间戳
+    ('price', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('volume', '<i8'),          # 累计成交量（手）
+    ('amount', '<f8'),          # 累计成交额（元）
+    ('askPrice', '<f8', (5,)),
+    ('askVol', '<i8', (5,)),
+    ('bidPrice', '<f8', (5,)),
+    ('bidVol', '<i8', (5,)),
+])
+
+
+def _fill_levels(values: list) -> list:
+    if values is None:
+        return [0] * 5
+    values = list(values)[:5]
+    return values + [0] * (5 - len(values))
+
+
+def quotes_to_records(quotes: Dict[str, dict]) -> np.ndarray:
+    records = np.zeros(len(quotes), dtype=TICK_RECORD_DTYPE)
+    for i, code in enumerate(quotes):
+        quote = quotes[code]
+        records[i] = (
+            code.encode(),
+            quote['time'],
+            quote['lastPrice'],
+            quote['high'],
+            quote['low'],
+            quote['volume'],
+            quote['amount'],
+            _fill_levels(quote.get('askPrice')),
+            _fill_levels(quote.get('askVol')),
+            _fill_levels(quote.get('bidPrice')),
+            _fill_levels(quote.get('bidVol')),
+        )
+    return records
+
+
+def record_to_tick(record) -> list:
+    # 转换成 XtSubscriber list 模式的 tick 格式
+    return [
+        datetime.datetime.fromtimestamp(int(record['time']) / 1000).strftime('%H:%M:%S'),
+        round(float(record['price']), 3),
+        round(float(record['high']), 3),
+        round(float(record['low']), 3),
+        int(record['volume']),
+        round(float(record['amount']), 3),
+        [round(float(p), 3) for p in record['askPrice']],
+        [int(v) for v in record['askVol']],
+        [round(float(p), 3) for p in record['bidPrice']],
+        [int(v) for v in record['bidVol']],
+    ]
+
+
+def _count_records(f, file_size: int, closed_count: int) -> tuple[int, Optional[tuple[int, int, int]]]:
+    # 有尾部按尾部，写索引时崩溃按头部记下的条数，否则按文件长度丢掉最后不完整的记录
+    trailer = _read_trailer(f, file_size)
+    if trailer is not None:
+        return trailer[2], trailer
+    if closed_count > 0:
+        return closed_count, None
+    return (file_size - JOURNAL_HEADER.size) // TICK_RECORD_DTYPE.itemsize, None
+
+
+def _read_trailer(f, file_size: int) -> Optional[tuple[int, int, int]]:
+    if file_size < JOURNAL_HEADER.size + JOURNAL_TRAILER.size:
+        return None
+    f.seek(file_size - JOURNAL_TRAILER.size)
+    magic, index_offset, json_length, record_count = JOURNAL_TRAILER.unpack(f.read(JOURNAL_TRAILER.size))
+    if magic != JOURNAL_INDEX_MAGIC:
+        return None
+    return index_offset, json_length, record_count
+
+
+class TickJournalWriter:
+    def __init__(self, path: str, trade_date: str, fsync_seconds: float = JOURNAL_FSYNC_SECONDS):
+        self.path = path
+        self.trade_date = trade_date    # format: 20240101
+        self.fsync_seconds = fsync_seconds
+        self.lock = threading.Lock()
+
+        self.record_count = 0
+        self.code_positions: Dict[str, array] = {}     # code -> 记录序号
+        self.blocks: list[list[int]] = []               # 每块的 [min_time, max_time]
+        self.last_fsync = time.monotonic()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if os.path.exists(path) and os.path.getsize(path) >= JOURNAL_HEADER.size:
+            self._reopen()
+        else:
+            self.file = open(path, 'wb')
+            self._write_header(0)
+            self.file.flush()
+
+    def _reopen(self) -> None:
+        # 盘中重启时接着当天的文件继续写，先去掉旧的索引以及崩溃时写了一半的记录
+        self.file = open(self.path, 'r+b')
+        _, _, record_size, trade_date, closed_count = JOURNAL_HEADER.unpack(self.file.read(JOURNAL_HEADER.size))
+        if trade_date.decode() != self.trade_date or record_size != TICK_RECORD_DTYPE.itemsize:
+            self.file.close()
+            raise ValueError(f'{self.path} 不是 {self.trade_date} 的tick日志')
+
+        self.record_count, _ = _count_records(self.file, os.path.getsize(self.path), closed_count)
+        self.file.seek(JOURNAL_HEADER.size)
+        self._index(np.fromfile(self.file, dtype=TICK_RECORD_DTYPE, count=self.record_count), 0)
+        self.file.truncate(JOURNAL_HEADER.size + self.record_count * record_size)
+        self._write_header(0)   # 重新进入写入状态
+        self._sync()
+        self.file.seek(0, os.SEEK_END)
+
+    def _write_header(self, closed_count: int) -> None:
+        self.file.seek(0)
+        self.file.write(JOURNAL_HEADER.pack(
+            JOURNAL_MAGIC, JOURNAL_VERSION, TICK_RECORD_DTYPE.itemsize, self.trade_date.encode(), closed_count))
+
+    def _index(self, records: np.ndarray, start: int) -> None:
+        codes = records['code']
+        times = records['time']
+        for i in range(len(records)):
+            code = codes[i].decode()
+            if code not in self.code_positions:
+                self.code_positions[code] = array('q')
+            self.code_positions[code].append(start + i)
+
+            block = (start + i) // JOURNAL_BLOCK_RECORDS
+            t = int(times[i])
+            if block >= len(self.blocks):
+                self.blocks.append([t, t])
+            else:
+                self.blocks[block][0] = min(self.blocks[block][0], t)
+                self.blocks[block][1] = max(self.blocks[block][1], t)
+
+    def append_quotes(self, quotes: Dict[str, dict]) -> None:
+        if len(quotes) == 0:
+            return
+        records = quotes_to_records(quotes)
+        with self.lock:
+            self.file.write(records.tobytes())
+            self._index(records, self.record_count)
+            self.record_count += len(records)
+
+            if time.monotonic() - self.last_fsync >= self.fsync_seconds:
+                self._sync()
+
+    def _sync(self) -> None:
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.last_fsync = time.monotonic()
+
+    def flush(self) -> None:
+        with self.lock:
+            self._sync()
+
+    def close(self) -> None:
+        # 收盘后写入按代码分组的索引，之后读取单只票不需要扫描整个文件
+        with self.lock:
+            if self.file.closed:
+                return
+
+            index_offset = JOURNAL_HEADER.size + self.record_count * TICK_RECORD_DTYPE.itemsize
+            codes = {}
+            offset = 0
+            for code, positions in self.code_positions.items():
+                codes[code] = [offset, len(positions)]
+                offset += len(positions)
+            meta = json.dumps({
+                'codes': codes,
+                'blocks': self.blocks,
+                'block_records': JOURNAL_BLOCK_RECORDS,
+            }).encode()
+
+            self._write_header(self.record_count)
+            self._sync()
+
+            self.file.seek(index_offset)
+            self.file.write(meta)
+            for positions in self.code_positions.values():
+                self.file.write(positions.tobytes())
+            self.file.write(JOURNAL_TRAILER.pack(JOURNAL_INDEX_MAGIC, index_offset, len(meta), self.record_count))
+            self.file.truncate()
+            self._sync()
+            self.file.close()
+
+
+class TickJournalReader:
+    def __init__(self, path: str):
+        self.path = path
+        file_size = os.path.getsize(path)
+        with open(path, 'rb') as f:
+            magic, version, record_size, trade_date, closed_count = JOURNAL_HEADER.unpack(f.read(JOURNAL_HEADER.size))
+            if magic != JOURNAL_MAGIC:
+                raise ValueError(f'{path} 不是tick日志文件')
+            if record_size != TICK_RECORD_DTYPE.itemsize:
+                raise ValueError(f'{path} 记录长度 {record_size} 与当前版本不一致')
+            self.trade_date = trade_date.decode()
+
+            self.record_count, trailer = _count_records(f, file_size, closed_count)
+            if trailer is not None:
+                index_offset, json_length, _ = trailer
+                f.seek(index_offset)
+                meta = json.loads(f.read(json_length).decode())
+                self.code_ranges: Dict[str, list[int]] = meta['codes']
+                self.blocks: list[list[int]] = meta['blocks']
+                self.block_records: int = meta['block_records']
+                self.positions = np.memmap(
+                    path, dtype='<i8', mode='r', offset=index_offset + json_length, shape=(self.record_count,),
+                ) if self.record_count > 0 else np.zeros(0, dtype='<i8')
+                self.is_indexed = True
+            else:
+                self.is_indexed = False
+
+        self.records = np.memmap(
+            path, dtype=TICK_RECORD_DTYPE, mode='r', offset=JOURNAL_HEADER.size, shape=(self.record_count,),
+        ) if self.record_count > 0 else np.zeros(0, dtype=TICK_RECORD_DTYPE)
+
+        if not self.is_indexed:
+            self._rebuild_index()
+
+    def _rebuild_index(self) -> None:
+        codes = np.asarray(self.records['code'])
+        order = np.argsort(codes, kind='stable')
+        uniques, starts, counts = np.unique(codes[order], return_index=True, return_counts=True)
+        self.positions = order.astype('<i8')
+        self.code_ranges = {c.decode(): [int(s), int(n)] for c, s, n in zip(uniques, starts, counts)}
+
+        self.block_records = JOURNAL_BLOCK_RECORDS
+        times = np.asarray(self.records['time'])
+        self.blocks = [[int(times[i:i + self.block_records].min()), int(times[i:i + self.block_records].max())]
+                       for i in range(0, len(times), self.block_records)]
+
+    def close(self) -> None:
+        # 释放 memmap 的引用即关闭映射
+        self.records = np.zeros(0, dtype=TICK_RECORD_DTYPE)
+        self.positions = np.zeros(0, dtype='<i8')
+        self.code_ranges = {}
+        self.blocks = []
+
+    def codes(self) -> list[str]:
+        return list(self.code_ranges.keys())
+
+    def read_code(self, code: str, start_ms: int = None, end_ms: int = None) -> np.ndarray:
+        # 只读取该代码的记录，同一代码的记录按写入顺序即时间顺序排列
+        if code not in self.code_ranges:
+            return np.zeros(0, dtype=TICK_RECORD_DTYPE)
+        offset, count = self.code_ranges[code]
+        records = self.records[np.asarray(self.positions[offset:offset + count])]
+        if start_ms is not None or end_ms is not None:
+            times = records['time']
+            lo = 0 if start_ms is None else int(np.searchsorted(times, start_ms, side='left'))
+            hi = len(records) if end_ms is None else int(np.searchsorted(times, end_ms, side='right'))
+            records = records[lo:hi]
+        return records
+
+    def read_range(self, start_ms: int, end_ms: int) -> np.ndarray:
+        # 按时间范围读取全部代码，只读取时间有交集的块
+        parts = []
+        for i, (block_min, block_max) in enumerate(self.blocks):
+            if block_max < start_ms or block_min > end_ms:
+                continue
+            block = self.records[i * self.block_records:(i + 1) * self.block_records]
+            mask = (block['time'] >= start_ms) & (block['time'] <= end_ms)
+            parts.append(np.asarray(block[mask]))
+        if len(parts) == 0:
+            return np.zeros(0, dtype=TICK_RECORD_DTYPE)
+        return np.concatenate(parts)
+
+    def read_ticks(self, code: str) -> list:
+        return [record_to_tick(r) for r in self.read_code(code)]
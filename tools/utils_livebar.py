@@ -0,0 +1,96 @@
+import threading
+import numpy as np
+import pandas as pd
+
+from typing import Dict, Optional
+
+from tools.utils_remote import qmt_quote_to_day_kline
+
+
+# ================================================
+# 带今日 K 线的历史：盘前按昨天为止的历史预分配 n + 1 行，最后一行留给今天，每个 tick 原地覆盖
+# 返回的 DataFrame 直接引用这些数组，与 concat_ak_quote_dict 拼接的结果一致，但不再每次新建和拼接 DataFrame
+# 同一只票每次返回的是同一个 DataFrame，下一个 tick 会被覆盖，调用方不要长期持有
+# 需要的策略盘前自己 build，没有 build 或历史有变动的代码在第一次 update 时按需建立
+# ================================================
+
+
+class LiveBarHistory:
+    def __init__(self, history: pd.DataFrame):
+        self.length = len(history)
+        self.last_date = history['datetime'].values[-1] if self.length > 0 else None
+        self.lock = threading.Lock()
+
+        self.arrays: Dict[str, np.ndarray] = {}
+        for column in history.columns:
+            values = history[column]
+            if column == 'datetime' and values.dtype.kind in 'iu':
+                array = np.zeros(self.length + 1, dtype=np.int64)       # 各数据源的日期都是 20250101 这样的整数
+            elif values.dtype.kind in 'biuf':
+                array = np.empty(self.length + 1, dtype=np.float64)     # 今天的空位为 NAN，整数列也按浮点存
+                array[-1] = np.nan
+            else:
+                array = np.empty(self.length + 1, dtype=object)
+                array[-1] = None
+            array[:-1] = values.to_numpy()
+            self.arrays[column] = array
+        # 字符串列显式保持 object，否则 pandas 会推断成 str 类型另外复制一份，不再引用这里的数组
+        self.frame = pd.DataFrame({column: pd.Series(array, dtype=array.dtype, copy=False)
+                                   for column, array in self.arrays.items()}, copy=False)
+
+    def update(self, quote: dict, curr_date: str) -> pd.DataFrame:
+        # 用实时行情覆盖今天这一行
+        record = qmt_quote_to_day_kline(quote, curr_date=curr_date)
+        if self.arrays.get('datetime') is not None and self.arrays['datetime'].dtype.kind in 'iuf':
+            record['datetime'] = int(str(curr_date).replace('-', ''))  # 与历史的日期格式保持一致
+        with self.lock:
+            for column, value in record.items():
+                if column in self.arrays:
+                    self.arrays[column][-1] = value
+        return self.frame
+
+
+class LiveBarCache:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histories: Dict[str, LiveBarHistory] = {}
+
+    def build(self, cache_history: Dict[str, pd.DataFrame]) -> None:
+        # 盘前一次性为全部历史分配好
+        histories = {code: LiveBarHistory(df) for code, df in cache_history.items()}
+        with self.lock:
+            self.histories = histories
+
+    def clear(self) -> None:
+        with self.lock:
+            self.histories = {}
+
+    def get(self, code: str, history: pd.DataFrame) -> Optional[LiveBarHistory]:
+        # 历史有变动（条数或最后日期不同）时按当前历史重建
+        if history is None:
+            return None
+        with self.lock:
+            live = self.histories.get(code)
+        if live is None or live.length != len(history) or \
+                (live.length > 0 and live.last_date != history['datetime'].values[-1]):
+            live = LiveBarHistory(history)
+            with self.lock:
+                self.histories[code] = live
+        return live
+
+    def update(self, code: str, history: pd.DataFrame, quote: dict, curr_date: str) -> Optional[pd.DataFrame]:
+        live = self.get(code, history)
+        return None if live is None else live.update(quote, curr_date)
+
+    def __len__(self) -> int:
+        return len(self.histories)
+
+
+live_bar_cache: Optional[LiveBarCache] = None
+
+
+def get_live_bar_cache() -> LiveBarCache:
+    global live_bar_cache
+    if live_bar_cache is None:
+        live_bar_cache = LiveBarCache()
+    return live_bar_cache
@@ -1,7 +1,10 @@
 import threading
 import pandas as pd
 
-from xtquant import xtdata
+try:
+    from xtquant import xtdata
+except ImportError:
+    xtdata = None   # 非 Windows 环境没有 xtquant
 from tools.constants import *
 
 
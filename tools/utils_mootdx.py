@@ -4,17 +4,22 @@ import io
 import datetime
 import json
 import time
+import queue
+import socket
 import zipfile
+import threading
 import numpy as np
 import pandas as pd
 
-from typing import Optional
+from typing import Callable, Optional
+from concurrent.futures import ThreadPoolExecutor
 
 from tdxpy.constants import SECURITY_EXCHANGE
 from tdxpy.reader import TdxDailyBarReader
 
 from tools.constants import ExitRight
 from tools.utils_basic import code_to_sina_symbol, symbol_to_code, code_to_symbol
+from tools.utils_governor import RequestSource, RequestGovernor, SourcePolicy
 from tools.utils_cache import get_prev_trading_date_list, get_trading_date_list, get_available_stock_codes, \
                               load_pickle, save_pickle, TRADE_DAY_CACHE_PATH
 
@@ -25,29 +30,521 @@ PATH_TDX_HISTORY = f'./_cache/_daily_tdxzip/history_tdxhsj.pkl'
 PATH_TDX_XDXR = f'./_cache/_daily_tdxzip/xdxr.pkl'
 
 
-class MootdxClientInstance:
-    _instance = None
-    client = None
+# ================================================
+# 多服务器连接池
+# ================================================
 
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(MootdxClientInstance, cls).__new__(cls)
-            cls.client = None  # Initialize data as None initially
-        return cls._instance
 
-    def __init__(self):
-        if self.client is None:
-            from mootdx.quotes import Quotes
-            pd.set_option('future.no_silent_downcasting', True)
-            from credentials import TDX_FOLDER
-            if TDX_FOLDER is not None and len(TDX_FOLDER) > 0:
+MOOTDX_POOL_SIZE = 4            # 同时保持连接的服务器数量
+MOOTDX_PROBE_TIMEOUT = 1.0      # 测速时 TCP 连接超时秒数
+MOOTDX_PROBE_INTERVAL = 600     # 定期重新测速的间隔秒数
+MOOTDX_MAX_FAILURES = 3         # 连续失败多少次剔除该服务器
+MOOTDX_EVICT_SECONDS = 1800     # 被剔除的服务器多久之内不再使用
+
+mootdx_factory_lock = threading.Lock()  # mootdx 构造时会改写全局 BESTIP 配置
+
+
+def probe_mootdx_servers(hosts: list[tuple[str, int]], timeout: float = MOOTDX_PROBE_TIMEOUT) -> list[tuple[float, str, int]]:
+    # 并发测试各服务器的 TCP 建连耗时，返回按延迟从低到高排序的 (latency, ip, port)，连不上的不返回
+    def _probe(host: tuple[str, int]) -> Optional[tuple[float, str, int]]:
+        ip, port = host
+        t0 = time.perf_counter()
+        try:
+            with socket.create_connection((ip, port), timeout=timeout):
+                return time.perf_counter() - t0, ip, port
+        except OSError:
+            return None
+
+    if len(hosts) == 0:
+        return []
+    with ThreadPoolExecutor(max_workers=min(16, len(hosts))) as executor:
+        results = [r for r in executor.map(_probe, hosts) if r is not None]
+    return sorted(results)
+
+
+def _default_mootdx_factory(ip: str, port: int):
+    from mootdx.quotes import Quotes
+    pd.set_option('future.no_silent_downcasting', True)
+    with mootdx_factory_lock:
+        return Quotes.factory(market='std', server=(ip, port))
+
+
+class _PooledClient:
+    def __init__(self, ip: str, port: int, latency: float, client):
+        self.ip = ip
+        self.port = port
+        self.latency = latency
+        self.client = client
+        self.calls = 0
+        self.failures = 0           # 连续失败次数
+        self.evicted = False
+        self.busy = False           # 已借出，剔除时由归还的线程关闭连接
+
+    def close(self) -> None:
+        try:
+            self.client.close()
+        except Exception:
+            pass
+
+
+# tdxpy 的单个连接不是线程安全的，每个连接同一时间只借给一个线程使用
+class MootdxClientPool:
+    def __init__(
+        self,
+        size: int = MOOTDX_POOL_SIZE,
+        hosts: list[tuple[str, int]] = None,    # 默认使用 mootdx 内置的行情服务器列表
+        client_factory: Callable = None,        # (ip, port) -> client，测试时注入
+        probe_timeout: float = MOOTDX_PROBE_TIMEOUT,
+        probe_interval: float = MOOTDX_PROBE_INTERVAL,
+        max_failures: int = MOOTDX_MAX_FAILURES,
+        evict_seconds: float = MOOTDX_EVICT_SECONDS,
+    ):
+        if hosts is None:
+            from mootdx.consts import HQ_HOSTS
+            hosts = [(ip, port) for _, ip, port in HQ_HOSTS]
+
+        self.size = max(1, size)
+        self.hosts = list(hosts)
+        self.client_factory = client_factory if client_factory is not None else _default_mootdx_factory
+        self.probe_timeout = probe_timeout
+        self.probe_interval = probe_interval
+        self.max_failures = max(1, max_failures)
+        self.evict_seconds = evict_seconds
+
+        self.lock = threading.Lock()
+        self.fill_lock = threading.Lock()       # 避免并发补连接时重复连接同一台服务器
+        self.idle = queue.Queue()
+        self.members: list[_PooledClient] = []
+        self.ranking: list[tuple[float, str, int]] = []
+        self.evicted_until: dict[tuple[str, int], float] = {}
+        self.probe_time = 0.0
+        self.refreshing = False
+
+        self.refresh()
+
+    def governor_policy(self) -> SourcePolicy:
+        # 每个连接同一时间只有一个请求，总并发等于连接数
+        # 由 get_mootdx_pool() 创建全局连接池时配置一次，构造连接池本身不改全局的 Governor
+        return SourcePolicy(rate=10.0 * self.size, burst=10 * self.size, max_concurrency=self.size)
+
+    def refresh(self) -> None:
+        # 重新测速，剔除连不上的服务器，并按排名补足连接
+        ranking = probe_mootdx_servers(self.hosts, self.probe_timeout)
+        reachable = {(ip, port): latency for latency, ip, port in ranking}
+
+        with self.lock:
+            self.ranking = ranking
+            self.probe_time = time.monotonic()
+            for member in self.members:
+                if (member.ip, member.port) in reachable:
+                    member.latency = reachable[(member.ip, member.port)]
+                else:
+                    self._evict(member)
+        self._fill()
+
+    def _evict(self, member: _PooledClient) -> None:
+        # 调用方持有 self.lock
+        if member.evicted:
+            return
+        member.evicted = True
+        self.members.remove(member)
+        self.evicted_until[(member.ip, member.port)] = time.monotonic() + self.evict_seconds
+        print(f'[MOOTDX] evict server {member.ip}:{member.port}, failures: {member.failures}')
+        if not member.busy:
+            member.close()      # 空闲的连接还留在 idle 队列里，取出时会被跳过，这里直接关闭
+
+    def _fill(self) -> None:
+        with self.fill_lock:
+            while True:
+                with self.lock:
+                    if len(self.members) >= self.size:
+                        return
+                    now = time.monotonic()
+                    used = {(m.ip, m.port) for m in self.members}
+                    candidates = [(latency, ip, port) for latency, ip, port in self.ranking
+                                  if (ip, port) not in used and self.evicted_until.get((ip, port), 0) <= now]
+                if len(candidates) == 0:
+                    return
+
+                latency, ip, port = candidates[0]
                 try:
-                    self.client = Quotes.factory(market='std', tdxdir=TDX_FOLDER)
+                    client = self.client_factory(ip, port)
                 except Exception as e:
-                    print('未找到本地TDX目录，使用默认TDX数据源配置：', e)
-                    self.client = Quotes.factory(market='std')
+                    print(f'[MOOTDX] connect {ip}:{port} failed: ', e)
+                    with self.lock:
+                        self.evicted_until[(ip, port)] = time.monotonic() + self.evict_seconds
+                    continue
+
+                member = _PooledClient(ip, port, latency, client)
+                with self.lock:
+                    self.members.append(member)
+                self.idle.put(member)
+
+    def _maybe_refresh(self) -> None:
+        with self.lock:
+            if self.refreshing or time.monotonic() - self.probe_time < self.probe_interval:
+                return
+            self.refreshing = True
+
+        def _refresh():
+            try:
+                self.refresh()
+            finally:
+                with self.lock:
+                    self.refreshing = False
+
+        threading.Thread(target=_refresh, daemon=True).start()
+
+    def _checkout(self, timeout: float) -> _PooledClient:
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError('mootdx 连接池没有可用连接')
+            if len(self.members) < self.size:
+                self._fill()
+            try:
+                member = self.idle.get(timeout=min(remaining, 1.0))
+            except queue.Empty:
+                continue
+            with self.lock:
+                if member.evicted:
+                    continue
+                member.busy = True
+            return member
+
+    def _checkin(self, member: _PooledClient, success: bool) -> None:
+        with self.lock:
+            member.calls += 1
+            if success:
+                member.failures = 0
             else:
-                self.client = Quotes.factory(market='std')
+                member.failures += 1
+                if member.failures >= self.max_failures:
+                    self._evict(member)
+            evicted = member.evicted
+            member.busy = False
+
+        if evicted:
+            member.close()
+            self._fill()
+        else:
+            self.idle.put(member)
+
+    def call(self, method: str, timeout: float = 30.0, **kwargs):
+        self._maybe_refresh()
+        member = self._checkout(timeout)
+        success = False
+        try:
+            ans = RequestGovernor().call(RequestSource.MOOTDX, getattr(member.client, method), **kwargs)
+            success = True
+            return ans
+        finally:
+            self._checkin(member, success)
+
+    def map(self, method: str, kwargs_list: list[dict]) -> list:
+        # 把一批请求分发到各个连接上并行执行，保持输入顺序返回
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            return list(executor.map(lambda kwargs: self.call(method, **kwargs), kwargs_list))
+
+    def stats(self) -> list[dict]:
+        with self.lock:
+            return [{
+                'server': f'{m.ip}:{m.port}',
+                'latency': m.latency,
+                'calls': m.calls,
+                'failures': m.failures,
+            } for m in self.members]
+
+
+mootdx_client_pool: Optional[MootdxClientPool] = None
+mootdx_client_pool_lock = threading.Lock()
+
+
+def get_mootdx_pool() -> MootdxClientPool:
+    global mootdx_client_pool
+    with mootdx_client_pool_lock:
+        if mootdx_client_pool is None:
+            mootdx_client_pool = MootdxClientPool()
+            RequestGovernor().configure(RequestSource.MOOTDX, mootdx_client_pool.governor_policy())
+        return mootdx_client_pool
+
+
+# ================================================
+# 实时行情
+# ================================================
+
+
+MOOTDX_QUOTES_BATCH = 80    # TDX 服务器单次行情请求最多支持 80 只
+
+
+def mootdx_quotes_to_ticks(df: pd.DataFrame, curr_date: datetime.date = None) -> dict[str, dict]:
+    # 按列一次性把 TDX 行情表转换成 QMT 格式的 tick dict
+    if df is None or len(df) == 0:
+        return {}
+
+    # 构建股票代码（考虑market字段：0为深交所，1为上交所, 2为北交所）
+    market = df['market'].to_numpy()
+    suffix = np.where(market == 0, '.SZ', np.where(market == 1, '.SH', '.BJ'))
+    stock_codes = (df['code'].astype(str) + suffix).tolist()
+
+    # servertime 形如 9:30:03.153，转换为当天的毫秒时间戳
+    if curr_date is None:
+        curr_date = datetime.date.today()
+    midnight_ms = int(datetime.datetime.combine(curr_date, datetime.time.min).timestamp() * 1000)
+    hms = df['servertime'].astype(str).str.split(':', expand=True)
+    if hms.shape[1] == 3:
+        seconds = pd.to_numeric(hms[0], errors='coerce') * 3600 \
+            + pd.to_numeric(hms[1], errors='coerce') * 60 \
+            + pd.to_numeric(hms[2], errors='coerce')
+    else:
+        seconds = pd.Series(np.nan, index=df.index)
+    now_ms = int(datetime.datetime.now().timestamp() * 1000)
+    timestamps = (midnight_ms + (seconds * 1000).round()).fillna(now_ms).astype(np.int64).tolist()
+
+    last_price = df['price'].tolist()
+    open_price = df['open'].tolist()
+    high_price = df['high'].tolist()
+    low_price = df['low'].tolist()
+    last_close = df['last_close'].tolist()
+    amount = df['amount'].tolist()
+    volume = df['vol'].tolist()
+    pvolume = (df['vol'] * 100).tolist()  # 手转股
+    ask_price = df[[f'ask{i + 1}' for i in range(5)]].to_numpy().tolist()
+    bid_price = df[[f'bid{i + 1}' for i in range(5)]].to_numpy().tolist()
+    ask_vol = df[[f'ask_vol{i + 1}' for i in range(5)]].to_numpy().tolist()
+    bid_vol = df[[f'bid_vol{i + 1}' for i in range(5)]].to_numpy().tolist()
+
+    result = {}
+    for i, stock_code in enumerate(stock_codes):
+        result[stock_code] = {
+            'time': timestamps[i],
+            'lastPrice': last_price[i],
+            'open': open_price[i],
+            'high': high_price[i],
+            'low': low_price[i],
+            'lastClose': last_close[i],
+            'amount': amount[i],
+            'volume': volume[i],
+            'pvolume': pvolume[i],
+            # 'stockStatus': 0,
+            # 'openInt': 0,
+            # 'transactionNum': 0,
+            # 'lastSettlementPrice': 0.0,
+            # 'settlementPrice': 0.0,
+            # 'pe': 0.0,
+            'askPrice': ask_price[i],
+            'bidPrice': bid_price[i],
+            'askVol': ask_vol[i],
+            'bidVol': bid_vol[i],
+            # 'volRatio': 0.0,
+            # 'speed1Min': 0.0,
+            # 'speed5Min': 0.0
+        }
+    return result
+
+
+def get_mootdx_quotes_frame(code_list: list[str]) -> Optional[pd.DataFrame]:
+    # 按服务器单次上限拆分，各批次通过连接池并发请求，失败的批次跳过
+    if code_list is None or len(code_list) == 0:
+        return None
+
+    symbol_list = [code.split('.')[0] for code in code_list]
+    batches = [symbol_list[i:i + MOOTDX_QUOTES_BATCH] for i in range(0, len(symbol_list), MOOTDX_QUOTES_BATCH)]
+    pool = get_mootdx_pool()
+
+    def _fetch(batch: list[str]) -> Optional[pd.DataFrame]:
+        try:
+            return pool.call('quotes', symbol=batch)
+        except Exception as e:
+            print(f'[MOOTDX] quotes batch {batch[0]}... error: ', e)
+            return None
+
+    if len(batches) == 1:
+        dfs = [_fetch(batches[0])]
+    else:
+        with ThreadPoolExecutor(max_workers=pool.size) as executor:
+            dfs = list(executor.map(_fetch, batches))
+
+    dfs = [df for df in dfs if df is not None and len(df) > 0]
+    if len(dfs) == 0:
+        return None
+    return pd.concat(dfs, ignore_index=True)
+
+
+# ================================================
+# 盘中行情轮询：按批次流水线并发拉取，每批返回后立即整批写入快照并记录接收时间
+# 每个周期只重发上一轮已经返回的批次，慢批次不会拖住其他批次，也不会在连接池里堆积请求
+# ================================================
+
+
+MOOTDX_POLL_PERIOD = 1.0
+
+
+def _fetch_mootdx_ticks(code_list: list[str]) -> dict[str, dict]:
+    df = get_mootdx_pool().call('quotes', symbol=[code.split('.')[0] for code in code_list])
+    return mootdx_quotes_to_ticks(df)
+
+
+class MootdxQuotePoller:
+    def __init__(
+        self,
+        code_list: list[str] = None,
+        period: float = MOOTDX_POLL_PERIOD,
+        batch_size: int = MOOTDX_QUOTES_BATCH,
+        workers: int = None,                    # 默认与连接池大小一致
+        fetch: Callable = None,                 # fetch(code_list) -> {code: tick}，默认走连接池
+    ):
+        self.period = period
+        self.batch_size = batch_size
+        self.workers = workers
+        self.fetch = _fetch_mootdx_ticks if fetch is None else fetch
+
+        self.lock = threading.Lock()
+        self.batches: list[tuple[str, ...]] = []
+        self.quotes: dict[str, dict] = {}
+        self.received: dict[str, int] = {}      # 每只票最近一次所在批次的接收时间（毫秒）
+        self.inflight: set[tuple[str, ...]] = set()
+        self.set_codes(code_list or [])
+
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.thread: Optional[threading.Thread] = None
+        self.stopped = threading.Event()
+
+        self.cycle = 0
+        self.cycle_done: dict[int, list] = {}   # 周期号 -> [返回批次数, 返回代码数, 失败批次数]
+        self.last_stats: dict = {}
+        self.cycles = 0
+        self.slow_cycles = 0                    # 周期结束时还有批次没返回
+        self.failed = 0
+        self.completeness_min = 1.0
+        self.age_max = 0
+
+    def set_codes(self, code_list: list[str]) -> None:
+        codes = list(dict.fromkeys(code_list))
+        with self.lock:
+            self.batches = [tuple(codes[i:i + self.batch_size]) for i in range(0, len(codes), self.batch_size)]
+            keep = set(codes)
+            self.quotes = {code: quote for code, quote in self.quotes.items() if code in keep}
+            self.received = {code: ms for code, ms in self.received.items() if code in keep}
+
+    def clear(self) -> None:
+        with self.lock:
+            self.quotes = {}
+            self.received = {}
+
+    def _poll_batch(self, batch: tuple[str, ...], cycle: int) -> None:
+        try:
+            ticks = self.fetch(list(batch))
+            error = None
+        except Exception as e:
+            ticks = {}
+            error = e
+        received_ms = int(time.time() * 1000)
+
+        # 整批替换，快照里不会出现同一批内一半新一半旧
+        with self.lock:
+            self.inflight.discard(batch)
+            if error is None and len(ticks) > 0:
+                self.quotes.update(ticks)
+                for code in ticks:
+                    self.received[code] = received_ms
+            done = self.cycle_done.get(cycle)
+            if done is not None:
+                done[0] += 1
+                done[1] += len(ticks)
+                done[2] += error is not None
+        if error is not None:
+            print(f'[MOOTDX] poll batch {batch[0]}... error: ', error)
+
+    def poll_once(self) -> int:
+        # 发出一个周期的请求，返回本周期实际发出的批次数
+        if self.executor is None:
+            workers = get_mootdx_pool().size if self.workers is None else self.workers
+            self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='mootdx_poll')
+        with self.lock:
+            self.cycle += 1
+            cycle = self.cycle
+            self.cycle_done[cycle] = [0, 0, 0]
+            todo = [batch for batch in self.batches if batch not in self.inflight]
+            self.inflight.update(todo)
+        for batch in todo:
+            self.executor.submit(self._poll_batch, batch, cycle)
+        return len(todo)
+
+    def finish_cycle(self, sent: int) -> dict:
+        # 周期结束时统计本周期按时返回的比例和快照的新旧程度
+        now_ms = int(time.time() * 1000)
+        with self.lock:
+            returned, codes, failed = self.cycle_done.pop(self.cycle, [0, 0, 0])
+            total = sum(len(batch) for batch in self.batches)
+            ages = [now_ms - self.received[code] for batch in self.batches for code in batch if code in self.received]
+            inflight = len(self.inflight)
+
+        stats = {
+            'cycle': self.cycle,
+            'batches': len(self.batches),
+            'sent': sent,
+            'returned': returned,
+            'failed': failed,
+            'inflight': inflight,
+            'completeness': codes / total if total > 0 else 1.0,
+            'age_avg': sum(ages) // len(ages) if len(ages) > 0 else 0,
+            'age_max': max(ages, default=0),
+            'missing': total - len(ages),
+        }
+        self.last_stats = stats
+        self.cycles += 1
+        self.slow_cycles += inflight > 0
+        self.failed += failed
+        self.completeness_min = min(self.completeness_min, stats['completeness'])
+        self.age_max = max(self.age_max, stats['age_max'])
+        return stats
+
+    def run(self) -> None:
+        deadline = time.monotonic()
+        while not self.stopped.is_set():
+            sent = self.poll_once()
+            deadline += self.period
+            if self.stopped.wait(max(0.0, deadline - time.monotonic())):
+                return
+            self.finish_cycle(sent)
+            if deadline < time.monotonic():
+                deadline = time.monotonic()     # 落后的周期不补
+
+    def start(self) -> None:
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self.run, name='mootdx_poller', daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout: float = None) -> None:
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+            self.thread = None
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+        with self.lock:
+            self.inflight.clear()
+            self.cycle_done.clear()
+
+    def snapshot(self) -> dict[str, dict]:
+        # 浅拷贝当前快照，单只票的 tick 每次都是新 dict，不会被后续批次改写
+        with self.lock:
+            return dict(self.quotes)
+
+    def get_received_ms(self, code: str) -> int:
+        with self.lock:
+            return self.received.get(code, 0)
+
+    def summary(self) -> str:
+        s = self.last_stats
+        return f'[mootdx poll] cycles:{self.cycles} slow:{self.slow_cycles} failed:{self.failed} ' \
+               f'completeness last:{s.get("completeness", 0.0):.0%} min:{self.completeness_min:.0%} ' \
+               f'age last:{s.get("age_max", 0)}ms max:{self.age_max}ms'
 
 
 class MootdxDailyBarReaderInstance:
@@ -260,7 +757,31 @@ def make_hfq(bfq_data, xdxr_data):
     ], axis=1)
 
 
-def _get_offset_start(csv_path: str, start_date_str: str, end_date_str: str) -> tuple[int, int]:
+# 交易日历常驻内存，文件更新后自动重新加载
+trade_dates_cache: dict[str, tuple[float, pd.Series]] = {}
+trade_dates_cache_lock = threading.Lock()
+
+
+def _load_trade_dates(csv_path: str) -> pd.Series:
+    mtime = os.path.getmtime(csv_path)
+    with trade_dates_cache_lock:
+        if csv_path in trade_dates_cache and trade_dates_cache[csv_path][0] == mtime:
+            return trade_dates_cache[csv_path][1]
+
+    df = pd.read_csv(csv_path)
+    df["trade_date"] = pd.to_datetime(df["trade_date"]).dt.date  # 仅保留日期部分（避免时间干扰）
+    trade_dates = df["trade_date"].drop_duplicates().sort_values().reset_index(drop=True)
+    with trade_dates_cache_lock:
+        trade_dates_cache[csv_path] = (mtime, trade_dates)
+    return trade_dates
+
+
+def _get_offset_start(
+    csv_path: str,
+    start_date_str: str,
+    end_date_str: str,
+    now: datetime.datetime = None,
+) -> tuple[int, int]:
     """
     计算两个日期区间的交易日数（含首尾），及end到今天的交易日数（不含end）
 
@@ -272,35 +793,33 @@ def _get_offset_start(csv_path: str, start_date_str: str, end_date_str: str) ->
     返回：
     tuple - (start到end的交易日数, end到今天的交易日数)
     """
-    # 1. 读取并预处理交易日数据（确保排序、去重）
-    df = pd.read_csv(csv_path)
-    df["trade_date"] = pd.to_datetime(df["trade_date"]).dt.date  # 仅保留日期部分（避免时间干扰）
-    trade_dates = df["trade_date"].drop_duplicates().sort_values().reset_index(drop=True)
+    # 1. 读取交易日数据（内存缓存，已排序去重）
+    trade_dates = _load_trade_dates(csv_path)
     if trade_dates.empty:
         return 0, 0  # 无交易日数据时返回0
 
-    # 2. 工具函数：调整日期为目标方向的最近交易日
-    def adjust_date(target_date, direction):
+    # 2. 工具函数：调整日期为目标方向的最近交易日的索引
+    def adjust_index(target_date, direction) -> Optional[int]:
         """
         direction: 'next'（start专用：取>=target的最近交易日）
                   'prev'（end/今天专用：取<=target的最近交易日）
         """
         # 超出交易日范围时返回无效标记
-        if target_date < trade_dates.min():
-            return trade_dates.min() if direction == 'next' else None
-        if target_date > trade_dates.max():
-            return None if direction == 'next' else trade_dates.max()
+        if target_date < trade_dates.iloc[0]:
+            return 0 if direction == 'next' else None
+        if target_date > trade_dates.iloc[-1]:
+            return None if direction == 'next' else len(trade_dates) - 1
 
         # 二分查找快速定位索引
         if direction == 'next':
-            idx = trade_dates.searchsorted(target_date, side="left")
-            return trade_dates.iloc[idx]
+            return int(trade_dates.searchsorted(target_date, side="left"))
         else:
-            idx = trade_dates.searchsorted(target_date, side="right") - 1
-            return trade_dates.iloc[idx] if idx >= 0 else None
+            idx = int(trade_dates.searchsorted(target_date, side="right")) - 1
+            return idx if idx >= 0 else None
 
     # 3. 解析输入日期（转为date类型，与trade_dates格式统一）
-    now = datetime.datetime.now()
+    if now is None:
+        now = datetime.datetime.now()
     curr_date = now.date()  # 今天的日期（仅日期部分）
     try:
         today_str = curr_date.strftime("%Y%m%d")
@@ -310,29 +829,26 @@ def _get_offset_start(csv_path: str, start_date_str: str, end_date_str: str) ->
         return 0, 0  # 日期格式错误返回0
 
     # ---------------------- 4. 计算：start到end的交易日数（含首尾） ----------------------
-    adjusted_start = adjust_date(start_date, direction="next")  # start非交易日则取后一个
-    adjusted_end = adjust_date(end_date, direction="prev")      # end非交易日则取前一个
+    idx_start = adjust_index(start_date, direction="next")  # start非交易日则取后一个
+    idx_end = adjust_index(end_date, direction="prev")      # end非交易日则取前一个
 
     days_between = 0
-    if adjusted_start is not None and adjusted_end is not None and adjusted_start <= adjusted_end:
+    if idx_start is not None and idx_end is not None and idx_start <= idx_end:
         # 索引差 +1 = 含首尾的总天数（如16日索引0、17日1、18日2：2-0+1=3）
-        idx_start = trade_dates[trade_dates == adjusted_start].index[0]
-        idx_end = trade_dates[trade_dates == adjusted_end].index[0]
         days_between = idx_end - idx_start + 1
 
     # ---------------------- 5. 计算：end到今天的交易日数（不含end） ----------------------
 
-    adjusted_today = adjust_date(curr_date, direction="prev")  # 今天非交易日则取前一个
+    idx_today = adjust_index(curr_date, direction="prev")  # 今天非交易日则取前一个
 
     days_from_end_to_today = 0
-    if adjusted_end is not None and adjusted_today is not None and adjusted_end < adjusted_today:
+    if idx_end is not None and idx_today is not None and idx_end < idx_today:
         # 索引差 = 不含end的天数（如18日索引2、19日3：3-2=1）
-        idx_adjusted_end = trade_dates[trade_dates == adjusted_end].index[0]
-        idx_today = trade_dates[trade_dates == adjusted_today].index[0]
-        days_from_end_to_today = idx_today - idx_adjusted_end
+        days_from_end_to_today = idx_today - idx_end
 
     # 早上有当日的daily的K线之前要少向前推一天
-    if trade_dates.isin([curr_date]).any() and now.time() < datetime.time(9, 30):
+    is_today_open = idx_today is not None and trade_dates.iloc[idx_today] == curr_date
+    if is_today_open and now.time() < datetime.time(9, 30):
         if days_from_end_to_today > 0:
             days_between += 1
             days_from_end_to_today -= 1
@@ -342,52 +858,77 @@ def _get_offset_start(csv_path: str, start_date_str: str, end_date_str: str) ->
     return days_between, days_from_end_to_today
 
 
-def _get_bars_with_offset(client, symbol, total_offset, start=0):
-    all_dfs = []
-    remaining = total_offset
-    current_start = start
-    batch_size = 800  # 每次最大获取数量
-    datetime_col = 'datetime'  # 假设时间列名为'datetime'，根据实际情况调整
+MOOTDX_BARS_PAGE = 800  # 每次最大获取数量
 
-    while remaining > 0:
-        fetch_count = min(remaining, batch_size)
 
-        try:
-            df = client.bars(
-                symbol=symbol,
-                frequency='day',
-                offset=fetch_count,
-                start=current_start,
-            )
+def _plan_bar_pages(total_offset: int, start: int = 0, page_size: int = MOOTDX_BARS_PAGE) -> list[tuple[int, int]]:
+    # 预先算好所有分页的 (start, count)，start=0 为最新一根
+    return [(page_start, min(page_size, start + total_offset - page_start))
+            for page_start in range(start, start + total_offset, page_size)]
 
-            if df is None or df.empty:
-                break  # 没有更多数据
 
-            # 检查是否存在时间列，避免后续排序出错
-            if datetime_col not in df.columns:
-                print(f"Error: 数据中缺少'{datetime_col}'列，无法排序")
-                return None
+def _get_bars_with_offset(pool: MootdxClientPool, symbol, total_offset, start=0):
+    datetime_col = 'datetime'  # 假设时间列名为'datetime'，根据实际情况调整
+    pages = _plan_bar_pages(total_offset, start)
+    if len(pages) == 0:
+        return None
 
-            all_dfs.append(df)
-            remaining -= fetch_count
-            current_start += fetch_count  # 移动到下一批的起始位置
+    def _fetch(page: tuple[int, int]) -> Optional[pd.DataFrame]:
+        page_start, page_count = page
+        return pool.call('bars', symbol=symbol, frequency='day', offset=page_count, start=page_start)
 
+    # 所有分页一次性并发请求，长历史也只需要大约一个来回
+    results = []
+    if len(pages) == 1:
+        try:
+            results.append(_fetch(pages[0]))
         except Exception as e:
             print(f'mootdx get daily {symbol} error: ', e)
-            if all_dfs:
-                combined = pd.concat(all_dfs, ignore_index=True).iloc[:total_offset]
-                return combined.sort_values(by=datetime_col, ascending=True).reset_index(drop=True)
+            results.append(e)
+    else:
+        with ThreadPoolExecutor(max_workers=min(len(pages), pool.size)) as executor:
+            futures = [executor.submit(_fetch, page) for page in pages]
+            for future in futures:
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    print(f'mootdx get daily {symbol} error: ', e)
+                    results.append(e)
+
+    # 从最新一页往前拼接，遇到失败、空页或不满页就停止，保证结果是连续的
+    all_dfs = []
+    for (page_start, page_count), df in zip(pages, results):
+        if isinstance(df, Exception) or df is None or df.empty:
+            break  # 没有更多数据，或者这一页失败了只保留之前连续的部分
+
+        # 检查是否存在时间列，避免后续排序出错
+        if datetime_col not in df.columns:
+            print(f"Error: 数据中缺少'{datetime_col}'列，无法排序")
             return None
 
+        all_dfs.append(df)
+        if len(df) < page_count:
+            break  # 已经取到上市第一天
+
     if not all_dfs:
         return None
 
     # 合并所有数据并截取总数量
     combined_df = pd.concat(all_dfs, ignore_index=True).iloc[:total_offset]
 
-    # 按datetime列从大到小排序（最新时间在前）
     # 若时间列已转为datetime类型，排序会更准确
     combined_df[datetime_col] = pd.to_datetime(combined_df[datetime_col])  # 确保是datetime类型
+
+    # 相邻分页边界重叠时去重，边界之间有缺口时提示
+    duplicated = combined_df[datetime_col].duplicated(keep='first')
+    if duplicated.any():
+        print(f'[MOOTDX] {symbol} drop {duplicated.sum()} duplicated bars between pages')
+        combined_df = combined_df[~duplicated]
+    for newer, older in zip(all_dfs[:-1], all_dfs[1:]):
+        if pd.to_datetime(older[datetime_col]).max() > pd.to_datetime(newer[datetime_col]).min():
+            print(f'[MOOTDX] {symbol} pages out of order, check server data')
+
+    # 按datetime列从小到大排序（最新时间在后）
     combined_df = combined_df.sort_values(by=datetime_col, ascending=True).reset_index(drop=True)
 
     return combined_df
@@ -406,8 +947,7 @@ def _get_xdxr(symbol: str, cache_dir: str = DEFAULT_XDXR_CACHE_PATH, expire_hour
             return pd.read_csv(cache_file)
 
     try:
-        client = MootdxClientInstance().client
-        xdxr_data = client.xdxr(symbol=symbol)
+        xdxr_data = get_mootdx_pool().call('xdxr', symbol=symbol)
         if xdxr_data is not None and isinstance(xdxr_data, pd.DataFrame):
             xdxr_data.to_csv(cache_file, index=False)
 
@@ -429,9 +969,8 @@ def get_mootdx_daily_history(
     offset, start = _get_offset_start(TRADE_DAY_CACHE_PATH, start_date, end_date)
     symbol = code_to_symbol(code)
 
-    client = MootdxClientInstance().client
     try:
-        df = _get_bars_with_offset(client, symbol, offset, start)
+        df = _get_bars_with_offset(get_mootdx_pool(), symbol, offset, start)
         # TODO_List: 对于有些期间停牌过的票，发现时间对不上这里要校正，优先级不高因为只会多不会少
     except Exception as e:
         print(f' mootdx get daily {code} error: ', e)
@@ -496,7 +1035,7 @@ def get_mootdx_daily_history(
 
 
 def _get_xdxr_sina(code: str, adjust: ExitRight, factor_name: str = None) -> pd.DataFrame:
-    xdxr = MootdxClientInstance().client.xdxr(symbol=code_to_symbol(code))
+    xdxr = get_mootdx_pool().call('xdxr', symbol=code_to_symbol(code))
     if xdxr is not None and len(xdxr) > 0:
         xdxr['date_str'] = xdxr['year'].astype(str) + \
                            '-' + xdxr['month'].astype(str).str.zfill(2) + \
@@ -530,7 +1069,7 @@ def _fq_factor(code: str, method: str, ) -> pd.DataFrame:
         }
         try:
             url = "https://finance.sina.com.cn/realstock/company/{}/{}.js"
-            rsp = httpx.get(url.format(symbol, method), headers=headers)
+            rsp = RequestGovernor().call(RequestSource.SINA, httpx.get, url.format(symbol, method), headers=headers)
             res = pd.DataFrame(eval(rsp.text.split("=")[1].split("\n")[0])["data"])
         except (SyntaxError, httpx.ConnectError) as ex:
             logging.error(ex)
@@ -543,7 +1082,6 @@ def _fq_factor(code: str, method: str, ) -> pd.DataFrame:
         res.date = pd.to_datetime(res.date)
 
         res.set_index("date", inplace=True)
-        time.sleep(0.3)
         return res
 
     return _factor(symbol, method)
@@ -885,7 +1423,7 @@ def _get_stock_dividend(headers: dict, start_date: str, page: int = 0) -> pd.Dat
     try:
         url = f"https://finance.pae.baidu.com/sapi/v1/financecalendar?start_date={start_date}&end_date={start_date}&market=ab&pn={page}&rn=100&cate=notify_divide&finClientType=pc"
         headers.update({'Accept': 'application/vnd.finance-web.v1+json'})
-        status_code, content = _pycurl_request(url, headers=headers)
+        status_code, content = RequestGovernor().call(RequestSource.BAIDU, _pycurl_request, url, headers=headers)
         if status_code != 200:
             raise Exception(f'百度股市通接口异常，返回HTTP 状态码为{status_code}')
             # return divi_df, divi_count, has_more
@@ -942,7 +1480,6 @@ def get_dividend_code_from_baidu(date: str = "20241107") -> (pd.DataFrame, int):
         if not has_more:
             return pd.concat(res_df, ignore_index=True), divi_count
         page += 1
-        time.sleep(0.5)
 
     # TODO miss return?
 
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+from typing import Dict, Optional
+
+
+# ================================================
+# 全市场日线面板：把 cache_history 里每只票的 DataFrame 拼成 代码 × K线 的二维数组，供选股公式批量计算
+# 各票按最后一根 K 线靠右对齐，历史较短的左侧补 NAN，lengths 记录每只票实际的 K 线数
+# ================================================
+
+
+PANEL_COLUMNS = ['open', 'high', 'low', 'close', 'volume', 'amount']
+
+
+class HistoryPanel:
+    def __init__(self, codes: list[str], arrays: Dict[str, np.ndarray], lengths: np.ndarray, bars: int):
+        self.codes = codes
+        self.bars = bars
+        self.arrays = arrays
+        self.lengths = lengths
+        self.code_index = {code: i for i, code in enumerate(codes)}
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.arrays[column]
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def valid_mask(self) -> np.ndarray:
+        # 每只票真实数据所在的位置
+        return np.arange(self.bars)[None, :] >= (self.bars - self.lengths)[:, None]
+
+    def last_passed(self, result: np.ndarray) -> Dict[str, bool]:
+        # 批量公式结果取最后一根 K 线，没有数据的票视为不通过
+        if self.bars == 0:
+            return {code: False for code in self.codes}
+        last = np.asarray(result, dtype=bool)[:, -1] & (self.lengths > 0)
+        return {code: bool(passed) for code, passed in zip(self.codes, last)}
+
+
+def build_history_panel(
+    cache_history: Dict[str, pd.DataFrame],
+    codes: Optional[list[str]] = None,
+    columns: Optional[list[str]] = None,
+    bars: Optional[int] = None,             # 只取最后 bars 根，默认取最长的历史
+) -> HistoryPanel:
+    codes = [code for code in (cache_history.keys() if codes is None else codes) if code in cache_history]
+    columns = PANEL_COLUMNS if columns is None else columns
+    histories = [cache_history[code] for code in codes]
+
+    lengths = np.array([len(df) for df in histories], dtype=np.int64)
+    width = int(lengths.max(initial=0)) if bars is None else bars
+    lengths = np.minimum(lengths, width)
+
+    arrays = {column: np.full((len(codes), width), np.nan) for column in columns}
+    for i, df in enumerate(histories):
+        n = lengths[i]
+        if n == 0:
+            continue
+        for column in columns:
+            if column in df.columns:
+                arrays[column][i, width - n:] = df[column].to_numpy(dtype=np.float64)[-n:]
+    return HistoryPanel(codes, arrays, lengths, width)
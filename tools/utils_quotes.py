@@ -0,0 +1,119 @@
+import numpy as np
+
+from typing import Dict, Optional
+
+
+# 全市场实时行情矩阵：每只票一行，每个字段一列，每批回调原地更新，方便策略做向量化的横截面筛选
+QUOTE_FIELDS = [
+    'time', 'lastPrice', 'open', 'high', 'low', 'lastClose', 'volume', 'amount',
+    'bidPrice1', 'bidVol1', 'askPrice1', 'askVol1',
+]
+QUOTE_FIELD_INDEX = {field: i for i, field in enumerate(QUOTE_FIELDS)}
+
+
+def _first_level(values: list) -> float:
+    if values is None or len(values) == 0:
+        return 0.0
+    return values[0]
+
+
+# 判断行情是否变动的字段，盘口变化也算变动
+QUOTE_CHANGE_FIELDS = ['lastPrice', 'volume', 'bidPrice', 'askPrice', 'bidVol', 'askVol']
+
+
+def get_changed_codes(prev_quotes: Dict[str, dict], quotes: Dict[str, dict]) -> list[str]:
+    # 相对上一份缓存有变化的代码，没有缓存过的代码都算变动
+    ans = []
+    for code, quote in quotes.items():
+        prev = prev_quotes.get(code)
+        if prev is None or any(prev.get(field) != quote.get(field) for field in QUOTE_CHANGE_FIELDS):
+            ans.append(code)
+    return ans
+
+
+class QuoteMatrix:
+    def __init__(self, init_codes: int = 1024):
+        self.code_index: Dict[str, int] = {}
+        self.codes: list[str] = []
+        # 只在 update / clear 里写入，策略拿到的都是只读视图
+        self._data = np.full((max(1, init_codes), len(QUOTE_FIELDS)), np.nan)
+
+    def _row(self, code: str) -> int:
+        if code not in self.code_index:
+            if len(self.codes) >= len(self._data):
+                grown = np.full((len(self._data) * 2, len(QUOTE_FIELDS)), np.nan)
+                grown[:len(self._data)] = self._data
+                self._data = grown
+            self.code_index[code] = len(self.codes)
+            self.codes.append(code)
+        return self.code_index[code]
+
+    def update(self, quotes: Dict[str, dict]) -> None:
+        if len(quotes) == 0:
+            return
+        rows = [self._row(code) for code in quotes]
+        self._data[rows] = [[
+            quote['time'],
+            quote['lastPrice'],
+            quote['open'],
+            quote['high'],
+            quote['low'],
+            quote['lastClose'],
+            quote['volume'],
+            quote['amount'],
+            _first_level(quote.get('bidPrice')),
+            _first_level(quote.get('bidVol')),
+            _first_level(quote.get('askPrice')),
+            _first_level(quote.get('askVol')),
+        ] for quote in quotes.values()]
+
+    def clear(self) -> None:
+        self.code_index.clear()
+        self.codes.clear()
+        self._data[:] = np.nan
+
+    def snapshot(self) -> 'QuoteMatrix':
+        # 拷贝一份给其他线程使用，之后的更新不会影响这份数据
+        ans = QuoteMatrix.__new__(QuoteMatrix)
+        ans.code_index = dict(self.code_index)
+        ans.codes = list(self.codes)
+        ans._data = self._data[:len(self.codes)].copy()
+        return ans
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __contains__(self, code: str) -> bool:
+        return code in self.code_index
+
+    @property
+    def data(self) -> np.ndarray:
+        return self.view()
+
+    def view(self) -> np.ndarray:
+        # 只读视图，行顺序与 codes 一致
+        ans = self._data[:len(self.codes)].view()
+        ans.flags.writeable = False
+        return ans
+
+    def column(self, field: str) -> np.ndarray:
+        ans = self._data[:len(self.codes), QUOTE_FIELD_INDEX[field]]
+        ans.flags.writeable = False
+        return ans
+
+    def rows_of(self, codes: list[str]) -> np.ndarray:
+        # 股票池对应的行号，不在矩阵里的忽略
+        return np.array([self.code_index[code] for code in codes if code in self.code_index], dtype=np.int64)
+
+    def change_pct(self) -> np.ndarray:
+        # 涨跌幅（%），昨收无效时为 nan
+        last_close = self.column('lastClose')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(last_close > 0, (self.column('lastPrice') / last_close - 1) * 100, np.nan)
+
+    def top_gainers(self, n: int, codes: Optional[list[str]] = None) -> list[str]:
+        pct = self.change_pct()
+        rows = np.arange(len(self.codes)) if codes is None else self.rows_of(codes)
+        rows = rows[~np.isnan(pct[rows])]
+        order = rows[np.argsort(-pct[rows], kind='stable')[:n]]
+        return [self.codes[i] for i in order]
@@ -6,8 +6,10 @@ from typing import Optional
 
 from tools.constants import DataSource, ExitRight, DEFAULT_DAILY_COLUMNS
 from tools.utils_basic import *
+from tools.utils_governor import RequestSource, RequestGovernor
 from tools.utils_miniqmt import get_qmt_daily_history
-from tools.utils_mootdx import MootdxClientInstance, get_mootdx_daily_history
+from tools.utils_mootdx import get_mootdx_pool, get_mootdx_daily_history, get_mootdx_quotes_frame, \
+    mootdx_quotes_to_ticks
 
 
 def set_tdx_zxg_code(data: list[str], file_name: str = None) -> None:
@@ -53,56 +55,7 @@ def get_tdx_zxg_code(file_name: str = None) -> list[str]:
 def get_mootdx_quotes(code_list: list[str]) -> dict[str, any]:
     if code_list is None or len(code_list) == 0:
         return {}
-
-    symbol_list = [code.split('.')[0] for code in code_list]
-
-    mootdx_client = MootdxClientInstance().client
-    df = mootdx_client.quotes(symbol=symbol_list)
-
-    result = {}
-    for _, row in df.iterrows():
-        # 构建股票代码（考虑market字段：0为深交所，1为上交所, 2为北交所）
-        market_suffix = '.SZ' if row['market'] == 0 else ('.SH' if row['market'] == 1 else '.BJ')
-        stock_code = f"{row['code']}{market_suffix}"
-
-        time_str = row['servertime']    # 转换servertime为毫秒时间戳
-        date_str = datetime.datetime.today().strftime('%Y-%m-%d')
-
-        datetime_obj = datetime.datetime.strptime(f"{date_str} {time_str}", '%Y-%m-%d %H:%M:%S.%f')
-        timestamp_ms = int(datetime_obj.timestamp() * 1000)
-
-        ask_price = [row[f'ask{i + 1}'] for i in range(5)]
-        bid_price = [row[f'bid{i + 1}'] for i in range(5)]
-        ask_vol = [row[f'ask_vol{i + 1}'] for i in range(5)]
-        bid_vol = [row[f'bid_vol{i + 1}'] for i in range(5)]
-
-        stock_data = {
-            'time': timestamp_ms,
-            'lastPrice': row['price'],
-            'open': row['open'],
-            'high': row['high'],
-            'low': row['low'],
-            'lastClose': row['last_close'],
-            'amount': row['amount'],
-            'volume': row['vol'],
-            'pvolume': row['vol'] * 100,  # 手转股
-            # 'stockStatus': 0,
-            # 'openInt': 0,
-            # 'transactionNum': 0,
-            # 'lastSettlementPrice': 0.0,
-            # 'settlementPrice': 0.0,
-            # 'pe': 0.0,
-            'askPrice': ask_price,
-            'bidPrice': bid_price,
-            'askVol': ask_vol,
-            'bidVol': bid_vol,
-            # 'volRatio': 0.0,
-            # 'speed1Min': 0.0,
-            # 'speed5Min': 0.0
-        }
-        result[stock_code] = stock_data
-
-    return result
+    return mootdx_quotes_to_ticks(get_mootdx_quotes_frame(code_list))
 
 
 # ================
@@ -114,7 +67,7 @@ def get_wencai_codes(queries: list[str]) -> list[str]:
     import pywencai
     result = set()
     for query in queries:
-        df = pywencai.get(query=query, perpage=100, loop=True)
+        df = RequestGovernor().call(RequestSource.WENCAI, pywencai.get, query=query, perpage=100, loop=True)
         if df is not None and type(df) != dict and df.shape[0] > 0:
             result.update(df['股票代码'].values)
     return list(result)
@@ -327,7 +280,9 @@ def get_ak_daily_history(
             #     df['datetime'] = df['datetime'].astype(int)
 
             # 换成新浪的替代
-            df = ak.stock_zh_a_daily(
+            df = RequestGovernor().call(
+                RequestSource.SINA,
+                ak.stock_zh_a_daily,
                 symbol=code_to_sina_symbol(code),
                 start_date=start_date,
                 end_date=end_date,
@@ -337,7 +292,9 @@ def get_ak_daily_history(
             df = df.dropna(subset=['date']).copy()
             df['datetime'] = df['date'].dt.strftime('%Y%m%d').astype(int)
         elif is_fund_etf(code):
-            df = ak.fund_etf_hist_em(
+            df = RequestGovernor().call(
+                RequestSource.EASTMONEY,
+                ak.fund_etf_hist_em,
                 symbol=code_to_symbol(code),
                 start_date=start_date,
                 end_date=end_date,
@@ -399,7 +356,8 @@ def get_ts_daily_history(
     if not is_stock(code):
         return None
 
-    from reader.tushare_agent import get_tushare_pro
+    from reader.tushare_agent import get_tushare_pool
+    pool = get_tushare_pool()
     try_times = 0
     df = None
     while (df is None or len(df) <= 0) and try_times < 3:
@@ -410,13 +368,10 @@ def get_ts_daily_history(
             warnings.filterwarnings('ignore', category=FutureWarning,
                 message=".*Series.fillna with 'method' is deprecated.*")  # 用.*匹配任意字符，关掉tushare内部warning
 
-            import tushare as ts
-            _ = get_tushare_pro()
-            df = ts.pro_bar(ts_code=code, start_date=start_date, end_date=end_date, adj=adjust)
+            df = pool.pro_bar(ts_code=code, start_date=start_date, end_date=end_date, adj=adjust)
             df = df.drop_duplicates() if df is not None and len(df) > 0 else df
         else:
-            pro = get_tushare_pro()
-            df = pro.daily(ts_code=code, start_date=start_date, end_date=end_date)
+            df = pool.call('daily', ts_code=code, start_date=start_date, end_date=end_date)
 
     if df is not None and len(df) > 0:
         df = _ts_to_standard(df)
@@ -438,7 +393,8 @@ def get_ts_stk_daily_history(
     if not is_stock(code):
         return None
 
-    from reader.tushare_agent import get_tushare_pro
+    from reader.tushare_agent import get_tushare_pool
+    pool = get_tushare_pool()
     try_times = 0
     df = None
     while (df is None or len(df) <= 0) and try_times < 3:
@@ -449,8 +405,8 @@ def get_ts_stk_daily_history(
         else:
             suffix = f'_{adjust}'
 
-        pro = get_tushare_pro()
-        df = pro.stk_factor(
+        df = pool.call(
+            'stk_factor',
             ts_code=code,
             start_date=start_date,
             end_date=end_date,
@@ -496,7 +452,8 @@ def get_ts_daily_histories(
             print(f'存在不符合格式要求的code: {code}')
             return {}
 
-    from reader.tushare_agent import get_tushare_pro
+    from reader.tushare_agent import get_tushare_pool
+    pool = get_tushare_pool()
 
     try_times = 0
     df = None
@@ -509,13 +466,10 @@ def get_ts_daily_histories(
             warnings.filterwarnings('ignore', category=FutureWarning,
                 message=".*Series.fillna with 'method' is deprecated.*")  # 用.*匹配任意字符，关掉tushare内部warning
 
-            import tushare as ts
-            _ = get_tushare_pro()
-            df = ts.pro_bar(ts_code=','.join(codes), start_date=start_date, end_date=end_date, adj=adjust)
+            df = pool.pro_bar(ts_code=','.join(codes), start_date=start_date, end_date=end_date, adj=adjust)
             df = df.drop_duplicates() if df is not None and len(df) > 0 else df
         else:
-            pro = get_tushare_pro()
-            df = pro.daily(ts_code=','.join(codes), start_date=start_date, end_date=end_date)
+            df = pool.call('daily', ts_code=','.join(codes), start_date=start_date, end_date=end_date)
 
     ans = {}
     if df is not None and len(df) > 0:
@@ -553,3 +507,24 @@ def get_daily_history(
     else:
         # 默认使用免费的 miniqmt数据，但就是慢的一批
         return get_qmt_daily_history(code, start_date, end_date, columns, adjust)
+
+
+# 各日线数据源实际请求的上游，用来确定批量下载时可以安全使用的并发数
+DAILY_HISTORY_REQUEST_SOURCES = {
+    DataSource.AKSHARE: RequestSource.SINA,
+    DataSource.TUSHARE: RequestSource.TUSHARE,
+    DataSource.MOOTDX: RequestSource.MOOTDX,
+}
+
+
+def get_daily_history_workers(data_source: DataSource) -> int:
+    if data_source not in DAILY_HISTORY_REQUEST_SOURCES:
+        return 1
+    if data_source == DataSource.TUSHARE:
+        # 多 token 叠加额度，并发数随 token 数量增加
+        from reader.tushare_agent import get_tushare_pool
+        return get_tushare_pool().max_workers
+    if data_source == DataSource.MOOTDX:
+        # 连接池里每个连接同一时间只服务一个请求
+        return get_mootdx_pool().size
+    return RequestGovernor().policy(DAILY_HISTORY_REQUEST_SOURCES[data_source]).max_concurrency
@@ -0,0 +1,171 @@
+import json
+import time
+import datetime
+import numpy as np
+
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+from tools.utils_clock import FakeClock, install_fake_clock, uninstall_fake_clock
+from tools.utils_journal import TickJournalReader
+
+
+# ================================================
+# tick 回放：把录制的 tick 按时间顺序重新喂给 XtSubscriber.callback_sub_whole
+# 支持 tick 日志（.bin）和收盘转存的 list 格式 json，speed 为 1 按真实节奏，N 为 N 倍速，0 为不等待全速回放
+# 回放期间安装 FakeClock，订阅器里的 get_now() 读到的是当前批次的行情时间
+# ================================================
+
+
+# 一批行情：(毫秒时间戳, {code: quote})，同一时间戳的 tick 合成一次推送
+QuoteBatch = tuple[int, Dict[str, dict]]
+
+
+class _QuoteFiller:
+    # 录制的 tick 没有开盘价和昨收，开盘价取回放中的第一笔成交价，昨收可以从外部传入
+    def __init__(self, last_closes: Dict[str, float] = None):
+        self.last_closes = {} if last_closes is None else last_closes
+        self.opens: Dict[str, float] = {}
+
+    def fill(self, code: str, quote: dict) -> dict:
+        if code not in self.opens and quote['lastPrice'] > 0:
+            self.opens[code] = quote['lastPrice']
+        quote['open'] = self.opens.get(code, 0.0)
+        quote['lastClose'] = self.last_closes.get(code, 0.0)
+        return quote
+
+
+def load_journal_batches(
+    path: str,
+    codes: list[str] = None,
+    last_closes: Dict[str, float] = None,
+) -> Iterator[QuoteBatch]:
+    reader = TickJournalReader(path)
+    try:
+        if codes is None:
+            records = np.asarray(reader.records)
+        else:
+            parts = [np.asarray(reader.read_code(code)) for code in codes]
+            records = np.concatenate(parts) if len(parts) > 0 else np.asarray(reader.records[:0])
+    finally:
+        reader.close()
+
+    records = records[np.argsort(records['time'], kind='stable')]
+    filler = _QuoteFiller(last_closes)
+    times = records['time']
+    bounds = np.flatnonzero(np.diff(times)) + 1
+    for batch in np.split(records, bounds) if len(records) > 0 else []:
+        quotes = {}
+        for r in batch:
+            code = r['code'].decode()
+            quotes[code] = filler.fill(code, {
+                'time': int(r['time']),
+                'lastPrice': float(r['price']),
+                'high': float(r['high']),
+                'low': float(r['low']),
+                'volume': int(r['volume']),
+                'amount': float(r['amount']),
+                'askPrice': r['askPrice'].tolist(),
+                'askVol': r['askVol'].tolist(),
+                'bidPrice': r['bidPrice'].tolist(),
+                'bidVol': r['bidVol'].tolist(),
+            })
+        yield int(batch['time'][0]), quotes
+
+
+def load_tick_history_batches(
+    path: str,
+    trade_date: str,
+    codes: list[str] = None,
+    last_closes: Dict[str, float] = None,
+) -> Iterator[QuoteBatch]:
+    # list 格式的 tick_history_*.json：{code: [[%H:%M:%S, price, high, low, volume, amount, askP, askV, bidP, bidV]]}
+    with open(path, 'r') as f:
+        ticks: Dict[str, list] = json.load(f)
+
+    rows = []
+    for code in ticks if codes is None else [c for c in codes if c in ticks]:
+        for tick in ticks[code]:
+            t = datetime.datetime.strptime(f'{trade_date} {tick[0]}', '%Y-%m-%d %H:%M:%S')
+            rows.append((int(t.timestamp() * 1000), code, tick))
+    rows.sort(key=lambda row: row[0])
+
+    filler = _QuoteFiller(last_closes)
+    batch_time = None
+    quotes = {}
+    for time_ms, code, tick in rows:
+        if time_ms != batch_time and len(quotes) > 0:
+            yield batch_time, quotes
+            quotes = {}
+        batch_time = time_ms
+        quotes[code] = filler.fill(code, {
+            'time': time_ms,
+            'lastPrice': tick[1],
+            'high': tick[2],
+            'low': tick[3],
+            'volume': tick[4],
+            'amount': tick[5],
+            'askPrice': tick[6],
+            'askVol': tick[7],
+            'bidPrice': tick[8],
+            'bidVol': tick[9],
+        })
+    if len(quotes) > 0:
+        yield batch_time, quotes
+
+
+class TickReplayer:
+    def __init__(self, callback: Callable[[Dict[str, dict]], None], speed: float = 0.0, clock: FakeClock = None):
+        self.callback = callback
+        self.speed = speed
+        self.clock = FakeClock() if clock is None else clock
+
+        self.batches = 0
+        self.quotes = 0
+        self.elapsed = 0.0
+        self.costs: list[float] = []      # 每次回调耗时
+
+    def run(self, batches: Iterable[QuoteBatch], limit: Optional[int] = None) -> dict:
+        install_fake_clock(self.clock)
+        try:
+            wall_start = time.perf_counter()
+            first_ms = None
+            for time_ms, quotes in batches:
+                if limit is not None and self.batches >= limit:
+                    break
+                if first_ms is None:
+                    first_ms = time_ms
+
+                if self.speed > 0:
+                    wait = (time_ms - first_ms) / 1000 / self.speed - (time.perf_counter() - wall_start)
+                    if wait > 0:
+                        time.sleep(wait)
+
+                self.clock.set_ms(time_ms)
+                t0 = time.perf_counter()
+                self.callback(quotes)
+                self.costs.append(time.perf_counter() - t0)
+
+                self.batches += 1
+                self.quotes += len(quotes)
+            self.elapsed = time.perf_counter() - wall_start
+        finally:
+            uninstall_fake_clock()
+        return self.stats()
+
+    def stats(self) -> dict:
+        costs = np.array(self.costs) if len(self.costs) > 0 else np.zeros(1)
+        return {
+            'batches': self.batches,
+            'quotes': self.quotes,
+            'elapsed': self.elapsed,
+            'quotes_per_second': self.quotes / self.elapsed if self.elapsed > 0 else 0.0,
+            'cost_avg': float(costs.mean()),
+            'cost_p99': float(np.percentile(costs, 99)),
+            'cost_max': float(costs.max()),
+        }
+
+    def summary(self) -> str:
+        s = self.stats()
+        return f'[回放] batches:{s["batches"]} quotes:{s["quotes"]} elapsed:{s["elapsed"]:.2f}s ' \
+               f'throughput:{s["quotes_per_second"]:.0f}/s callback avg:{s["cost_avg"] * 1000:.2f}ms ' \
+               f'p99:{s["cost_p99"] * 1000:.2f}ms max:{s["cost_max"] * 1000:.2f}ms'
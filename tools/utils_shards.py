@@ -0,0 +1,191 @@
+import time
+import zlib
+import queue
+import traceback
+import multiprocessing
+
+from typing import Callable, Dict
+
+from tools.utils_ticks import TickRingBuffer, DEFAULT_TICK_CAPACITY
+
+
+# ================================================
+# 多进程分片执行：全市场股票池时，每个子进程固定负责一部分代码，记录自己分片的 tick 并执行逐票的策略逻辑
+# 主进程只负责拆分行情、收集各分片返回的买卖意图，下单仍然统一走主进程的 delegate
+# evaluate(curr_date, curr_time, curr_seconds, quotes, ticks) -> list 必须是模块级函数，Windows 下子进程用 spawn 启动
+# ================================================
+
+
+SHARD_TIMEOUT = 0.8     # 每秒执行一次，超过这个时间没返回的分片本轮放弃
+SHARD_START_TIMEOUT = 30.0
+
+
+def get_shard_index(code: str, shard_count: int) -> int:
+    # 按代码哈希分片，股票池变化时已有代码不会换分片
+    return zlib.crc32(code.encode()) % shard_count
+
+
+def split_quotes(quotes: Dict[str, dict], shard_count: int) -> list[Dict[str, dict]]:
+    ans = [{} for _ in range(shard_count)]
+    for code, quote in quotes.items():
+        ans[get_shard_index(code, shard_count)][code] = quote
+    return ans
+
+
+def _shard_worker(shard: int, evaluate: Callable, tick_capacity: int, inbox, outbox) -> None:
+    ticks = TickRingBuffer(tick_capacity) if tick_capacity > 0 else None
+    outbox.put((0, shard, [], None, 0.0))     # 启动完成
+    while True:
+        message = inbox.get()
+        if message is None:
+            return
+
+        # 上一轮超时时收件箱会积压，只执行最新的一轮，积压轮次的行情仍然记录进 tick
+        seq, args, quotes = message
+        backlog = []
+        reset = args is None
+        while True:
+            try:
+                message = inbox.get_nowait()
+            except queue.Empty:
+                break
+            if message is None:
+                return
+            if args is None:
+                backlog = []
+            else:
+                backlog.append(quotes)
+            seq, args, quotes = message
+            reset = reset or args is None
+
+        if reset and ticks is not None:
+            # 新交易日清空分片的 tick 记录
+            ticks.clear()
+        if args is None:
+            continue
+
+        t0 = time.perf_counter()
+        try:
+            if ticks is not None:
+                for skipped in backlog:
+                    ticks.append_quotes(skipped)
+                ticks.append_quotes(quotes)
+            intents = evaluate(*args, quotes, ticks)
+            error = None
+        except Exception as e:
+            intents = []
+            error = f'{e!r}\n{traceback.format_exc()}'
+        outbox.put((seq, shard, intents if intents is not None else [], error, time.perf_counter() - t0))
+
+
+class ShardedEvaluator:
+    def __init__(
+        self,
+        evaluate: Callable,
+        shard_count: int = None,
+        tick_capacity: int = DEFAULT_TICK_CAPACITY,     # 0 为子进程不记录 tick
+        timeout: float = SHARD_TIMEOUT,
+        start_method: str = 'spawn',
+    ):
+        self.evaluate_func = evaluate
+        self.shard_count = max(1, multiprocessing.cpu_count() - 1) if shard_count is None else shard_count
+        self.tick_capacity = tick_capacity
+        self.timeout = timeout
+        self.context = multiprocessing.get_context(start_method)
+
+        self.inboxes: list = []
+        self.outbox = None
+        self.processes: list = []
+        self.seq = 0
+
+        self.rounds = 0
+        self.late = 0           # 超时没赶上本轮的分片次数
+        self.failed = 0
+        self.cost_max = 0.0     # 单个分片最长执行耗时
+
+    def start(self) -> None:
+        if len(self.processes) > 0:
+            return
+        self.outbox = self.context.Queue()
+        for shard in range(self.shard_count):
+            inbox = self.context.Queue()
+            process = self.context.Process(
+                target=_shard_worker,
+                args=(shard, self.evaluate_func, self.tick_capacity, inbox, self.outbox),
+                name=f'shard_{shard}',
+                daemon=True,
+            )
+            process.start()
+            self.inboxes.append(inbox)
+            self.processes.append(process)
+
+        # spawn 启动子进程要重新 import，等全部就绪再开始分发，否则第一轮必然超时
+        ready = 0
+        deadline = time.monotonic() + SHARD_START_TIMEOUT
+        while ready < self.shard_count and time.monotonic() < deadline:
+            try:
+                self.outbox.get(timeout=max(0.0, deadline - time.monotonic()))
+                ready += 1
+            except queue.Empty:
+                break
+        if ready < self.shard_count:
+            print(f'[shards] 只有 {ready}/{self.shard_count} 个分片在 {SHARD_START_TIMEOUT}s 内启动')
+
+    def stop(self, timeout: float = 5.0) -> None:
+        for inbox in self.inboxes:
+            inbox.put(None)
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self.inboxes = []
+        self.processes = []
+        self.outbox = None
+
+    def reset(self) -> None:
+        for inbox in self.inboxes:
+            inbox.put((0, None, None))
+
+    def evaluate(self, curr_date: str, curr_time: str, curr_seconds: str, quotes: Dict[str, dict]) -> list:
+        # 把行情按分片发出去，收集本轮各分片的意图并按分片顺序合并
+        self.start()
+        self.seq += 1
+        self.rounds += 1
+        args = (curr_date, curr_time, curr_seconds)
+        for inbox, shard_quotes in zip(self.inboxes, split_quotes(quotes, self.shard_count)):
+            inbox.put((self.seq, args, shard_quotes))
+
+        results: Dict[int, list] = {}
+        deadline = time.monotonic() + self.timeout
+        while len(results) < self.shard_count:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                seq, shard, intents, error, cost = self.outbox.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if seq != self.seq:
+                continue        # 上一轮超时的分片迟到的结果
+            if error is not None:
+                self.failed += 1
+                print(f'[shard_{shard}] 执行出错：', error)
+            self.cost_max = max(self.cost_max, cost)
+            results[shard] = intents
+
+        self.late += self.shard_count - len(results)
+        ans = []
+        for shard in sorted(results):
+            ans += results[shard]
+        return ans
+
+    def summary(self) -> str:
+        return f'[shards] count:{self.shard_count} rounds:{self.rounds} late:{self.late} ' \
+               f'failed:{self.failed} cost max:{self.cost_max * 1000:.1f}ms'
+
+    def __enter__(self) -> 'ShardedEvaluator':
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()
@@ -0,0 +1,186 @@
+import datetime
+import numpy as np
+
+from typing import Dict, Iterator
+
+
+DEFAULT_TICK_CAPACITY = 1800    # 每只票保留的最近 tick 条数，每秒记录一次约半小时
+TICK_LEVELS = 5                 # 五档盘口
+
+
+def _adjust_levels(values: list, length: int = TICK_LEVELS) -> list:
+    if values is None:
+        return [0] * length
+    values = list(values)[:length]
+    return values + [0] * (length - len(values))
+
+
+# 按代码分行的二维预分配环形缓冲，追加 O(1)，新代码按倍数扩容
+# 每条 tick 占 208 字节（时间、价量 6 个字段和五档买卖盘各 8 字节），内存为 代码数 * capacity * 208：
+# 默认容量每只票约 374KB，全市场 5000 只约 1.9GB；按全天 14400 条算每只票约 3MB，只适合小股票池
+# 只保留最近的 tick 给盘中策略用，全天完整的 tick 请用 tick 日志落盘
+class TickRingBuffer:
+    def __init__(self, capacity: int = DEFAULT_TICK_CAPACITY, init_codes: int = 64):
+        self.capacity = max(1, capacity)
+        self.code_index: Dict[str, int] = {}
+        self.codes: list[str] = []
+        self._allocate(max(1, init_codes))
+
+    def _allocate(self, rows: int) -> None:
+        cap = self.capacity
+        arrays = {
+            'time': np.zeros((rows, cap), dtype=np.int64),          # 毫秒时间戳
+            'price': np.zeros((rows, cap), dtype=np.float64),
+            'high': np.zeros((rows, cap), dtype=np.float64),
+            'low': np.zeros((rows, cap), dtype=np.float64),
+            'volume': np.zeros((rows, cap), dtype=np.int64),        # 累计成交量（手）
+            'amount': np.zeros((rows, cap), dtype=np.float64),      # 累计成交额（元）
+            'askPrice': np.zeros((rows, cap, TICK_LEVELS), dtype=np.float64),
+            'askVol': np.zeros((rows, cap, TICK_LEVELS), dtype=np.int64),
+            'bidPrice': np.zeros((rows, cap, TICK_LEVELS), dtype=np.float64),
+            'bidVol': np.zeros((rows, cap, TICK_LEVELS), dtype=np.int64),
+        }
+        counts = np.zeros(rows, dtype=np.int64)    # 每行累计写入条数，写入位置为 count % capacity
+
+        if hasattr(self, 'arrays'):
+            used = len(self.codes)
+            for name in arrays:
+                arrays[name][:used] = self.arrays[name][:used]
+            counts[:used] = self.counts[:used]
+
+        self.arrays = arrays
+        self.counts = counts
+
+    def _row(self, code: str) -> int:
+        if code not in self.code_index:
+            if len(self.codes) >= len(self.counts):
+                self._allocate(len(self.counts) * 2)
+            self.code_index[code] = len(self.codes)
+            self.codes.append(code)
+        return self.code_index[code]
+
+    def append(self, code: str, quote: dict) -> None:
+        row = self._row(code)
+        pos = self.counts[row] % self.capacity
+        arrays = self.arrays
+        arrays['time'][row, pos] = quote['time']
+        arrays['price'][row, pos] = quote['lastPrice']
+        arrays['high'][row, pos] = quote['high']
+        arrays['low'][row, pos] = quote['low']
+        arrays['volume'][row, pos] = quote['volume']
+        arrays['amount'][row, pos] = quote['amount']
+        arrays['askPrice'][row, pos] = _adjust_levels(quote.get('askPrice'))
+        arrays['askVol'][row, pos] = _adjust_levels(quote.get('askVol'))
+        arrays['bidPrice'][row, pos] = _adjust_levels(quote.get('bidPrice'))
+        arrays['bidVol'][row, pos] = _adjust_levels(quote.get('bidVol'))
+        self.counts[row] += 1
+
+    def append_quotes(self, quotes: Dict[str, dict]) -> None:
+        for code in quotes:
+            self.append(code, quotes[code])
+
+    def size(self, code: str) -> int:
+        if code not in self.code_index:
+            return 0
+        return int(min(self.counts[self.code_index[code]], self.capacity))
+
+    def last(self, code: str, n: int = None, field: str = 'price') -> np.ndarray:
+        # 最近 n 条，按时间从旧到新；未回绕时直接返回视图，回绕后拼接一次
+        size = self.size(code)
+        n = size if n is None else min(n, size)
+        data = self.arrays[field]
+        if n <= 0:
+            return data[0, :0]
+
+        row = self.code_index[code]
+        end = int(self.counts[row] % self.capacity)
+        if end == 0:
+            end = self.capacity
+        if n <= end:
+            return data[row, end - n:end]
+        return np.concatenate([data[row, self.capacity - (n - end):], data[row, :end]])
+
+    def since(self, code: str, start_ms: int, field: str = 'price') -> np.ndarray:
+        # 时间戳不早于 start_ms 的全部 tick
+        times = self.last(code, field='time')
+        idx = int(np.searchsorted(times, start_ms, side='left'))
+        return self.last(code, len(times) - idx, field)
+
+    def __contains__(self, code: str) -> bool:
+        return code in self.code_index
+
+    def __getitem__(self, code: str) -> 'TickView':
+        return TickView(self, code)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self.codes))
+
+    def keys(self) -> list[str]:
+        return list(self.codes)
+
+    def clear(self) -> None:
+        self.code_index.clear()
+        self.codes.clear()
+        self.counts[:] = 0
+
+    def to_lists(self) -> Dict[str, list]:
+        # 转换成原先 list 模式的格式，方便落盘
+        return {code: TickView(self, code).to_list() for code in self.codes}
+
+
+# 单个代码的只读视图，兼容原先 list 模式按下标取 [time, price, high, low, volume, amount, ...] 的用法
+class TickView:
+    def __init__(self, buffer: TickRingBuffer, code: str):
+        self.buffer = buffer
+        self.code = code
+
+    def __len__(self) -> int:
+        return self.buffer.size(self.code)
+
+    def __getitem__(self, i: int) -> list:
+        size = len(self)
+        if i < 0:
+            i += size
+        if i < 0 or i >= size:
+            raise IndexError('tick index out of range')
+
+        row = self.buffer.code_index[self.code]
+        pos = int((self.buffer.counts[row] - size + i) % self.buffer.capacity)
+        a = self.buffer.arrays
+        return [
+            datetime.datetime.fromtimestamp(a['time'][row, pos] / 1000).strftime('%H:%M:%S'),
+            round(float(a['price'][row, pos]), 3),
+            round(float(a['high'][row, pos]), 3),
+            round(float(a['low'][row, pos]), 3),
+            int(a['volume'][row, pos]),
+            round(float(a['amount'][row, pos]), 3),
+            [round(float(p), 3) for p in a['askPrice'][row, pos]],
+            [int(v) for v in a['askVol'][row, pos]],
+            [round(float(p), 3) for p in a['bidPrice'][row, pos]],
+            [int(v) for v in a['bidVol'][row, pos]],
+        ]
+
+    def last(self, n: int = None, field: str = 'price') -> np.ndarray:
+        return self.buffer.last(self.code, n, field)
+
+    def since(self, start_ms: int, field: str = 'price') -> np.ndarray:
+        return self.buffer.since(self.code, start_ms, field)
+
+    def to_list(self) -> list:
+        return [self[i] for i in range(len(self))]
+
+
+def get_tick_prices_since(ticks: 'TickView | list', start_ms: int) -> np.ndarray:
+    # 环形缓冲直接按毫秒切片，list 模式的 [%H:%M:%S, price, ...] 从后往前按时间字符串比较
+    if isinstance(ticks, TickView):
+        return ticks.since(start_ms)
+    start_time = datetime.datetime.fromtimestamp(start_ms / 1000).strftime('%H:%M:%S')
+    prices = []
+    for tick in reversed(ticks):
+        if tick[0] < start_time:
+            break
+        prices.append(tick[1])
+    return np.array(prices[::-1], dtype=np.float64)
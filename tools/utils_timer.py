@@ -0,0 +1,197 @@
+import math
+import time
+import threading
+import traceback
+
+from typing import Callable, Optional
+
+from tools.utils_clock import get_now, hhmm_to_seconds
+
+
+# ================================================
+# 盘中固定节奏任务的时间轮：按 monotonic 时钟推进，每秒准点执行，不经过 APScheduler 的线程池和 misfire 处理
+# 下一次的触发时间在上一次的计划时间上累加，执行耗时不会累积成漂移；落后超过一个周期的直接跳过并计数
+# APScheduler 只保留每天固定时刻的 cron 任务
+# ================================================
+
+
+TIMER_RESOLUTION = 0.005    # 时间轮每格 5ms
+TIMER_SLOTS = 512           # 一圈约 2.56 秒，更远的任务放在对应格子里等后面几圈
+
+
+def parse_windows(windows: list[tuple[str, str]]) -> list[tuple[int, int]]:
+    # [('09:15:00', '11:30:00'), ...] 转换成当天秒数的左闭右开区间
+    return [(hhmm_to_seconds(start[:5], start[6:8] or '00'), hhmm_to_seconds(end[:5], end[6:8] or '00'))
+            for start, end in windows]
+
+
+class TimerJob:
+    def __init__(
+        self,
+        func: Callable,
+        interval: float,
+        name: str,
+        args: tuple = (),
+        windows: list[tuple[str, str]] = None,
+    ):
+        self.func = func
+        self.interval = interval
+        self.name = name
+        self.args = args
+        self.windows = None if windows is None else parse_windows(windows)
+        self.deadline = 0.0             # 下一次计划触发的 monotonic 时间
+        self.removed = False
+
+        self.runs = 0
+        self.skipped = 0                # 落后太多被跳过的次数
+        self.overruns = 0               # 单次执行超过一个周期的次数
+        self.failed = 0
+        self.late_total = 0.0           # 实际触发相对计划时间的延迟
+        self.late_max = 0.0
+        self.cost_total = 0.0
+        self.cost_max = 0.0
+
+    def in_window(self) -> bool:
+        if self.windows is None:
+            return True
+        now = get_now()
+        seconds = now.hour * 3600 + now.minute * 60 + now.second
+        return any(start <= seconds < end for start, end in self.windows)
+
+    def stats(self) -> dict:
+        return {
+            'runs': self.runs,
+            'skipped': self.skipped,
+            'overruns': self.overruns,
+            'failed': self.failed,
+            'late_avg': self.late_total / self.runs if self.runs > 0 else 0.0,
+            'late_max': self.late_max,
+            'cost_avg': self.cost_total / self.runs if self.runs > 0 else 0.0,
+            'cost_max': self.cost_max,
+        }
+
+
+class TimerWheel:
+    def __init__(self, resolution: float = TIMER_RESOLUTION, slots: int = TIMER_SLOTS, name: str = 'timer'):
+        self.resolution = resolution
+        self.slots: list[list[tuple[int, TimerJob]]] = [[] for _ in range(slots)]
+        self.name = name
+
+        self.lock = threading.Lock()
+        self.jobs: list[TimerJob] = []
+        self.origin = time.monotonic()  # 第 0 格的时间
+        self.current_tick = 0           # 已经处理到的格子
+        self.stopped = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def _tick_of(self, deadline: float) -> int:
+        return math.ceil((deadline - self.origin) / self.resolution)
+
+    def _schedule(self, job: TimerJob) -> None:
+        tick = max(self._tick_of(job.deadline), self.current_tick + 1)
+        self.slots[tick % len(self.slots)].append((tick, job))
+
+    def add_job(
+        self,
+        func: Callable,
+        interval: float = 1.0,
+        name: str = None,
+        args: tuple = (),
+        windows: list[tuple[str, str]] = None,     # 只在这些时间段内执行
+        align: bool = True,                         # 对齐到整秒（整 interval）触发
+    ) -> TimerJob:
+        job = TimerJob(func, interval, func.__name__ if name is None else name, args, windows)
+        delay = interval - (time.time() % interval) if align else interval
+        job.deadline = time.monotonic() + delay
+        with self.lock:
+            self.jobs.append(job)
+            self._schedule(job)
+        return job
+
+    def remove_job(self, job: TimerJob) -> None:
+        with self.lock:
+            job.removed = True
+            if job in self.jobs:
+                self.jobs.remove(job)
+
+    def _fire(self, job: TimerJob) -> None:
+        start = time.monotonic()
+        late = start - job.deadline
+        if job.in_window():
+            try:
+                job.func(*job.args)
+            except Exception as e:
+                job.failed += 1
+                print(f'[{self.name}:{job.name}] 执行出错：', e)
+                traceback.print_exc()
+            cost = time.monotonic() - start
+            job.runs += 1
+            job.late_total += late
+            job.late_max = max(job.late_max, late)
+            job.cost_total += cost
+            job.cost_max = max(job.cost_max, cost)
+            if cost > job.interval:
+                job.overruns += 1
+
+        # 在计划时间上累加避免漂移，已经错过的周期不补跑
+        job.deadline += job.interval
+        now = time.monotonic()
+        if job.deadline <= now:
+            missed = int((now - job.deadline) // job.interval) + 1
+            job.skipped += missed
+            job.deadline += missed * job.interval
+
+    def advance(self, now: float = None) -> None:
+        # 处理到 now 为止到期的所有格子
+        target = int(((time.monotonic() if now is None else now) - self.origin) / self.resolution + 1e-9)
+        while self.current_tick < target:
+            self.current_tick += 1
+            with self.lock:
+                slot = self.slots[self.current_tick % len(self.slots)]
+                due = [job for tick, job in slot if tick <= self.current_tick]
+                slot[:] = [(tick, job) for tick, job in slot if tick > self.current_tick]
+            for job in due:
+                if job.removed:
+                    continue
+                self._fire(job)
+                with self.lock:
+                    if not job.removed:
+                        self._schedule(job)
+
+    def next_deadline(self) -> Optional[float]:
+        with self.lock:
+            return min((job.deadline for job in self.jobs), default=None)
+
+    def run(self) -> None:
+        while not self.stopped.is_set():
+            deadline = self.next_deadline()
+            if deadline is not None:
+                deadline = self.origin + self._tick_of(deadline) * self.resolution     # 醒来时正好走到该格
+            wait = 0.5 if deadline is None else min(0.5, deadline - time.monotonic())
+            if wait > 0 and self.stopped.wait(wait):
+                return
+            self.advance()
+
+    def start(self) -> None:
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self.run, name=f'{self.name}_wheel', daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout: float = None) -> None:
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    def summary(self) -> str:
+        with self.lock:
+            jobs = list(self.jobs)
+        lines = []
+        for job in jobs:
+            s = job.stats()
+            lines.append(f'[{self.name}:{job.name}] runs:{s["runs"]} skipped:{s["skipped"]} '
+                         f'overruns:{s["overruns"]} failed:{s["failed"]} '
+                         f'late avg:{s["late_avg"] * 1000:.1f}ms max:{s["late_max"] * 1000:.1f}ms '
+                         f'cost avg:{s["cost_avg"] * 1000:.1f}ms max:{s["cost_max"] * 1000:.1f}ms')
+        return '\n'.join(lines)
@@ -0,0 +1,194 @@
+import os
+import json
+import time
+import datetime
+import threading
+
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+
+# ================================================
+# 全链路延迟追踪：从行情回调到 order_submit 返回，每个阶段记录距行情到达的耗时
+# 进程内按阶段聚合到 HDR 风格的对数直方图，定期追加写入本地 jsonl 文件；未开启时每个打点只有一次属性判断
+# ================================================
+
+
+DEFAULT_TRACE_PATH = './_cache/debug/latency_trace.jsonl'
+DEFAULT_DUMP_SECONDS = 60.0
+
+HIST_SUB_BITS = 5                               # 每个 2 的幂区间再分 32 档，相对误差约 3%
+HIST_SUB_COUNT = 1 << HIST_SUB_BITS
+HIST_MAX_OCTAVES = 32                           # 最大约 2^37 微秒，足够覆盖任何延迟
+HIST_SIZE = HIST_SUB_COUNT * (HIST_MAX_OCTAVES + 1)
+
+
+def _bucket_index(value: int) -> int:
+    if value < HIST_SUB_COUNT:
+        return value
+    exponent = value.bit_length() - 1
+    octave = exponent - HIST_SUB_BITS
+    if octave >= HIST_MAX_OCTAVES:
+        return HIST_SIZE - 1
+    return HIST_SUB_COUNT * (octave + 1) + (value >> octave) - HIST_SUB_COUNT
+
+
+def _bucket_upper(index: int) -> int:
+    # 该档能代表的最大值（微秒）
+    if index < HIST_SUB_COUNT:
+        return index
+    octave = index // HIST_SUB_COUNT - 1
+    sub = index % HIST_SUB_COUNT
+    return ((HIST_SUB_COUNT + sub + 1) << octave) - 1
+
+
+class LatencyHistogram:
+    def __init__(self):
+        self.counts = [0] * HIST_SIZE
+        self.count = 0
+        self.total = 0          # 微秒
+        self.max = 0
+
+    def record(self, seconds: float) -> None:
+        value = int(seconds * 1_000_000)
+        if value < 0:
+            value = 0
+        self.counts[_bucket_index(value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: 'LatencyHistogram') -> None:
+        for i, c in enumerate(other.counts):
+            if c:
+                self.counts[i] += c
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, q: float) -> int:
+        # 返回微秒，q 取 0-100
+        if self.count == 0:
+            return 0
+        target = max(1, int(self.count * q / 100 + 0.5))
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= target:
+                return min(_bucket_upper(i), self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+        # 单位毫秒
+        return {
+            'count': self.count,
+            'mean': round(self.total / self.count / 1000, 3) if self.count > 0 else 0.0,
+            'p50': self.percentile(50) / 1000,
+            'p90': self.percentile(90) / 1000,
+            'p99': self.percentile(99) / 1000,
+            'p999': self.percentile(99.9) / 1000,
+            'max': self.max / 1000,
+        }
+
+
+class LatencyTracer:
+    def __init__(self, enabled: bool = False, path: str = DEFAULT_TRACE_PATH, dump_seconds: float = DEFAULT_DUMP_SECONDS):
+        self.enabled = enabled
+        self.path = path
+        self.dump_seconds = dump_seconds
+
+        self.local = threading.local()          # 当前线程正在追踪的行情到达时间
+        self.lock = threading.Lock()
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.last_dump = time.monotonic()
+
+    def enable(self, path: str = None, dump_seconds: float = None) -> None:
+        if path is not None:
+            self.path = path
+        if dump_seconds is not None:
+            self.dump_seconds = dump_seconds
+        self.last_dump = time.monotonic()
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def begin(self) -> float:
+        # 行情到达，返回起点供跨线程传递
+        if not self.enabled:
+            return 0.0
+        origin = time.perf_counter()
+        self.local.origin = origin
+        return origin
+
+    def resume(self, origin: float) -> None:
+        # 在策略线程里接续行情线程的起点
+        if self.enabled and origin > 0:
+            self.local.origin = origin
+
+    def mark(self, stage: str) -> None:
+        # 记录距行情到达的耗时
+        if not self.enabled:
+            return
+        origin = getattr(self.local, 'origin', None)
+        if origin is not None:
+            self.record(stage, time.perf_counter() - origin)
+
+    @contextmanager
+    def span(self, stage: str):
+        # 记录代码块自身的耗时
+        if not self.enabled:
+            yield
+            return
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - t0)
+
+    def record(self, stage: str, seconds: float) -> None:
+        with self.lock:
+            if stage not in self.histograms:
+                self.histograms[stage] = LatencyHistogram()
+            self.histograms[stage].record(seconds)
+            if time.monotonic() - self.last_dump >= self.dump_seconds:
+                self._dump()
+
+    def _dump(self) -> None:
+        self.last_dump = time.monotonic()
+        if len(self.histograms) == 0:
+            return
+        line = {
+            'time': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'stages': {stage: hist.to_dict() for stage, hist in self.histograms.items()},
+        }
+        self.histograms = {}    # 每行只统计一个周期
+        try:
+            folder = os.path.dirname(self.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            with open(self.path, 'a') as f:
+                f.write(json.dumps(line, ensure_ascii=False) + '\n')
+        except OSError as e:
+            print('[延迟追踪] 写入失败：', e)
+
+    def dump(self) -> None:
+        with self.lock:
+            self._dump()
+
+    def summary(self) -> str:
+        with self.lock:
+            items = [(stage, hist.to_dict()) for stage, hist in self.histograms.items()]
+        return ' '.join(f'[{stage}] n:{d["count"]} p50:{d["p50"]:.2f}ms p99:{d["p99"]:.2f}ms max:{d["max"]:.2f}ms'
+                        for stage, d in items)
+
+
+latency_tracer: Optional[LatencyTracer] = None
+
+
+def get_latency_tracer() -> LatencyTracer:
+    global latency_tracer
+    if latency_tracer is None:
+        latency_tracer = LatencyTracer()
+    return latency_tracer
@@ -0,0 +1,210 @@
+import os
+import json
+import zlib
+import struct
+import datetime
+import numpy as np
+import pandas as pd
+
+from typing import Dict, Optional
+
+from tools.utils_clock import date_to_midnight_ms
+from tools.utils_ticks import TickRingBuffer
+from tools.utils_bars import MinuteBarAggregator
+from tools.utils_journal import TICK_RECORD_DTYPE, quotes_to_records, record_to_tick
+
+
+# ================================================
+# 盘前准备状态的热启动快照：盘中进程重启时直接从快照恢复股票池、历史日线和当天已记录的 tick，跳过几分钟的盘前准备
+# 文件结构：[头部 32 字节][元数据 json][按 64 字节对齐的数组 ...]，数组直接 memmap 读取，不做反序列化
+# 先写临时文件再 os.replace，写到一半崩溃时旧快照仍然完整
+# ================================================
+
+
+SNAPSHOT_MAGIC = b'SQWS'
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct('<4sHH4xQQI4x')     # magic, version, align, meta_offset, meta_length, meta_crc32
+SNAPSHOT_ALIGN = 64
+
+
+def _align(offset: int) -> int:
+    return (offset + SNAPSHOT_ALIGN - 1) // SNAPSHOT_ALIGN * SNAPSHOT_ALIGN
+
+
+def write_snapshot(path: str, meta: dict, arrays: Dict[str, np.ndarray]) -> int:
+    # 返回写入的字节数
+    layout = {}
+    offset = _align(SNAPSHOT_HEADER.size)
+    for name, arr in arrays.items():
+        layout[name] = {'offset': offset, 'dtype': arr.dtype.descr if arr.dtype.fields else arr.dtype.str,
+                        'shape': list(arr.shape)}
+        offset = _align(offset + arr.nbytes)
+    meta_bytes = json.dumps({'meta': meta, 'arrays': layout}, ensure_ascii=False).encode()
+
+    folder = os.path.dirname(os.path.abspath(path))
+    os.makedirs(folder, exist_ok=True)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(SNAPSHOT_HEADER.pack(
+            SNAPSHOT_MAGIC, SNAPSHOT_VERSION, SNAPSHOT_ALIGN, offset, len(meta_bytes), zlib.crc32(meta_bytes)))
+        for name, arr in arrays.items():
+            f.seek(layout[name]['offset'])
+            f.write(np.ascontiguousarray(arr).tobytes())
+        f.seek(offset)
+        f.write(meta_bytes)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+    return offset + len(meta_bytes)
+
+
+def _to_dtype(descr) -> np.dtype:
+    if isinstance(descr, str):
+        return np.dtype(descr)
+    return np.dtype([tuple(field[:1]) + (field[1] if isinstance(field[1], str) else _to_dtype(field[1]),)
+                     + tuple(tuple(s) for s in field[2:]) for field in descr])
+
+
+def read_snapshot(path: str) -> Optional[tuple[dict, Dict[str, np.ndarray]]]:
+    # 数组以 copy-on-write 方式映射，调用方修改不会写回文件；文件损坏或版本不符时返回 None
+    if not os.path.exists(path):
+        return None
+    file_size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        head = f.read(SNAPSHOT_HEADER.size)
+        if len(head) < SNAPSHOT_HEADER.size:
+            return None
+        magic, version, _, meta_offset, meta_length, meta_crc = SNAPSHOT_HEADER.unpack(head)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION or meta_offset + meta_length > file_size:
+            return None
+        f.seek(meta_offset)
+        meta_bytes = f.read(meta_length)
+        if zlib.crc32(meta_bytes) != meta_crc:
+            return None
+    content = json.loads(meta_bytes.decode())
+
+    arrays = {}
+    for name, item in content['arrays'].items():
+        dtype = _to_dtype(item['dtype'])
+        shape = tuple(item['shape'])
+        if int(np.prod(shape)) == 0:
+            arrays[name] = np.zeros(shape, dtype=dtype)
+        else:
+            arrays[name] = np.memmap(path, dtype=dtype, mode='c', offset=item['offset'], shape=shape)
+    return content['meta'], arrays
+
+
+# -----------------------
+# 历史日线：相同列的 DataFrame 按列拼接成一个数组，另存每只票的起止位置
+# -----------------------
+def pack_histories(histories: Dict[str, pd.DataFrame], prefix: str = 'history') -> tuple[list, Dict[str, np.ndarray]]:
+    groups: Dict[tuple, list[str]] = {}
+    for code, df in histories.items():
+        groups.setdefault(tuple(df.columns), []).append(code)
+
+    meta = []
+    arrays = {}
+    for g, (columns, codes) in enumerate(groups.items()):
+        lengths = [len(histories[code]) for code in codes]
+        arrays[f'{prefix}_{g}_offsets'] = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        strings = []
+        for c, column in enumerate(columns):
+            values = pd.concat([histories[code][column] for code in codes], ignore_index=True)
+            if values.dtype.kind not in 'biufmM':
+                arrays[f'{prefix}_{g}_{c}'] = values.astype(str).to_numpy().astype(str)  # 字符串列存成定长 unicode
+                strings.append(column)
+            else:
+                arrays[f'{prefix}_{g}_{c}'] = values.to_numpy()
+        meta.append({'columns': list(columns), 'codes': codes, 'strings': strings})
+    return meta, arrays
+
+
+def unpack_histories(meta: list, arrays: Dict[str, np.ndarray], prefix: str = 'history') -> Dict[str, pd.DataFrame]:
+    ans = {}
+    for g, group in enumerate(meta):
+        offsets = arrays[f'{prefix}_{g}_offsets']
+        columns = []
+        for c, column in enumerate(group['columns']):
+            values = arrays[f'{prefix}_{g}_{c}']
+            columns.append(values.astype(object) if column in group['strings'] else values)
+        for i, code in enumerate(group['codes']):
+            start, end = int(offsets[i]), int(offsets[i + 1])
+            ans[code] = pd.DataFrame({column: values[start:end] for column, values in zip(group['columns'], columns)})
+    return ans
+
+
+# -----------------------
+# 当天 tick：环形缓冲直接保存数组，list 模式转换成 tick 日志的定长记录
+# -----------------------
+def pack_ring_buffer(buffer: TickRingBuffer, prefix: str = 'ring') -> tuple[dict, Dict[str, np.ndarray]]:
+    used = len(buffer.codes)
+    arrays = {f'{prefix}_{name}': arr[:used] for name, arr in buffer.arrays.items()}
+    arrays[f'{prefix}_counts'] = buffer.counts[:used]
+    return {'codes': list(buffer.codes), 'capacity': buffer.capacity}, arrays
+
+
+def unpack_ring_buffer(meta: dict, arrays: Dict[str, np.ndarray], prefix: str = 'ring') -> TickRingBuffer:
+    codes = meta['codes']
+    ans = TickRingBuffer(meta['capacity'], init_codes=max(64, len(codes)))
+    for i, code in enumerate(codes):
+        ans.code_index[code] = i
+        ans.codes.append(code)
+    for name in ans.arrays:
+        ans.arrays[name][:len(codes)] = arrays[f'{prefix}_{name}']
+    ans.counts[:len(codes)] = arrays[f'{prefix}_counts']
+    return ans
+
+
+def pack_tick_lists(ticks: Dict[str, list], trade_date: str) -> np.ndarray:  # trade_date: 2024-01-01
+    # list 模式每条是 [HH:MM:SS, price, high, low, volume, amount, askPrice, askVol, bidPrice, bidVol]
+    midnight = date_to_midnight_ms(datetime.date.fromisoformat(trade_date)) // 1000
+    records = []
+    for code, items in ticks.items():
+        if len(items) == 0:
+            continue
+        quotes = [{
+            'time': int((midnight + int(t[0][:2]) * 3600 + int(t[0][3:5]) * 60 + int(t[0][6:8])) * 1000),
+            'lastPrice': t[1], 'high': t[2], 'low': t[3], 'volume': t[4], 'amount': t[5],
+            'askPrice': t[6], 'askVol': t[7], 'bidPrice': t[8], 'bidVol': t[9],
+        } for t in items]
+        part = quotes_to_records({str(i): q for i, q in enumerate(quotes)})
+        part['code'] = code.encode()
+        records.append(part)
+    return np.concatenate(records) if len(records) > 0 else np.zeros(0, dtype=TICK_RECORD_DTYPE)
+
+
+def unpack_tick_lists(records: np.ndarray) -> Dict[str, list]:
+    ans: Dict[str, list] = {}
+    for record in records:
+        ans.setdefault(record['code'].decode(), []).append(record_to_tick(record))
+    return ans
+
+
+# -----------------------
+# 盘中分钟线
+# -----------------------
+def pack_minute_bars(bars: MinuteBarAggregator, prefix: str = 'bars') -> tuple[dict, Dict[str, np.ndarray]]:
+    used = len(bars.codes)
+    arrays = {f'{prefix}_{period}': bars.bars[period][:used] for period in bars.periods}
+    arrays[f'{prefix}_last_slot'] = bars.last_slot[:used]
+    arrays[f'{prefix}_last_volume'] = bars.last_volume[:used]
+    arrays[f'{prefix}_last_amount'] = bars.last_amount[:used]
+    trade_date = None if bars.trade_date is None else bars.trade_date.isoformat()
+    return {'codes': list(bars.codes), 'periods': list(bars.periods), 'trade_date': trade_date}, arrays
+
+
+def unpack_minute_bars(bars: MinuteBarAggregator, meta: dict, arrays: Dict[str, np.ndarray],
+                       prefix: str = 'bars') -> bool:
+    # 恢复到已有的聚合器，周期配置不一致时放弃
+    if meta['periods'] != list(bars.periods) or meta['trade_date'] is None:
+        return False
+    bars.reset(datetime.date.fromisoformat(meta['trade_date']))
+    for code in meta['codes']:
+        bars._row(code)
+    used = len(meta['codes'])
+    for period in bars.periods:
+        bars.bars[period][:used] = arrays[f'{prefix}_{period}']
+    bars.last_slot[:used] = arrays[f'{prefix}_last_slot']
+    bars.last_volume[:used] = arrays[f'{prefix}_last_volume']
+    bars.last_amount[:used] = arrays[f'{prefix}_last_amount']
+    return True
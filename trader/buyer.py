@@ -1,10 +1,11 @@
 import math
-import datetime
 import logging
 
 from delegate.base_delegate import BaseDelegate
 
 from tools.utils_basic import get_limit_up_price, debug
+from tools.utils_clock import get_now
+from tools.utils_trace import get_latency_tracer
 
 
 DEFAULT_BUY_REMARK = '买入委托'
@@ -116,6 +117,7 @@ class BaseBuyer:
             logging.warning(f'{code} 超过风险控制，买入量调整为 {buy_volume} 股')
 
         if buy_volume > 0:
+            get_latency_tracer().mark('order_buy')
             order_price = price + self.order_premium
             limit_price = get_limit_up_price(code, last_close)
 
@@ -150,7 +152,7 @@ class BaseBuyer:
 
             if self.delegate.callback is not None:
                 self.delegate.callback.record_order(
-                    order_time=datetime.datetime.now().timestamp(),
+                    order_time=get_now().timestamp(),
                     code=code,
                     price=price,
                     volume=buy_volume,
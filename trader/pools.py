@@ -3,6 +3,7 @@ from typing import Set, Callable
 
 from tools.utils_basic import symbol_to_code
 from tools.utils_cache import get_prefixes_stock_codes, get_index_constituent_codes
+from tools.utils_panel import build_history_panel
 from tools.utils_remote import get_wencai_codes, get_tdx_zxg_code
 
 from trader.pools_indicator import get_macd_index_indicator, get_ma_index_indicator
@@ -36,6 +37,18 @@ class StockPool:
                 f'{self.strategy_name}:股票池{len(self.get_code_list())}支\n'
                 f'白名单: {len(self.cache_whitelist)} 黑名单: {len(self.cache_blacklist)}')
 
+    # 热启动快照保存和恢复的股票池状态
+    def dump_state(self) -> dict:
+        return {
+            'white': sorted(self.cache_whitelist),
+            'black': sorted(self.cache_blacklist),
+        }
+
+    def load_state(self, state: dict):
+        self.cache_whitelist = set(state['white'])
+        self.cache_blacklist = set(state['black'])
+        print(f'[POOL] Restored {len(self.cache_whitelist)} white and {len(self.cache_blacklist)} black codes.')
+
     def refresh_black(self):
         self.cache_blacklist.clear()
 
@@ -63,6 +76,19 @@ class StockPool:
             else:
                 remove_list.append(code)
 
+        self._discard_filtered(remove_list)
+
+    # 同上，选股公式的 select_batch 按面板一次算完全部白名单
+    def filter_white_list_by_batch_selector(self, batch_func: Callable, cache_history: dict[str, pd.DataFrame]):
+        print('[POOL] Batch filtering...', end='')
+        panel = build_history_panel(cache_history, codes=sorted(self.cache_whitelist))
+        passed = panel.last_passed(batch_func(panel))
+        empty = {code for code, n in zip(panel.codes, panel.lengths) if n == 0}     # 与逐只筛选一致，空历史不筛除
+        remove_list = [code for code in self.cache_whitelist
+                       if code not in panel.code_index or (code not in empty and not passed[code])]
+        self._discard_filtered(remove_list)
+
+    def _discard_filtered(self, remove_list: list[str]):
         for code in remove_list:
             self.cache_whitelist.discard(code)
 
@@ -1,4 +1,3 @@
-import time
 import datetime
 
 import pywencai
@@ -6,6 +5,7 @@ import akshare as ak
 
 from mytt.MyTT_advance import *
 from tools.utils_basic import symbol_to_code
+from tools.utils_governor import RequestSource, RequestGovernor
 
 
 # （过时）筛选东方财富行业板块的公式
@@ -49,8 +49,9 @@ def select_dfcf_industry_sections(
     for section_name in section_names:
         print(section_name, end=' ')
 
-        time.sleep(1)
-        df = ak.stock_board_industry_hist_em(
+        df = RequestGovernor().call(
+            RequestSource.EASTMONEY,
+            ak.stock_board_industry_hist_em,
             symbol=section_name,
             start_date=start_date,
             end_date=end_date,
@@ -78,7 +79,7 @@ def select_dfcf_industry_sections(
 # 选择东方财富的行业板块逻辑
 def get_dfcf_industry_sections(limit: int = 2000) -> list[str]:
     # 初筛板块
-    df = ak.stock_board_industry_name_em()
+    df = RequestGovernor().call(RequestSource.EASTMONEY, ak.stock_board_industry_name_em)
     df['涨跌比'] = (df['上涨家数'] + 1) / (df['下跌家数'] + 1)
     df = df.sort_values(by=['涨跌比'], ascending=False)
     df['总家数'] = df['上涨家数'] + df['下跌家数']
@@ -101,7 +102,7 @@ def get_dfcf_industry_sections(limit: int = 2000) -> list[str]:
 def get_dfcf_industry_stock_codes(section_result: list[str]) -> set:
     stock_list = set()
     for section_name in section_result:
-        df = ak.stock_board_industry_cons_em(symbol=section_name)
+        df = RequestGovernor().call(RequestSource.EASTMONEY, ak.stock_board_industry_cons_em, symbol=section_name)
         codes = {symbol_to_code(symbol) for symbol in df['代码'].values}
         stock_list.update(codes)
     return stock_list
@@ -147,7 +148,7 @@ def get_ths_concept_stock_codes(section_names: list[str]):
     stock_list = set()
     for section_name in section_names:
         query = f'{section_name}概念板块'
-        df = pywencai.get(query=query, perpage=100, loop=True)
+        df = RequestGovernor().call(RequestSource.WENCAI, pywencai.get, query=query, perpage=100, loop=True)
         if df is not None and type(df) != dict and df.shape[0] > 0:
             codes = df['股票代码'].values
             stock_list.update(codes)
@@ -1,5 +1,4 @@
 import math
-import datetime
 import logging
 import pandas as pd
 from typing import List, Dict, Optional
@@ -9,6 +8,8 @@ from xtquant.xttype import XtPosition
 from delegate.base_delegate import BaseDelegate
 from tools.utils_basic import get_limit_down_price
 from tools.utils_cache import InfoItem
+from tools.utils_clock import get_now
+from tools.utils_trace import get_latency_tracer
 
 
 class BaseSeller:
@@ -19,6 +20,7 @@ class BaseSeller:
 
     def order_sell(self, code, quote, volume, remark, log=True) -> None:
         if volume > 0:
+            get_latency_tracer().mark('order_sell')
             order_price = quote['lastPrice'] - self.order_premium
             limit_price = get_limit_down_price(code, quote['lastClose'])
             if order_price < limit_price:
@@ -42,7 +44,7 @@ class BaseSeller:
 
             if self.delegate.callback is not None:
                 self.delegate.callback.record_order(
-                    order_time=datetime.datetime.now().timestamp(),
+                    order_time=get_now().timestamp(),
                     code=code,
                     price=order_price,
                     volume=volume,
@@ -63,6 +65,7 @@ class BaseSeller:
         cache_history: Dict[str, pd.DataFrame],
         today_ticks: Dict[str, list] = None,
         extra_datas: Dict[str, any] = None,
+        changed_codes: Optional[set[str]] = None,   # 只检查行情有变动的持仓，按时间触发的卖出条件要慎用
     ) -> None:
         if today_ticks is None:
             today_ticks = {}
@@ -85,6 +88,9 @@ class BaseSeller:
             if code not in quotes:
                 continue
 
+            if changed_codes is not None and code not in changed_codes:
+                continue
+
             # 如果有数据且有持仓时间记录
             quote = quotes[code]
             if quote['open'] > 0 and quote['volume'] > 0:  # 确认当前股票没有停牌
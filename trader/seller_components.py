@@ -6,7 +6,7 @@ from typing import Dict, Optional
 
 from xtquant.xttype import XtPosition
 from tools.utils_basic import get_limit_up_price
-from tools.utils_remote import concat_ak_quote_dict
+from tools.utils_indicators import get_indicator_cache
 from trader.seller import BaseSeller
 
 
@@ -220,10 +220,8 @@ class MASeller(BaseSeller):
 
                 curr_price = quote['lastPrice']
 
-                df = concat_ak_quote_dict(history, quote, curr_date)
-
-                ma_values = MA(df.close.tail(self.ma_above + 1), self.ma_above)
-                ma_value = ma_values[-1]
+                state = get_indicator_cache().get(code, history)
+                ma_value = state.ma(curr_price, self.ma_above)
 
                 if curr_price <= ma_value - 0.01:
                     self.order_sell(code, quote, sell_volume, f'破{self.ma_above}日均{ma_value:.2f}')
@@ -251,10 +249,8 @@ class CCISeller(BaseSeller):
             if (held_day > 0) and int(curr_time[-2:]) % 5 == 0:  # 每隔5分钟 CCI 卖出
                 sell_volume = position.can_use_volume
 
-                df = concat_ak_quote_dict(history, quote, curr_date)
-
-                df['CCI'] = CCI(df['close'], df['high'], df['low'], 14)
-                cci = df['CCI'].tail(2).values
+                state = get_indicator_cache().get(code, history)
+                cci = state.cci(quote['lastPrice'], quote['high'], quote['low'], 14)
 
                 if cci[0] > self.cci_lower > cci[1]:  # CCI 下穿
                     self.order_sell(code, quote, sell_volume, f'CCI高于{self.cci_lower}')
@@ -285,10 +281,8 @@ class WRSeller(BaseSeller):
             if held_day > 0 and int(curr_time[-2:]) % 5 == 0:  # 每隔5分钟 WR 卖出
                 sell_volume = position.can_use_volume
 
-                df = concat_ak_quote_dict(history, quote, curr_date)
-
-                df['WR'] = WR(df['close'], df['high'], df['low'], 14)
-                wr = df['WR'].tail(2).values
+                state = get_indicator_cache().get(code, history)
+                wr = state.wr(quote['lastPrice'], quote['high'], quote['low'], 14)
 
                 if wr[0] < self.wr_cross < wr[1]:  # WR 上穿
                     self.order_sell(code, quote, sell_volume, f'WR上穿{self.wr_cross}卖')
@@ -406,17 +400,11 @@ class UppingBlocker(BaseSeller):
     ) -> bool:
         if history is not None:
             if held_day > 0:
-                df = concat_ak_quote_dict(history, quote, curr_date)
-
-                _, _, df['MACD'] = MACD(df['close'])
-                macd = df['MACD'].tail(2).values
-
-                close = df['close'].tail(2).values
-                high = df['high'].tail(2).values
-                low = df['low'].tail(2).values
+                state = get_indicator_cache().get(code, history)
+                macd = state.macd(quote['lastPrice'])
 
-                yesterday_price = close[0] + high[0] + low[0]
-                today_price = close[1] + high[1] + low[1]
+                yesterday_price = state.close[-1] + state.high[-1] + state.low[-1]
+                today_price = quote['lastPrice'] + quote['high'] + quote['low']
 
                 if macd[0] < macd[1] and yesterday_price < today_price:  # macd上行 & 价格上行
                     # self.order_sell(code, quote, sell_volume, '上行不卖')